@@ -0,0 +1,56 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from answer_matcher import (
+    LETTERS, PUNCTUATION, AnswerMatcher, language_code, synonym_phrases, tokenize
+)
+
+UNKNOWN = '[unk]'
+
+
+def normalize_phrase(text: str) -> str:
+    """Lowercase text and keep only words separated by single spaces"""
+    return ' '.join(token for token in tokenize(text) if token != PUNCTUATION)
+
+
+def build_answer_grammar(options: Optional[Dict[str, str]] = None,
+                         language: Optional[str] = None) -> Dict[str, str]:
+    """Map every phrase that names an answer to its letter
+
+    Covers letters, NATO words, "option X", ordinals ("the second one") and
+    the option texts of the current question, using the synonym table of
+    the recognition language.
+    """
+    grammar = synonym_phrases(language)
+    for letter, text in (options or {}).items():
+        phrase = normalize_phrase(str(text))
+        # Option texts that collide with a letter word would be ambiguous
+        if phrase and letter.upper() in LETTERS and phrase not in grammar:
+            grammar[phrase] = letter.upper()
+    return grammar
+
+
+def grammar_phrases(grammar: Dict[str, str]) -> List[str]:
+    """Phrase list for recognizers that accept a restricted grammar"""
+    return sorted(grammar) + [UNKNOWN]
+
+
+def match_answer(transcript: str, grammar: Dict[str, str],
+                 engine_confidence: float = 1.0,
+                 language: Optional[str] = None) -> Dict:
+    """Resolve a transcript to an answer letter with a confidence score
+
+    Phrases are matched left to right without overlap and the longest one
+    wins. A bare letter ("a", "see") only counts where a clause ends, where
+    it cannot be an article or a verb, and a bare number only on its own.
+    Confidence is the engine's confidence, reduced when the phrase is
+    surrounded by other words or the speaker corrected an earlier letter.
+    """
+    matcher = _grammar_matcher(frozenset(grammar.items()), language_code(language))
+    letter, confidence = matcher.score(transcript)
+    confidence = round(confidence * engine_confidence, 4) if letter else 0.0
+    return {'answer': letter, 'confidence': confidence, 'transcript': transcript}
+
+
+@lru_cache(maxsize=32)
+def _grammar_matcher(items: FrozenSet[Tuple[str, str]], language: str) -> AnswerMatcher:
+    return AnswerMatcher(dict(items), language)
@@ -0,0 +1,361 @@
+import re
+from collections import deque
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+LETTERS = ['A', 'B', 'C', 'D']
+DIGITS = {'A': ['1'], 'B': ['2'], 'C': ['3'], 'D': ['4']}
+PUNCTUATION = '|'
+
+# Per-language synonym tables. 'letters' are the spoken letter names, which
+# double as ordinary words ("a", "de"), so they only count where a clause
+# could end; bare 'numbers' ("that's the one") only count as the whole
+# utterance; 'words' are unambiguous anywhere. 'alternatives' join letters
+# ("B or C"), which makes the answer ambiguous; 'corrections' mark a changed
+# mind ("B, no wait, C"): only then may a second letter replace the first.
+LANGUAGE_TABLES = {
+    'en': {
+        'letters': {'A': ['a', 'ay'], 'B': ['b', 'bee'],
+                    'C': ['c', 'see', 'sea'], 'D': ['d', 'dee']},
+        'words': {'A': ['alpha', 'alfa'], 'B': ['bravo'],
+                  'C': ['charlie'], 'D': ['delta']},
+        'ordinals': {'A': ['first', '1st'], 'B': ['second', '2nd'],
+                     'C': ['third', '3rd'], 'D': ['fourth', '4th']},
+        'numbers': {'A': ['one'], 'B': ['two'], 'C': ['three'], 'D': ['four']},
+        'prefixes': ['option', 'answer', 'letter', 'choice', 'number'],
+        'articles': ['the'],
+        'suffixes': ['one', 'option', 'answer'],
+        'boundaries': ['because', 'cause', 'since', 'as', 'i', 'please', 'final'],
+        'alternatives': ['or', 'and'],
+        'corrections': ['no', 'wait', 'actually', 'sorry', 'rather', 'mean'],
+        'stopwords': ['the', 'a', 'an', 'of', 'in', 'on', 'to', 'and', 'or', 'is',
+                      'it', 'its', "it's", 'by', 'for'],
+    },
+    'es': {
+        'letters': {'A': ['a'], 'B': ['b', 'be'], 'C': ['c', 'ce'], 'D': ['d', 'de']},
+        'words': {'A': ['alfa', 'alpha'], 'B': ['bravo'],
+                  'C': ['charlie'], 'D': ['delta']},
+        'ordinals': {'A': ['primera', 'primero'], 'B': ['segunda', 'segundo'],
+                     'C': ['tercera', 'tercero'], 'D': ['cuarta', 'cuarto']},
+        'numbers': {'A': ['uno', 'una'], 'B': ['dos'],
+                    'C': ['tres'], 'D': ['cuatro']},
+        'prefixes': ['opción', 'opcion', 'respuesta', 'letra', 'número', 'numero'],
+        'articles': ['la', 'el'],
+        'suffixes': ['opción', 'opcion', 'respuesta'],
+        'boundaries': ['porque', 'ya', 'creo', 'por'],
+        'alternatives': ['o', 'u', 'y'],
+        'corrections': ['no', 'espera', 'mejor', 'perdón', 'perdon'],
+        'stopwords': ['el', 'la', 'los', 'las', 'un', 'una', 'de', 'del', 'y', 'o',
+                      'en', 'es', 'por'],
+    },
+    'fr': {
+        'letters': {'A': ['a'], 'B': ['b', 'bé'], 'C': ['c', 'cé'], 'D': ['d', 'dé']},
+        'words': {'A': ['alpha', 'alfa'], 'B': ['bravo'],
+                  'C': ['charlie'], 'D': ['delta']},
+        'ordinals': {'A': ['première', 'premier'],
+                     'B': ['deuxième', 'seconde', 'second'],
+                     'C': ['troisième'], 'D': ['quatrième']},
+        'numbers': {'A': ['un', 'une'], 'B': ['deux'], 'C': ['trois'], 'D': ['quatre']},
+        'prefixes': ['option', 'réponse', 'reponse', 'lettre', 'choix', 'numéro'],
+        'articles': ['la', 'le', "l'"],
+        'suffixes': ['option', 'réponse'],
+        'boundaries': ['parce', 'car', 'je', 'puisque'],
+        'alternatives': ['ou', 'et'],
+        'corrections': ['non', 'attends', 'plutôt', 'plutot', 'pardon'],
+        'stopwords': ['le', 'la', 'les', 'un', 'une', 'de', 'des', 'du', 'et', 'ou',
+                      'en', 'est', "l'", "d'"],
+    },
+    'de': {
+        'letters': {'A': ['a'], 'B': ['b', 'be'],
+                    'C': ['c', 'ce', 'zeh'], 'D': ['d', 'de', 'deh']},
+        'words': {'A': ['alpha', 'anton'], 'B': ['bravo', 'berta'],
+                  'C': ['charlie', 'cäsar'], 'D': ['delta', 'dora']},
+        'ordinals': {'A': ['erste', 'ersten'], 'B': ['zweite', 'zweiten'],
+                     'C': ['dritte', 'dritten'], 'D': ['vierte', 'vierten']},
+        'numbers': {'A': ['eins'], 'B': ['zwei'], 'C': ['drei'], 'D': ['vier']},
+        'prefixes': ['option', 'antwort', 'buchstabe', 'auswahl', 'nummer'],
+        'articles': ['die', 'der', 'das'],
+        'suffixes': ['option', 'antwort'],
+        'boundaries': ['weil', 'denn', 'ich', 'da'],
+        'alternatives': ['oder', 'und'],
+        'corrections': ['nein', 'warte', 'doch', 'eher', 'sorry'],
+        'stopwords': ['der', 'die', 'das', 'ein', 'eine', 'und', 'oder', 'in', 'ist',
+                      'von', 'zu', 'mit'],
+    },
+}
+DEFAULT_LANGUAGE = 'en'
+
+# Elided French articles ("l'option") split off; English contractions stay whole
+_TOKEN = re.compile(
+    r"(?<![^\W_])[cdjlmnst]'(?=[^\W_])"
+    r"|[^\W_]+(?:'[^\W_]+)?"
+    r"|[,.;:!?]"
+)
+_PUNCTUATION = set(",.;:!?")
+
+
+def language_code(language: Optional[str]) -> str:
+    """Map a recognition language like 'en-US' to a synonym table key"""
+    code = (language or DEFAULT_LANGUAGE).split('-')[0].split('_')[0].lower()
+    return code if code in LANGUAGE_TABLES else DEFAULT_LANGUAGE
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words; sentence punctuation becomes a boundary token"""
+    return [PUNCTUATION if token in _PUNCTUATION else token
+            for token in _TOKEN.findall((text or "").lower())]
+
+
+def synonym_phrases(language: Optional[str] = None) -> Dict[str, str]:
+    """Return every phrase that names an answer in a language, mapped to its letter"""
+    table = LANGUAGE_TABLES[language_code(language)]
+    phrases: Dict[str, str] = {}
+    for letter in LETTERS:
+        for word in table['letters'][letter] + table['words'][letter]:
+            phrases[word] = letter
+            for prefix in table['prefixes']:
+                phrases[f"{prefix} {word}"] = letter
+        numerals = table['ordinals'][letter] + table['numbers'][letter] + DIGITS[letter]
+        for ordinal in numerals:
+            forms = [ordinal] + [f"{ordinal} {suffix}" for suffix in table['suffixes']]
+            for form in forms:
+                phrases[form] = letter
+                for article in table['articles']:
+                    phrases[f"{article} {form}"] = letter
+            for prefix in table['prefixes']:
+                phrases[f"{prefix} {ordinal}"] = letter
+    return phrases
+
+
+def bare_letter_words(language: Optional[str] = None) -> Set[str]:
+    """Spoken letter names that are also ordinary words in a language"""
+    table = LANGUAGE_TABLES[language_code(language)]
+    return {word for words in table['letters'].values() for word in words}
+
+
+def bare_number_words(language: Optional[str] = None) -> Set[str]:
+    """Numbers that only name an answer when spoken on their own"""
+    table = LANGUAGE_TABLES[language_code(language)]
+    return {word for letter in LETTERS
+            for word in table['numbers'][letter] + DIGITS[letter]}
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over word tokens
+
+    Phrases are matched on whole words, so a letter inside a longer word
+    never matches, and all phrases are found in one pass over the tokens.
+    """
+
+    def __init__(self, phrases: Dict[str, str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]
+        for phrase, value in phrases.items():
+            tokens = tokenize(phrase)
+            if tokens:
+                self._add(tokens, value)
+        self._link()
+
+    def _add(self, tokens: List[str], value: str):
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(tokens), value))
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(token, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        """Return (start, end, value) for every phrase occurrence in tokens"""
+        matches = []
+        state = 0
+        for end, token in enumerate(tokens, 1):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, value in self._out[state]:
+                matches.append((end - length, end, value))
+        return matches
+
+
+class AnswerMatcher:
+    """Precompiled matcher from a spoken or typed answer to an option letter
+
+    The option texts of the current question are checked first (a literal
+    mention beats everything), then the language's synonym phrases, then a
+    fuzzy comparison with the option texts.
+    """
+
+    fuzzy_threshold = 0.75
+    fuzzy_margin = 0.15
+
+    def __init__(self, phrases: Dict[str, str], language: Optional[str] = None):
+        table = LANGUAGE_TABLES[language_code(language)]
+        self.automaton = PhraseAutomaton(phrases)
+        self.bare_letters = bare_letter_words(language)
+        self.bare_numbers = bare_number_words(language)
+        self.boundaries = (set(table['boundaries']) | set(table['alternatives'])
+                           | {PUNCTUATION})
+        self.corrections = set(table['corrections'])
+        self.stopwords = set(table['stopwords'])
+
+    @classmethod
+    def for_language(cls, language: Optional[str] = None) -> 'AnswerMatcher':
+        return cls(synonym_phrases(language), language)
+
+    def find(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        """Leftmost-longest, non-overlapping phrase matches that may name an answer"""
+        candidates = sorted(self.automaton.find(tokens),
+                            key=lambda m: (m[0], m[0] - m[1]))
+        words = sum(token != PUNCTUATION for token in tokens)
+        matches = []
+        covered = 0
+        for start, end, letter in candidates:
+            if start < covered:
+                continue
+            if end - start == 1 and words > 1:
+                word = tokens[start]
+                if word in self.bare_numbers:
+                    continue
+                if word in self.bare_letters and not self._clause_end(tokens, end):
+                    continue
+            matches.append((start, end, letter))
+            covered = end
+        return matches
+
+    def _clause_end(self, tokens: List[str], end: int) -> bool:
+        return end == len(tokens) or tokens[end] in self.boundaries
+
+    def _corrected(self, tokens: List[str],
+                   matches: List[Tuple[int, int, str]]) -> bool:
+        """True if a correction word precedes the last letter, after any other letter"""
+        last = matches[-1]
+        previous = max(end for _, end, letter in matches if letter != last[2])
+        return any(token in self.corrections for token in tokens[previous:last[0]])
+
+    def score(self, text: str) -> Tuple[Optional[str], float]:
+        """Return (letter, confidence in 0-1) from the synonym phrases alone
+
+        Naming several letters ("B or C") is ambiguous and matches nothing,
+        unless the speaker corrects themselves ("B, no wait, C").
+        """
+        tokens = tokenize(text)
+        words = [t for t in tokens if t != PUNCTUATION]
+        matches = self.find(tokens)
+        if not matches:
+            return None, 0.0
+        confidence = 1.0
+        if len({m[2] for m in matches}) > 1:
+            if not self._corrected(tokens, matches):
+                return None, 0.0
+            start, end, letter = matches[-1]
+            confidence *= 0.5
+        else:
+            start, end, letter = max(matches, key=lambda m: (m[1] - m[0], m[1]))
+        if end - start != len(words):
+            confidence *= 0.9
+        return letter, confidence
+
+    def match_options(self, text: str, options: Dict[str, str],
+                      fuzzy: bool = True) -> Tuple[Optional[str], float]:
+        """Return (letter, similarity) of the option text the transcript refers to
+
+        A literal mention of an option scores 1.0; with fuzzy, other options
+        score the share of their content words heard, misrecognized words
+        counting by string similarity.
+        """
+        tokens = [t for t in tokenize(text) if t != PUNCTUATION]
+        if not tokens:
+            return None, 0.0
+        compiled = _compile_options(tuple(sorted(options.items())),
+                                    frozenset(self.stopwords))
+        joined = f" {' '.join(tokens)} "
+        literal = [letter for letter, (phrase, _) in compiled
+                   if phrase and f" {phrase} " in joined]
+        if len(literal) == 1:
+            return literal[0], 1.0
+        if not fuzzy:
+            return None, 0.0
+
+        vocabulary = set(tokens)
+        scores = []
+        for letter, (_, content) in compiled:
+            if not content:
+                continue
+            total = 0.0
+            for word in content:
+                if word in vocabulary:
+                    total += 1.0
+                else:
+                    total += max((_similarity(word, token) for token in vocabulary),
+                                 default=0.0)
+            scores.append((total / len(content), letter))
+        if not scores:
+            return None, 0.0
+        scores.sort(reverse=True)
+        best, letter = scores[0]
+        runner_up = scores[1][0] if len(scores) > 1 else 0.0
+        if best >= self.fuzzy_threshold and best - runner_up >= self.fuzzy_margin:
+            return letter, best
+        return None, best
+
+    def match(self, text: str,
+              options: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Return the answer letter named by text, or None"""
+        if not text:
+            return None
+        if options:
+            letter, _ = self.match_options(text, options, fuzzy=False)
+            if letter:
+                return letter
+        letter, _ = self.score(text)
+        if letter:
+            return letter
+        if options and not self.find(tokenize(text)):
+            # Fuzzy option matching never overrides an ambiguous answer
+            letter, _ = self.match_options(text, options)
+        return letter
+
+
+@lru_cache(maxsize=4096)
+def _similarity(word: str, token: str) -> float:
+    if abs(len(word) - len(token)) > max(2, len(word) // 2):
+        return 0.0
+    ratio = SequenceMatcher(None, word, token).ratio()
+    return ratio if ratio >= 0.7 else 0.0
+
+
+@lru_cache(maxsize=64)
+def _compile_options(
+    options: Tuple[Tuple[str, str], ...], stopwords: FrozenSet[str]
+) -> List[Tuple[str, Tuple[str, List[str]]]]:
+    compiled = []
+    for letter, text in options:
+        tokens = [t for t in tokenize(str(text)) if t != PUNCTUATION]
+        content = [t for t in tokens if t not in stopwords] or tokens
+        compiled.append((letter.upper(), (' '.join(tokens), content)))
+    return compiled
+
+
+@lru_cache(maxsize=None)
+def get_answer_matcher(language: Optional[str] = None) -> AnswerMatcher:
+    """Return the compiled matcher for a recognition language (built once)"""
+    return AnswerMatcher.for_language(language_code(language))
@@ -4,6 +4,8 @@ from document_processor import DocumentProcessor
 from question_generator import QuestionGenerator
 from voice_handler import VoiceHandler
 from quiz_manager import QuizManager
+from audio_profiles import get_profile, list_profiles
+from quiz_bundle import BUNDLE_SUFFIX
 from config import Config
 import plotly.express as px
 import plotly.graph_objects as go
@@ -25,8 +27,9 @@ def initialize_components():
         Config.validate_config()
         doc_processor = DocumentProcessor()
         question_generator = QuestionGenerator()
+        # Cheap to construct: voice engines and the microphone load on first use
         voice_handler = VoiceHandler()
-        quiz_manager = QuizManager()
+        quiz_manager = QuizManager(voice_handler)
         return doc_processor, question_generator, voice_handler, quiz_manager
     except Exception as e:
         st.error(f"Initialization error: {str(e)}")
@@ -47,11 +50,29 @@ def main():
         num_questions = st.slider("Number of Questions", 3, 20, Config.DEFAULT_QUESTIONS_PER_QUIZ)
         difficulty = st.selectbox("Difficulty Level", Config.DIFFICULTY_LEVELS, index=1)
         topic_focus = st.text_input("Topic Focus (optional)", placeholder="e.g., Machine Learning")
+        quick_practice = st.checkbox(
+            "⚡ Quick Practice (offline)", value=False,
+            help="Build fill-in-the-blank questions instantly from the document, without an AI model"
+        )
         
         # Voice settings
         st.subheader("Voice Settings")
-        use_voice = st.checkbox("Enable Voice Mode", value=True)
+        use_voice = st.checkbox("Enable Voice Mode", value=True, key='use_voice')
+        if use_voice:
+            # Speech engines are created on first use, not at startup
+            voice_handler.prepare_voice()
         auto_play = st.checkbox("Auto-play Questions", value=True)
+        profiles = [p for p in list_profiles() if get_profile(p).is_available()]
+        st.selectbox(
+            "Audio Quality", profiles, key='audio_profile',
+            index=profiles.index(Config.AUDIO_PROFILE) if Config.AUDIO_PROFILE in profiles else 0,
+            format_func=lambda name: get_profile(name).label,
+            help="Lower-bandwidth encodings load faster on slow networks"
+        )
+        cache_stats = voice_handler.get_cache_stats()
+        if cache_stats['memory_hits'] + cache_stats['disk_hits'] + cache_stats['source_hits'] + cache_stats['misses']:
+            st.caption(f"🔁 Audio cache hit rate: {cache_stats['hit_rate']:.0%} "
+                       f"({cache_stats['disk_entries'] or cache_stats['memory_entries']} clips)")
         
         # Session controls
         st.subheader("Session Controls")
@@ -63,32 +84,23 @@ def main():
     st.title("🎤 Voice-Based Quiz Generator")
     st.markdown("Upload documents, generate quiz questions, and take voice-based quizzes with immediate feedback!")
     
-    # Ensure session state is initialized
-    if 'quiz_session' not in st.session_state:
-        st.session_state.quiz_session = {
-            'questions': [],
-            'current_question': 0,
-            'answers': [],
-            'scores': [],
-            'start_time': None,
-            'end_time': None,
-            'difficulty': 'medium',
-            'performance_history': [],
-            'session_active': False
-        }
+    # Ensure session state is initialized (components are shared, sessions are not)
+    quiz_manager.initialize_session_state()
 
     # Check if quiz is active
     if st.session_state.quiz_session.get('session_active', False):
         display_quiz_interface(quiz_manager, voice_handler, use_voice, auto_play)
     else:
         display_setup_interface(doc_processor, question_generator, quiz_manager,
-                               num_questions, difficulty, topic_focus)
+                               num_questions, difficulty, topic_focus, quick_practice, voice_handler)
 
 def display_setup_interface(doc_processor, question_generator, quiz_manager, 
-                           num_questions, difficulty, topic_focus):
+                           num_questions, difficulty, topic_focus, quick_practice=False,
+                           voice_handler=None):
     """Display the quiz setup interface"""
     
-    tab1, tab2, tab3 = st.tabs(["📄 Document Upload", "📝 Manual Topic", "📊 Previous Results"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📄 Document Upload", "📝 Manual Topic", "📦 Quiz Bundle",
+                                      "📊 Previous Results"])
     
     with tab1:
         st.subheader("Upload Document")
@@ -114,7 +126,8 @@ def display_setup_interface(doc_processor, question_generator, quiz_manager,
                     # Generate questions button
                     if st.button("Generate Quiz Questions", type="primary"):
                         generate_and_start_quiz(question_generator, quiz_manager, 
-                                              processed_text, num_questions, difficulty, topic_focus)
+                                              processed_text, num_questions, difficulty, topic_focus,
+                                              quick_practice)
     
     with tab2:
         st.subheader("Enter Topic Manually")
@@ -126,18 +139,55 @@ def display_setup_interface(doc_processor, question_generator, quiz_manager,
         
         if manual_topic and st.button("Generate Quiz from Topic", type="primary"):
             generate_and_start_quiz(question_generator, quiz_manager, 
-                                  manual_topic, num_questions, difficulty, topic_focus)
+                                  manual_topic, num_questions, difficulty, topic_focus,
+                                  quick_practice)
     
     with tab3:
+        st.subheader("Replay a Quiz Bundle")
+        bundle_file = st.file_uploader(
+            "Choose a quiz bundle",
+            type=[BUNDLE_SUFFIX.lstrip('.')],
+            help="Bundles hold the questions and their pre-rendered audio, so no speech is synthesized"
+        )
+        if bundle_file and st.button("Start Bundled Quiz", type="primary"):
+            start_bundled_quiz(bundle_file, quiz_manager, voice_handler)
+    
+    with tab4:
         display_previous_results(quiz_manager)
 
+def start_bundled_quiz(bundle_file, quiz_manager, voice_handler):
+    """Start a quiz from an uploaded bundle"""
+    # Bundles are memory-mapped, so the upload is kept as a pinned scratch file
+    # (not reclaimed for space, leased while the quiz is played) until the quiz
+    # manager closes the bundle and releases it
+    path = voice_handler.scratch.create(bundle_file.getvalue(), suffix=BUNDLE_SUFFIX, pinned=True)
+    try:
+        ready = quiz_manager.start_bundle(path)
+    except Exception as e:
+        # start_bundle has closed the bundle; the upload is not needed any more
+        voice_handler.scratch.release(path)
+        st.error(f"Could not open quiz bundle: {str(e)}")
+        return
+    questions = len(st.session_state.quiz_session['questions'])
+    if ready:
+        st.success(f"Loaded {questions} questions with {ready} pre-rendered clips! Starting quiz...")
+    else:
+        st.info(f"Loaded {questions} questions. The bundle has no audio for the current voice settings.")
+    time.sleep(1)
+    st.rerun()
+
 def generate_and_start_quiz(question_generator, quiz_manager, content, 
-                          num_questions, difficulty, topic_focus):
+                          num_questions, difficulty, topic_focus, quick_practice=False):
     """Generate questions and start quiz"""
     with st.spinner("Generating quiz questions..."):
-        questions = question_generator.generate_questions(
-            content, num_questions, difficulty, topic_focus
-        )
+        if quick_practice:
+            questions = question_generator.generate_cloze_questions(
+                content, num_questions, difficulty, topic_focus
+            )
+        else:
+            questions = question_generator.generate_questions(
+                content, num_questions, difficulty, topic_focus
+            )
         
         if questions:
             quiz_manager.start_quiz(questions, difficulty)
@@ -163,9 +213,33 @@ def display_quiz_interface(quiz_manager, voice_handler, use_voice, auto_play):
     else:
         display_quiz_results(quiz_manager)
 
+def play_question_audio(question, quiz_manager, voice_handler):
+    """Play a question's audio and start the answer timer when playback ends"""
+    # Pre-rendered audio plays immediately; otherwise render it now
+    audio_profile = st.session_state.get('audio_profile')
+    audio_bytes = voice_handler.get_ready_question_audio(question)
+    stream_url = None
+    if not audio_bytes and Config.TTS_CHUNKED_ENABLED and get_profile(audio_profile).passthrough:
+        # Stream segments as they render instead of waiting for the whole clip
+        # (streams carry the synthesized segments, so only in original quality)
+        stream_url = voice_handler.stream_question_audio(question)
+    if stream_url:
+        # A stream's length is unknown until it has rendered; the timer runs from display
+        st.markdown(voice_handler.get_audio_url_html(stream_url), unsafe_allow_html=True)
+        return
+    if not audio_bytes:
+        with st.spinner("Generating audio..."):
+            audio_bytes = voice_handler.create_question_audio_bytes(question)
+    if audio_bytes:
+        duration = voice_handler.play_audio_bytes(audio_bytes, profile=audio_profile)
+        if duration is not None:
+            quiz_manager.start_answer_timer(duration, after_playback=True)
+
 def display_question(question, quiz_manager, voice_handler, use_voice, auto_play):
     """Display current question"""
     
+    # Timed from display unless the question's audio sets a later start
+    quiz_manager.start_answer_timer()
     col1, col2 = st.columns([2, 1])
     
     with col1:
@@ -181,14 +255,9 @@ def display_question(question, quiz_manager, voice_handler, use_voice, auto_play
         if use_voice:
             st.subheader("Voice Controls")
             
-            # Play question audio
-            if st.button("🔊 Play Question"):
-                with st.spinner("Generating audio..."):
-                    audio_file = voice_handler.create_question_audio(question)
-                    if audio_file:
-                        audio_html = voice_handler.get_audio_html(audio_file)
-                        st.markdown(audio_html, unsafe_allow_html=True)
-                        voice_handler.cleanup_temp_files([audio_file])
+            # Play question audio (automatically once per question with auto-play on)
+            if st.button("🔊 Play Question") or (auto_play and quiz_manager.claim_autoplay()):
+                play_question_audio(question, quiz_manager, voice_handler)
             
             # Voice answer recording (simplified for demo)
             st.write("🎤 Voice Recording:")
@@ -203,9 +272,9 @@ def display_question(question, quiz_manager, voice_handler, use_voice, auto_play
     answer_choice = st.radio("Select your answer:", ['A', 'B', 'C', 'D'], horizontal=True)
     
     if st.button("Submit Answer", type="primary"):
-        process_answer(answer_choice, quiz_manager, voice_handler, use_voice)
+        process_answer(answer_choice, quiz_manager, voice_handler, use_voice, auto_play)
 
-def process_answer(user_answer, quiz_manager, voice_handler, use_voice):
+def process_answer(user_answer, quiz_manager, voice_handler, use_voice, auto_play=False):
     """Process submitted answer"""
     
     # Submit answer
@@ -226,17 +295,23 @@ def process_answer(user_answer, quiz_manager, voice_handler, use_voice):
     
     # Voice feedback
     if use_voice:
-        with st.spinner("Generating audio feedback..."):
-            feedback_audio = voice_handler.create_feedback_audio(
-                result['is_correct'], 
-                result['correct_answer'], 
-                result['explanation'],
-                user_answer
-            )
-            if feedback_audio:
-                audio_html = voice_handler.get_audio_html(feedback_audio)
-                st.markdown(audio_html, unsafe_allow_html=True)
-                voice_handler.cleanup_temp_files([feedback_audio])
+        feedback_args = (result['is_correct'], result['correct_answer'],
+                         result['explanation'], user_answer)
+        feedback_audio = voice_handler.get_ready_feedback_audio(*feedback_args)
+        if not feedback_audio:
+            with st.spinner("Generating audio feedback..."):
+                feedback_audio = voice_handler.create_feedback_audio_bytes(*feedback_args)
+        if feedback_audio:
+            clips = [feedback_audio]
+            next_question = quiz_manager.get_current_question() if auto_play else None
+            next_audio = voice_handler.get_ready_question_audio(next_question) if next_question else None
+            if next_audio:
+                # The next question starts playing the moment the feedback ends
+                clips.append(next_audio)
+                st.caption(f"🔊 Up next: {next_question['question']}")
+            ends = voice_handler.play_audio_sequence(clips, profile=st.session_state.get('audio_profile'))
+            if next_audio and ends[-1] is not None:
+                quiz_manager.start_answer_timer(ends[-1], after_playback=True)
     
     # Continue button
     if result['quiz_complete']:
@@ -281,10 +356,20 @@ def display_quiz_results(quiz_manager):
     if not results_df.empty:
         st.dataframe(results_df, use_container_width=True)
     
+    # Accuracy per topic, from the running tallies
+    if len(stats['by_topic']) > 1:
+        st.subheader("Accuracy by Topic")
+        fig = px.bar(
+            x=list(stats['by_topic']),
+            y=[topic['accuracy_percentage'] for topic in stats['by_topic'].values()],
+            labels={'x': 'Topic', 'y': 'Accuracy (%)'}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
     # Performance chart
-    if len(quiz_manager.get_performance_trend()) > 0:
+    trend_data = quiz_manager.get_performance_trend()
+    if len(trend_data) > 0:
         st.subheader("Performance Trend")
-        trend_data = quiz_manager.get_performance_trend()
         fig = px.line(
             x=list(range(1, len(trend_data) + 1)),
             y=trend_data,
@@ -295,7 +380,7 @@ def display_quiz_results(quiz_manager):
     
     # Export options
     st.subheader("Export Results")
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     
     with col1:
         if st.button("Download Results (JSON)"):
@@ -308,6 +393,21 @@ def display_quiz_results(quiz_manager):
             )
     
     with col2:
+        if st.button("Download Quiz Bundle"):
+            try:
+                with st.spinner("Packing questions and audio..."):
+                    bundle_data = quiz_manager.export_bundle(st.session_state.get('use_voice', True))
+            except Exception as e:
+                st.error(f"Error exporting quiz bundle: {str(e)}")
+            else:
+                st.download_button(
+                    label="Download Bundle",
+                    data=bundle_data,
+                    file_name=f"quiz_{int(time.time())}{BUNDLE_SUFFIX}",
+                    mime="application/octet-stream"
+                )
+    
+    with col3:
         if st.button("Start New Quiz"):
             quiz_manager.reset_session()
             st.rerun()
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from config import Config
+
+
+def audio_cache_key(text: str, language: str, **settings) -> str:
+    """Content address of a clip: hash of the text, language and voice settings"""
+    payload = json.dumps([text, language, sorted(settings.items())], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """Two-tier cache for synthesized audio clips
+
+    The memory tier is an LRU bounded by total bytes. The disk tier keeps one
+    file per clip in a shared directory and evicts the least recently used
+    files once the directory exceeds its byte budget. Files are written
+    atomically, so several processes can share the same directory.
+    Read-only sources such as quiz bundles can be attached behind both tiers;
+    a clip found there is promoted to the memory tier.
+    """
+
+    def __init__(self, memory_bytes: int = 32 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 disk_bytes: int = 256 * 1024 * 1024):
+        self.memory_limit = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_limit = disk_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._suffixes: Dict[str, str] = {}
+        self._disk: "OrderedDict[str, tuple]" = OrderedDict()
+        self._disk_size = 0
+        self._sources: List = []
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.source_hits = 0
+        self.misses = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached clip bytes, or None on a miss"""
+        with self._lock:
+            data = self._memory_get(key)
+            if data is not None:
+                self.memory_hits += 1
+                return data
+            path = self._disk_lookup(key)
+
+        if path is not None:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                with self._lock:
+                    self._disk_forget(key)
+            else:
+                self._disk_touch(path)
+                with self._lock:
+                    self.disk_hits += 1
+                    self._memory_put(key, data)
+                return data
+
+        data = self._source_get(key)
+        with self._lock:
+            if data is not None:
+                self.source_hits += 1
+                return data
+            self.misses += 1
+            return None
+
+    def get_path(self, key: str) -> Optional[str]:
+        """Return a disk path for the cached clip, or None on a miss"""
+        with self._lock:
+            path = self._disk_lookup(key)
+        if path is not None and self._disk_check(key, path):
+            with self._lock:
+                self.disk_hits += 1
+            return path
+
+        with self._lock:
+            data = self._memory_get(key)
+            if data is not None and self.disk_dir:
+                self.memory_hits += 1
+                suffix = self._suffixes.get(key, '.mp3')
+        if data is not None and self.disk_dir:
+            return self._disk_put(key, data, suffix)
+
+        if self.disk_dir:
+            data = self._source_get(key)
+            if data is not None:
+                with self._lock:
+                    self.source_hits += 1
+                    suffix = self._suffixes.get(key, '.mp3')
+                return self._disk_put(key, data, suffix)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def contains(self, key: str) -> bool:
+        """Check whether a clip is cached, without touching the LRU order or counters"""
+        with self._lock:
+            if key in self._memory or any(key in source for source in self._sources):
+                return True
+            entry = self._disk.get(key)
+        return entry is not None and os.path.exists(entry[0])
+
+    def put(self, key: str, data: bytes, suffix: str = '.mp3') -> Optional[str]:
+        """Store a clip in both tiers and return its disk path if the disk tier is enabled"""
+        with self._lock:
+            self._suffixes[key] = suffix
+            self._memory_put(key, data)
+        if self.disk_dir:
+            return self._disk_put(key, data, suffix)
+        return None
+
+    def attach(self, source):
+        """Serve clips from a read-only source (a QuizBundle) on a miss in both tiers"""
+        with self._lock:
+            if all(source is not attached for attached in self._sources):
+                self._sources.append(source)
+
+    def detach(self, source):
+        """Stop serving clips from a source; clips already promoted stay cached"""
+        with self._lock:
+            self._sources = [attached for attached in self._sources if attached is not source]
+
+    def owns(self, path: str) -> bool:
+        """Check whether a path belongs to the disk tier (and must not be deleted by callers)"""
+        if not self.disk_dir or not path:
+            return False
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.disk_dir)
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.memory_hits + self.disk_hits + self.source_hits
+        lookups = hits + self.misses
+        return hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'source_hits': self.source_hits,
+                'misses': self.misses,
+                'hit_rate': self.hit_rate,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_size,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_size,
+                'sources': len(self._sources)
+            }
+
+    def clear(self):
+        """Drop every cached clip from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            self._suffixes.clear()
+            paths = [path for path, _ in self._disk.values()]
+            self._disk.clear()
+            self._disk_size = 0
+        for path in paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+        return data
+
+    def _memory_put(self, key: str, data: bytes):
+        if len(data) > self.memory_limit:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_limit:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self._suffixes.pop(evicted_key, None)
+
+    def _source_get(self, key: str) -> Optional[bytes]:
+        """Read a clip from the attached sources (outside the lock) and promote it"""
+        with self._lock:
+            sources = list(self._sources)
+        for source in sources:
+            data = source.get(key)
+            if data is not None:
+                suffix = source.suffix(key)
+                with self._lock:
+                    self._suffixes[key] = suffix
+                    self._memory_put(key, data)
+                return data
+        return None
+
+    # The _disk_* index helpers run under the lock; file I/O happens outside it
+
+    def _disk_lookup(self, key: str) -> Optional[str]:
+        entry = self._disk.get(key)
+        if entry is None:
+            return None
+        self._disk.move_to_end(key)
+        return entry[0]
+
+    def _disk_check(self, key: str, path: str) -> bool:
+        """Return True if an indexed file still exists; forget it otherwise"""
+        if not os.path.exists(path):
+            with self._lock:
+                self._disk_forget(key)
+            return False
+        self._disk_touch(path)
+        return True
+
+    @staticmethod
+    def _disk_touch(path: str):
+        try:
+            # Keep file mtimes in LRU order for the next process that scans the directory
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _disk_put(self, key: str, data: bytes, suffix: str) -> Optional[str]:
+        with self._lock:
+            existing = self._disk_lookup(key)
+        if existing is not None and self._disk_check(key, existing):
+            return existing
+
+        path = os.path.join(self.disk_dir, key + suffix)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.part')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return None
+
+        evicted = []
+        with self._lock:
+            if key not in self._disk:
+                self._disk[key] = (path, len(data))
+                self._disk_size += len(data)
+            while self._disk_size > self.disk_limit and len(self._disk) > 1:
+                old_key = next(iter(self._disk))
+                evicted.append(self._disk[old_key][0])
+                self._disk_forget(old_key)
+        for old_path in evicted:
+            try:
+                os.unlink(old_path)
+            except OSError:
+                pass
+        return path
+
+    def _disk_forget(self, key: str):
+        entry = self._disk.pop(key, None)
+        if entry is not None:
+            self._disk_size -= entry[1]
+
+    def _scan_disk(self):
+        """Rebuild the disk index from files left by earlier runs, oldest first"""
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            path = os.path.join(self.disk_dir, name)
+            if name.endswith('.part'):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, os.path.splitext(name)[0], path, stat.st_size))
+        for _, key, path, size in sorted(entries):
+            self._disk[key] = (path, size)
+            self._disk_size += size
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_audio_cache() -> AudioCache:
+    """Return the process-wide audio cache shared by all sessions"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = AudioCache(
+                memory_bytes=Config.TTS_CACHE_MEMORY_MB * 1024 * 1024,
+                disk_dir=Config.TTS_CACHE_DIR or None,
+                disk_bytes=Config.TTS_CACHE_DISK_MB * 1024 * 1024
+            )
+        return _shared_cache
@@ -0,0 +1,188 @@
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+from typing import Optional
+from audio_ingest import detect_container
+from audio_segments import strip_id3
+
+# MPEG audio bitrates in kbps, by (MPEG-1?, layer)
+_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# Sample rates by the header's version bits (MPEG-2.5, reserved, MPEG-2, MPEG-1)
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+
+def _mp3_frame(header: int):
+    """Decode a 32-bit MPEG audio frame header into (frame bytes, samples, sample rate, mono)"""
+    if header >> 21 != 0x7FF:
+        return None
+    version = (header >> 19) & 3
+    layer = 4 - ((header >> 17) & 3)
+    bitrate_index = (header >> 12) & 0xF
+    rate_index = (header >> 10) & 3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    rate = _SAMPLE_RATES[version][rate_index]
+    padding = (header >> 9) & 1
+    if layer == 1:
+        return (12 * bitrate // rate + padding) * 4, 384, rate, False
+    samples = 1152 if layer == 2 or mpeg1 else 576
+    size = samples // 8 * bitrate // rate + padding
+    return size, samples, rate, (header >> 6) & 3 == 3
+
+
+def mp3_duration(data: bytes) -> Optional[float]:
+    """Duration of an MP3 clip from its frame headers, without decoding any audio
+
+    A Xing/Info or VBRI header in the first frame gives the frame count
+    directly; otherwise the frame headers are walked, jumping from one frame
+    to the next by its length.
+    """
+    frames = strip_id3(data)
+    end = len(frames)
+    position = 0
+    seconds = 0.0
+    first = True
+    while position + 4 <= end:
+        header = struct.unpack_from('>I', frames, position)[0]
+        frame = _mp3_frame(header)
+        if frame is None:
+            # Resynchronize on the next possible frame start
+            found = bytes(frames[position + 1:position + 4096]).find(b'\xff')
+            if found < 0:
+                break
+            position += 1 + found
+            continue
+        size, samples, rate, mono = frame
+        if first:
+            first = False
+            count = _vbr_frame_count(frames, position, header, mono)
+            if count:
+                return count * samples / rate
+        if position + size > end:
+            break
+        seconds += samples / rate
+        position += size
+    return seconds if seconds else None
+
+
+def _vbr_frame_count(frames, position: int, header: int, mono: bool) -> Optional[int]:
+    mpeg1 = (header >> 19) & 3 == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    xing = position + 4 + side_info
+    if bytes(frames[xing:xing + 4]) in (b'Xing', b'Info') and len(frames) >= xing + 12:
+        flags = struct.unpack_from('>I', frames, xing + 4)[0]
+        if flags & 1:
+            return struct.unpack_from('>I', frames, xing + 8)[0]
+    vbri = position + 36
+    if bytes(frames[vbri:vbri + 4]) == b'VBRI' and len(frames) >= vbri + 18:
+        return struct.unpack_from('>I', frames, vbri + 14)[0]
+    return None
+
+
+def wav_duration(data: bytes) -> Optional[float]:
+    """Duration of a WAV clip from its fmt and data chunk headers"""
+    position = 12
+    byte_rate = None
+    while position + 8 <= len(data):
+        chunk, size = struct.unpack_from('<4sI', data, position)
+        if chunk == b'fmt ' and size >= 16:
+            byte_rate = struct.unpack_from('<I', data, position + 16)[0]
+        elif chunk == b'data':
+            # Streamed WAVs may leave the size unset; count what is there
+            size = min(size, len(data) - position - 8)
+            return size / byte_rate if byte_rate else None
+        position += 8 + size + (size & 1)
+    return None
+
+
+def ogg_duration(data: bytes) -> Optional[float]:
+    """Duration of an Ogg Opus or Vorbis clip from the granule position of its last page"""
+    if len(data) < 28:
+        return None
+    packet = 27 + data[26]
+    if data[packet:packet + 8] == b'OpusHead':
+        rate = 48000
+        pre_skip = struct.unpack_from('<H', data, packet + 10)[0]
+    elif data[packet:packet + 7] == b'\x01vorbis':
+        rate = struct.unpack_from('<I', data, packet + 12)[0]
+        pre_skip = 0
+    else:
+        return None
+    last = data.rfind(b'OggS')
+    if last < 0 or last + 14 > len(data) or not rate:
+        return None
+    granule = struct.unpack_from('<q', data, last + 6)[0]
+    return max(0, granule - pre_skip) / rate
+
+
+_PARSERS = {'mp3': mp3_duration, 'wav': wav_duration, 'ogg': ogg_duration}
+
+
+def clip_duration(data: bytes) -> Optional[float]:
+    """Duration in seconds of an MP3, WAV or Ogg clip, or None if it cannot be told"""
+    parser = _PARSERS.get(detect_container(data) or '')
+    if parser is None:
+        return None
+    try:
+        return parser(data)
+    except struct.error:
+        return None
+
+
+class DurationIndex:
+    """Durations of rendered clips, keyed by content digest
+
+    Durations come from frame headers, so indexing a clip costs a hash and a
+    header walk; repeated lookups (the same clip for every session) cost only
+    the hash.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._durations: 'OrderedDict[str, Optional[float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def duration(self, data: bytes) -> Optional[float]:
+        """Return the duration of a clip, computing it on first sight"""
+        key = hashlib.blake2b(data, digest_size=16).hexdigest()
+        with self._lock:
+            if key in self._durations:
+                self._durations.move_to_end(key)
+                self.hits += 1
+                return self._durations[key]
+        seconds = clip_duration(data)
+        with self._lock:
+            self.misses += 1
+            self._durations[key] = seconds
+            while len(self._durations) > self.max_entries:
+                self._durations.popitem(last=False)
+        return seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._durations), 'hits': self.hits, 'misses': self.misses}
+
+
+_shared_index = None
+_lock = threading.Lock()
+
+
+def get_shared_duration_index() -> DurationIndex:
+    """Return the process-wide duration index shared by all sessions"""
+    global _shared_index
+    with _lock:
+        if _shared_index is None:
+            _shared_index = DurationIndex()
+        return _shared_index
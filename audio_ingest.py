@@ -0,0 +1,226 @@
+import io
+import shutil
+import subprocess
+import threading
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+import numpy as np
+from capabilities import load_optional, module_available
+from config import Config
+
+# Optional decoders are probed here and imported on first use
+PYDUB_AVAILABLE = module_available('pydub')
+SPEECH_RECOGNITION_AVAILABLE = module_available('speech_recognition')
+
+FFMPEG = shutil.which('ffmpeg')
+MAX_GAIN_DB = 30.0
+
+
+class UnsupportedAudioFormat(ValueError):
+    """The recording is in a container that cannot be decoded here"""
+
+
+def detect_container(data: bytes) -> Optional[str]:
+    """Identify an audio container from its magic bytes"""
+    if len(data) >= 12 and data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        return 'wav'
+    if data[:4] == b'OggS':
+        return 'ogg'
+    if data[:4] == b'\x1a\x45\xdf\xa3':
+        return 'webm'
+    if data[:4] == b'fLaC':
+        return 'flac'
+    if len(data) >= 8 and data[4:8] == b'ftyp':
+        return 'mp4'
+    if data[:3] == b'ID3' or (len(data) >= 2 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    return None
+
+
+def _pcm_to_float(frames: bytes, width: int, channels: int) -> np.ndarray:
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8)
+                | (raw[:, 2].astype(np.int32) << 16))
+        samples = (np.where(ints & 0x800000, ints - (1 << 24), ints) / 8388608.0).astype(np.float32)
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise UnsupportedAudioFormat(f"Unsupported sample width: {width} bytes")
+    usable = len(samples) - len(samples) % channels
+    return samples[:usable].reshape(-1, channels)
+
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """Decode WAV bytes into float32 samples shaped (frames, channels) and the sample rate"""
+    try:
+        with wave.open(io.BytesIO(data), 'rb') as wav:
+            channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise UnsupportedAudioFormat(f"Invalid WAV data: {e}")
+    return _pcm_to_float(frames, width, channels), rate
+
+
+def run_ffmpeg(data: bytes, output_args: List[str], timeout: float = 60) -> bytes:
+    """Pipe data through ffmpeg and return its output (no temp files)"""
+    if not FFMPEG:
+        raise UnsupportedAudioFormat("ffmpeg is not installed")
+    process = subprocess.run(
+        [FFMPEG, '-v', 'error', '-i', 'pipe:0'] + output_args + ['pipe:1'],
+        input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout
+    )
+    if process.returncode != 0:
+        raise UnsupportedAudioFormat(process.stderr.decode(errors='replace').strip()[:200])
+    return process.stdout
+
+
+def decode_compressed(data: bytes, container: str) -> Tuple[np.ndarray, int]:
+    """Decode a compressed container with ffmpeg (through pipes) or pydub"""
+    if FFMPEG:
+        return decode_wav(run_ffmpeg(data, ['-f', 'wav', '-acodec', 'pcm_s16le']))
+    pydub = load_optional('pydub') if PYDUB_AVAILABLE else None
+    if pydub is not None:
+        segment = pydub.AudioSegment.from_file(io.BytesIO(data), format=container)
+        return _pcm_to_float(segment.raw_data, segment.sample_width, segment.channels), segment.frame_rate
+    raise UnsupportedAudioFormat(f"Decoding {container} audio needs ffmpeg")
+
+
+def downmix(samples: np.ndarray) -> np.ndarray:
+    """Average all channels into one"""
+    return samples.mean(axis=1, dtype=np.float32) if samples.ndim == 2 else samples
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Resample mono float samples with linear interpolation
+
+    When downsampling, a moving-average low-pass over one output period is
+    applied first so high frequencies do not alias into the speech band.
+    """
+    if source_rate == target_rate or not len(samples):
+        return samples.astype(np.float32, copy=False)
+    if target_rate < source_rate:
+        width = int(round(source_rate / target_rate))
+        if width > 1:
+            kernel = np.ones(width, dtype=np.float32) / width
+            samples = np.convolve(samples, kernel, mode='same')
+    count = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(count, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def normalize_loudness(samples: np.ndarray, target_dbfs: float = -20.0) -> np.ndarray:
+    """Scale samples toward a target RMS level without clipping
+
+    The gain is capped so the peak stays below full scale and silence is not
+    amplified by more than MAX_GAIN_DB.
+    """
+    if not len(samples):
+        return samples
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    peak = float(np.max(np.abs(samples)))
+    if rms <= 0 or peak <= 0:
+        return samples
+    gain = min(10 ** (target_dbfs / 20) / rms, 0.99 / peak, 10 ** (MAX_GAIN_DB / 20))
+    return samples * np.float32(gain)
+
+
+class IngestedAudio:
+    """Mono 16-bit PCM at the recognizer's rate, held in memory"""
+
+    def __init__(self, pcm: bytes, sample_rate: int, container: str, source_rate: int, channels: int):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.container = container
+        self.source_rate = source_rate
+        self.channels = channels
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / 2 / self.sample_rate
+
+    def to_audio_data(self):
+        """Return a speech_recognition AudioData over the PCM, without a temp file"""
+        sr = load_optional('speech_recognition')
+        if sr is None:
+            raise RuntimeError("speech_recognition is not installed")
+        return sr.AudioData(self.pcm, self.sample_rate, 2)
+
+
+class AudioIngestor:
+    """Turn browser recordings into recognizer-ready PCM on a worker pool
+
+    WebM/Opus, OGG, MP3, MP4 and FLAC are decoded by ffmpeg (or pydub) in
+    pool threads, where the decoder subprocess runs without holding the GIL;
+    WAV is parsed in place. Downmixing, resampling and loudness
+    normalization are vectorized NumPy.
+    """
+
+    def __init__(self, target_rate: int = 16000, target_dbfs: Optional[float] = -20.0, max_workers: int = 2):
+        self.target_rate = target_rate
+        self.target_dbfs = target_dbfs
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="audio-ingest")
+            return self._pool
+
+    def submit(self, data: bytes, target_rate: Optional[int] = None) -> Future:
+        """Start converting a recording; the future resolves to IngestedAudio"""
+        return self._executor().submit(self.convert, data, target_rate)
+
+    def ingest(self, data: bytes, target_rate: Optional[int] = None, timeout: Optional[float] = None) -> IngestedAudio:
+        """Convert a recording on the pool and wait for the result"""
+        if detect_container(data) == 'wav':
+            # Nothing to decode; skip the hop to a worker thread
+            return self.convert(data, target_rate)
+        return self.submit(data, target_rate).result(timeout=timeout)
+
+    def convert(self, data: bytes, target_rate: Optional[int] = None) -> IngestedAudio:
+        """Decode, downmix, resample and normalize a recording in the calling thread"""
+        target_rate = target_rate or self.target_rate
+        container = detect_container(data)
+        if container is None:
+            raise UnsupportedAudioFormat("Unrecognized audio format")
+        if container == 'wav':
+            samples, rate = decode_wav(data)
+        else:
+            samples, rate = decode_compressed(data, container)
+
+        channels = samples.shape[1] if samples.ndim == 2 else 1
+        mono = resample(downmix(samples), rate, target_rate)
+        if self.target_dbfs is not None:
+            mono = normalize_loudness(mono, self.target_dbfs)
+        pcm = np.clip(np.round(mono * 32768.0), -32768, 32767).astype('<i2').tobytes()
+        return IngestedAudio(pcm, target_rate, container, rate, channels)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+
+_shared_ingestor = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_audio_ingestor() -> AudioIngestor:
+    """Return the process-wide ingestor whose decode pool all sessions share"""
+    global _shared_ingestor
+    with _shared_lock:
+        if _shared_ingestor is None:
+            _shared_ingestor = AudioIngestor(
+                target_dbfs=Config.INGEST_TARGET_DBFS if Config.INGEST_NORMALIZE_LOUDNESS else None,
+                max_workers=Config.INGEST_WORKERS
+            )
+        return _shared_ingestor
@@ -0,0 +1,152 @@
+import heapq
+import itertools
+import threading
+from typing import Callable, Dict, Iterable, Optional, Set
+
+
+class _Job:
+    """A queued rendering job, shared by every owner that requested the same clip"""
+
+    __slots__ = ('key', 'text', 'priority', 'owners', 'state', 'done')
+
+    def __init__(self, key: str, text: str, priority: float):
+        self.key = key
+        self.text = text
+        self.priority = priority
+        self.owners: Set[str] = set()
+        self.state = 'pending'
+        self.done = threading.Event()
+
+
+class AudioPrerenderer:
+    """Renders audio clips ahead of time on a bounded pool of worker threads
+
+    Jobs are keyed by the clip's cache key, so the same clip requested by
+    several sessions is rendered once. Lower priority values run first, and
+    submitting an already queued clip with a better priority moves it forward.
+    Pending jobs can be cancelled per owner; a job that is already rendering is
+    left to finish because its result lands in the shared cache anyway.
+    """
+
+    def __init__(self, render: Callable[[str, str], None], max_workers: int = 2):
+        self.render = render
+        self.max_workers = max(1, max_workers)
+        self._jobs: Dict[str, _Job] = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._workers = []
+        self._stopped = False
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def submit(self, key: str, text: str, priority: float = 0, owner: str = "") -> bool:
+        """Queue a clip for rendering; returns False if it is already rendering"""
+        with self._cond:
+            job = self._jobs.get(key)
+            if job is None:
+                job = _Job(key, text, priority)
+                self._jobs[key] = job
+                heapq.heappush(self._heap, (priority, next(self._counter), key))
+            elif job.state == 'pending' and priority < job.priority:
+                # Stale heap entries are skipped by the workers
+                job.priority = priority
+                heapq.heappush(self._heap, (priority, next(self._counter), key))
+            job.owners.add(owner)
+            self._ensure_workers()
+            self._cond.notify()
+            return job.state == 'pending'
+
+    def submit_many(self, jobs: Iterable, owner: str = ""):
+        """Queue several (key, text, priority) jobs at once"""
+        for key, text, priority in jobs:
+            self.submit(key, text, priority, owner)
+
+    def is_pending(self, key: str) -> bool:
+        """Check whether a clip is queued or rendering"""
+        with self._cond:
+            return key in self._jobs
+
+    def wait(self, key: str, timeout: Optional[float] = None) -> bool:
+        """Wait for a queued or rendering clip; returns True if it finished in time"""
+        with self._cond:
+            job = self._jobs.get(key)
+            if job is None:
+                return True
+            if job.state == 'pending':
+                # Someone is waiting for this clip, so render it next
+                job.priority = float('-inf')
+                heapq.heappush(self._heap, (job.priority, next(self._counter), key))
+                self._cond.notify()
+        return job.done.wait(timeout)
+
+    def cancel(self, owner: str) -> int:
+        """Cancel the pending jobs that only this owner still needs"""
+        cancelled = 0
+        with self._cond:
+            for key, job in list(self._jobs.items()):
+                job.owners.discard(owner)
+                if not job.owners and job.state == 'pending':
+                    job.state = 'cancelled'
+                    job.done.set()
+                    del self._jobs[key]
+                    cancelled += 1
+            self.cancelled += cancelled
+        return cancelled
+
+    def stats(self) -> Dict:
+        """Return queue and completion counters"""
+        with self._cond:
+            running = sum(1 for job in self._jobs.values() if job.state == 'running')
+            return {
+                'pending': len(self._jobs) - running,
+                'running': running,
+                'completed': self.completed,
+                'failed': self.failed,
+                'cancelled': self.cancelled,
+                'workers': len(self._workers)
+            }
+
+    def shutdown(self):
+        """Stop the workers after their current job"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _ensure_workers(self):
+        self._workers = [w for w in self._workers if w.is_alive()]
+        while len(self._workers) < self.max_workers and not self._stopped:
+            worker = threading.Thread(target=self._work, name="audio-prerender", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _next_job(self) -> Optional[_Job]:
+        with self._cond:
+            while not self._stopped:
+                while self._heap:
+                    priority, _, key = heapq.heappop(self._heap)
+                    job = self._jobs.get(key)
+                    if job is not None and job.state == 'pending' and priority == job.priority:
+                        job.state = 'running'
+                        return job
+                self._cond.wait()
+            return None
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self.render(job.key, job.text)
+                succeeded = True
+            except Exception:
+                succeeded = False
+            with self._cond:
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self._jobs.pop(job.key, None)
+            job.done.set()
@@ -0,0 +1,135 @@
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from audio_cache import AudioCache
+import audio_ingest
+from config import Config
+
+
+class EncodingProfile:
+    """How clips are re-encoded before they are sent to a client
+
+    A profile without ffmpeg arguments passes the synthesized clip through
+    unchanged.
+    """
+
+    def __init__(self, name: str, label: str, mime: Optional[str] = None,
+                 suffix: Optional[str] = None, ffmpeg_args: Optional[List[str]] = None):
+        self.name = name
+        self.label = label
+        self.mime = mime
+        self.suffix = suffix
+        self.ffmpeg_args = ffmpeg_args
+
+    @property
+    def passthrough(self) -> bool:
+        return self.ffmpeg_args is None
+
+    def is_available(self) -> bool:
+        """Return True if clips can be encoded with this profile here"""
+        return self.passthrough or audio_ingest.FFMPEG is not None
+
+
+PROFILES = {
+    'original': EncodingProfile('original', "Original quality"),
+    'speech_mp3': EncodingProfile(
+        'speech_mp3', "Speech MP3 (mono, 32 kbps)", 'audio/mpeg', '.mp3',
+        ['-vn', '-ac', '1', '-ar', '22050', '-c:a', 'libmp3lame', '-b:a', '32k', '-f', 'mp3']
+    ),
+    'opus_low': EncodingProfile(
+        'opus_low', "Low bandwidth Opus (mono, 16 kbps)", 'audio/ogg', '.ogg',
+        ['-vn', '-ac', '1', '-c:a', 'libopus', '-b:a', '16k', '-application', 'voip', '-f', 'ogg']
+    ),
+}
+
+
+def get_profile(name: Optional[str]) -> EncodingProfile:
+    """Look up a profile by name (unknown names fall back to original)"""
+    return PROFILES.get((name or 'original').lower(), PROFILES['original'])
+
+
+def list_profiles() -> List[str]:
+    """Return the names of all encoding profiles"""
+    return list(PROFILES)
+
+
+def profile_cache_key(data: bytes, profile: EncodingProfile) -> str:
+    """Content address of an encoded clip: hash of the source bytes plus the profile"""
+    digest = hashlib.sha256(data).hexdigest()
+    return hashlib.sha256(f"profile:{profile.name}:{digest}".encode()).hexdigest()
+
+
+def ffmpeg_encode(data: bytes, profile: EncodingProfile) -> bytes:
+    """Encode a clip with a profile's ffmpeg arguments"""
+    return audio_ingest.run_ffmpeg(data, profile.ffmpeg_args)
+
+
+class AudioTranscoder:
+    """Encode clips per profile once and keep the results in a transcode cache
+
+    Encodes live in their own cache (by default the shared transcode cache),
+    not the TTS cache, so they never evict synthesized clips or count in its
+    hit rate. Concurrent requests for the same clip and profile wait for a
+    single encode. When a profile cannot be encoded (no ffmpeg, encoder
+    error), the original clip is returned so playback never breaks.
+    """
+
+    def __init__(self, cache: Optional[AudioCache] = None,
+                 encoder: Callable[[bytes, EncodingProfile], bytes] = ffmpeg_encode):
+        self.cache = cache or get_shared_transcode_cache()
+        self.encoder = encoder
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.encodes = 0
+        self.failures = 0
+
+    def encode(self, data: bytes, source_mime: str, profile_name: Optional[str]) -> Tuple[bytes, str]:
+        """Return (clip bytes, mime) for a profile"""
+        profile = get_profile(profile_name)
+        if profile.passthrough or not profile.is_available():
+            return data, source_mime
+
+        key = profile_cache_key(data, profile)
+        while True:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached, profile.mime
+            with self._lock:
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+            if owner:
+                break
+            event.wait()
+            if not self.cache.contains(key):
+                # The encode failed (or the cache could not hold it)
+                return data, source_mime
+
+        try:
+            encoded = self.encoder(data, profile)
+            self.cache.put(key, encoded, suffix=profile.suffix)
+            self.encodes += 1
+            return encoded, profile.mime
+        except Exception:
+            self.failures += 1
+            return data, source_mime
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+
+_shared_transcode_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_transcode_cache() -> AudioCache:
+    """Return the process-wide, memory-only cache of transcoded clips"""
+    global _shared_transcode_cache
+    with _shared_lock:
+        if _shared_transcode_cache is None:
+            _shared_transcode_cache = AudioCache(memory_bytes=Config.AUDIO_PROFILE_CACHE_MB * 1024 * 1024)
+        return _shared_transcode_cache
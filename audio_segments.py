@@ -0,0 +1,100 @@
+import io
+import re
+import wave
+from typing import List
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def speech_segments(text: str, min_chars: int = 4, max_chars: int = 240) -> List[str]:
+    """Split text into segments that can be synthesized independently
+
+    Lines are the natural unit (question, each option, instruction). Long lines
+    are split further at sentence ends. Headings ending in a colon (such as
+    "Options:") and fragments shorter than min_chars are merged into the
+    following segment.
+    """
+    pieces = []
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) <= max_chars:
+            pieces.append(line)
+            continue
+        current = ""
+        for sentence in _SENTENCE_END.split(line):
+            if current and len(current) + len(sentence) + 1 > max_chars:
+                pieces.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}".strip()
+        if current:
+            pieces.append(current)
+
+    segments = []
+    carry = ""
+    for piece in pieces:
+        piece = f"{carry} {piece}".strip() if carry else piece
+        if piece.endswith(':') or len(piece) < min_chars:
+            carry = piece
+            continue
+        carry = ""
+        segments.append(piece)
+    if carry:
+        if segments:
+            segments[-1] = f"{segments[-1]} {carry}"
+        else:
+            segments.append(carry)
+    return segments
+
+
+def strip_id3(data: bytes) -> memoryview:
+    """Return the MP3 frames of a clip without its ID3v2 header or ID3v1 trailer"""
+    view = memoryview(data)
+    start, end = 0, len(data)
+    if len(data) >= 10 and data[:3] == b'ID3':
+        # The tag size is a 28-bit "syncsafe" integer (7 bits per byte)
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        start = 10 + size + (10 if data[5] & 0x10 else 0)
+    if end - start >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+    return view[min(start, end):end]
+
+
+def concat_mp3(clips: List[bytes]) -> bytes:
+    """Join MP3 clips into one playable stream by concatenating their frames"""
+    return b''.join(strip_id3(clip) for clip in clips)
+
+
+def concat_wav(clips: List[bytes]) -> bytes:
+    """Join WAV clips with identical formats into one clip under a single header"""
+    params = None
+    frames = []
+    for clip in clips:
+        with wave.open(io.BytesIO(clip), 'rb') as wav:
+            clip_params = (wav.getnchannels(), wav.getsampwidth(), wav.getframerate())
+            if params is None:
+                params = clip_params
+            elif clip_params != params:
+                raise ValueError("Cannot join WAV clips with different formats")
+            frames.append(wav.readframes(wav.getnframes()))
+    if params is None:
+        return b''
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(params[0])
+        wav.setsampwidth(params[1])
+        wav.setframerate(params[2])
+        wav.writeframes(b''.join(frames))
+    return buffer.getvalue()
+
+
+def concat_clips(clips: List[bytes], mime: str = 'audio/mpeg') -> bytes:
+    """Join clips of one format (MP3 or WAV) into a single clip"""
+    if mime == 'audio/wav':
+        return concat_wav(clips)
+    if mime == 'audio/mpeg':
+        return concat_mp3(clips)
+    raise ValueError(f"Cannot join clips of type {mime}")
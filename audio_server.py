@@ -0,0 +1,297 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from audio_segments import strip_id3
+from config import Config
+
+MIME_EXTENSIONS = {
+    'audio/mpeg': '.mp3',
+    'audio/wav': '.wav',
+    'audio/ogg': '.ogg',
+    'audio/webm': '.webm'
+}
+
+_ASSET_PATH = re.compile(r'^/audio/([0-9a-f]{64})\.[a-z0-9]+$')
+_STREAM_PATH = re.compile(r'^/stream/([0-9a-f]{64})\.[a-z0-9]+$')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class AudioAssetStore:
+    """In-memory LRU of audio clips addressed by the SHA-256 of their bytes
+
+    A clip's id never changes while its bytes stay the same, so clients can
+    cache it forever. The store keeps a reference to the caller's bytes object
+    rather than a copy.
+    """
+
+    def __init__(self, memory_bytes: int = 64 * 1024 * 1024):
+        self.memory_limit = memory_bytes
+        self._assets: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def add(self, data: bytes, mime: str = 'audio/mpeg') -> str:
+        """Store a clip and return its content-hash id"""
+        asset_id = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if asset_id in self._assets:
+                self._assets.move_to_end(asset_id)
+                return asset_id
+            self._assets[asset_id] = (data, mime)
+            self._size += len(data)
+            while self._size > self.memory_limit and len(self._assets) > 1:
+                _, (evicted, _) = self._assets.popitem(last=False)
+                self._size -= len(evicted)
+        return asset_id
+
+    def get(self, asset_id: str) -> Optional[Tuple[bytes, str]]:
+        """Return (bytes, mime type) of a clip, or None if unknown or evicted"""
+        with self._lock:
+            asset = self._assets.get(asset_id)
+            if asset is not None:
+                self._assets.move_to_end(asset_id)
+            return asset
+
+    def stats(self) -> Dict:
+        """Return the number and total size of stored clips"""
+        with self._lock:
+            return {'assets': len(self._assets), 'bytes': self._size}
+
+
+def parse_range(header: str, length: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range "bytes=" header into inclusive (start, end) offsets
+
+    Returns None when the range cannot be satisfied.
+    """
+    match = _RANGE.match(header.strip())
+    if not match or length == 0:
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), length - 1) if last else length - 1
+    elif last:
+        # Suffix range: the final N bytes
+        start = max(length - int(last), 0)
+        end = length - 1
+    else:
+        return None
+    if start > end or start >= length:
+        return None
+    return start, end
+
+
+class _AudioRequestHandler(BaseHTTPRequestHandler):
+    """Serves /audio/<sha256>.<ext> with immutable caching and byte ranges"""
+
+    store: AudioAssetStore = None
+    streams: "OrderedDict[str, AudioStream]" = None
+    streams_lock: threading.Lock = None
+    segment_timeout: float = 30
+
+    def do_GET(self):
+        if self.path.startswith('/stream/'):
+            self._serve_stream()
+        else:
+            self._serve(send_body=True)
+
+    def do_HEAD(self):
+        if self.path.startswith('/stream/'):
+            self._serve_stream(send_body=False)
+        else:
+            self._serve(send_body=False)
+
+    def _serve_stream(self, send_body: bool = True):
+        """Send the segments of a stream as each finishes rendering"""
+        match = _STREAM_PATH.match(self.path.split('?', 1)[0])
+        stream = None
+        if match:
+            with self.streams_lock:
+                stream = self.streams.get(match.group(1))
+        if stream is None:
+            self.send_error(404, "Audio stream not found")
+            return
+
+        # No Content-Length: the body ends when the connection closes
+        self.send_response(200)
+        self.send_header('Content-Type', stream.mime)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Accept-Ranges', 'none')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        if not send_body:
+            return
+        for segment in stream.segments:
+            try:
+                data = segment.result(timeout=self.segment_timeout)
+            except Exception:
+                # A failed segment is skipped so the rest still plays
+                continue
+            self.wfile.write(strip_id3(data))
+            self.wfile.flush()
+
+    def _serve(self, send_body: bool):
+        match = _ASSET_PATH.match(self.path.split('?', 1)[0])
+        asset = self.store.get(match.group(1)) if match else None
+        if asset is None:
+            self.send_error(404, "Audio clip not found")
+            return
+
+        asset_id = match.group(1)
+        data, mime = asset
+        etag = f'"{asset_id}"'
+        if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            self._send_cache_headers(etag)
+            self.end_headers()
+            return
+
+        start, end = 0, len(data) - 1
+        status = 200
+        range_header = self.headers.get('Range')
+        if range_header:
+            byte_range = parse_range(range_header, len(data))
+            if byte_range is None:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(data)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            start, end = byte_range
+            status = 206
+
+        self.send_response(status)
+        self.send_header('Content-Type', mime)
+        self.send_header('Content-Length', str(end - start + 1))
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        self._send_cache_headers(etag)
+        self.end_headers()
+        if send_body:
+            # Slicing a memoryview sends the range without copying the clip
+            self.wfile.write(memoryview(data)[start:end + 1])
+
+    def _send_cache_headers(self, etag: str):
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Access-Control-Allow-Origin', '*')
+
+    def log_message(self, format, *args):
+        # Browsers fetch many ranges per clip; keep the console quiet
+        pass
+
+
+class AudioStream:
+    """MP3 audio whose segments are still being rendered, in playback order"""
+
+    def __init__(self, segments: List[Future], mime: str = 'audio/mpeg'):
+        self.segments = segments
+        self.mime = mime
+
+
+class AudioServer:
+    """Background HTTP server publishing clips from an AudioAssetStore by URL
+
+    Finished clips are served from /audio/ with immutable caching and byte
+    ranges. Clips still being rendered segment by segment are served from
+    /stream/, which sends each segment as soon as it is ready.
+    """
+
+    def __init__(self, store: Optional[AudioAssetStore] = None, host: str = '127.0.0.1',
+                 port: int = 8502, public_url: str = '', max_streams: int = 64):
+        self.store = store or AudioAssetStore()
+        self.host = host
+        self.port = port
+        self.public_url = public_url
+        self.max_streams = max_streams
+        self._streams: "OrderedDict[str, AudioStream]" = OrderedDict()
+        # Request threads read the streams while sessions publish new ones
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._httpd is not None
+
+    def start(self) -> bool:
+        """Bind and serve in a daemon thread; returns False if the port is unavailable"""
+        if self._httpd is not None:
+            return True
+        handler = type('AudioRequestHandler', (_AudioRequestHandler,),
+                       {'store': self.store, 'streams': self._streams, 'streams_lock': self._lock})
+        try:
+            self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        except OSError:
+            return False
+        self._httpd.daemon_threads = True
+        # Port 0 binds an ephemeral port
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="audio-server",
+                                        daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Shut the server down"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def url_for(self, asset_id: str, mime: str = 'audio/mpeg') -> str:
+        """Return the public URL of a stored clip"""
+        base = self.public_url.rstrip('/') or f"http://localhost:{self.port}"
+        return f"{base}/audio/{asset_id}{MIME_EXTENSIONS.get(mime, '.bin')}"
+
+    def publish(self, data: bytes, mime: str = 'audio/mpeg') -> str:
+        """Store a clip and return its URL"""
+        return self.url_for(self.store.add(data, mime), mime)
+
+    def publish_stream(self, stream_id: str, segments: List[Future],
+                       mime: str = 'audio/mpeg') -> str:
+        """Register segments that are rendering and return the URL streaming them
+
+        stream_id must be a 64-character hex digest identifying the content.
+        """
+        with self._lock:
+            self._streams[stream_id] = AudioStream(segments, mime)
+            self._streams.move_to_end(stream_id)
+            while len(self._streams) > self.max_streams:
+                self._streams.popitem(last=False)
+        base = self.public_url.rstrip('/') or f"http://localhost:{self.port}"
+        return f"{base}/stream/{stream_id}{MIME_EXTENSIONS.get(mime, '.bin')}"
+
+
+_shared_server = None
+_shared_failed = False
+_shared_lock = threading.Lock()
+
+
+def get_shared_audio_server() -> Optional[AudioServer]:
+    """Return the process-wide audio server, starting it on first use
+
+    Returns None when the server is disabled or cannot bind its port, in which
+    case callers fall back to inline audio.
+    """
+    global _shared_server, _shared_failed
+    if not Config.AUDIO_SERVER_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared_server is None and not _shared_failed:
+            server = AudioServer(
+                AudioAssetStore(Config.AUDIO_SERVER_MEMORY_MB * 1024 * 1024),
+                host=Config.AUDIO_SERVER_HOST,
+                port=Config.AUDIO_SERVER_PORT,
+                public_url=Config.AUDIO_SERVER_PUBLIC_URL
+            )
+            if server.start():
+                _shared_server = server
+            else:
+                _shared_failed = True
+        return _shared_server
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Batch transcription of recorded voice answers
+
+Transcribes a directory, ZIP or TAR archive of recordings across a process
+pool and writes one row per file (transcript, parsed answer, timings) to CSV
+or Parquet:
+
+    python batch_transcribe.py answers.zip results.parquet --backend vosk
+"""
+
+import argparse
+import csv
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import pandas as pd
+from config import Config
+from answer_matcher import get_answer_matcher
+from audio_ingest import AudioIngestor
+from stt_backends import SpeechNotRecognized, STTBackend, create_stt_backend
+
+AUDIO_EXTENSIONS = ('.wav', '.webm', '.ogg', '.oga', '.opus', '.mp3', '.m4a', '.mp4', '.flac')
+RESULT_COLUMNS = ['file', 'container', 'duration_s', 'transcript', 'answer', 'error',
+                  'decode_ms', 'transcribe_ms', 'total_ms', 'worker']
+
+# A recording to transcribe: ('path', file path, name), ('zip', archive path, member)
+# or ('bytes', name, data). Paths and ZIP members are read by the worker itself.
+Item = Tuple[str, str, Union[str, bytes]]
+
+
+def is_recording(name: str) -> bool:
+    return name.lower().endswith(AUDIO_EXTENSIONS)
+
+
+def find_recordings(source: str) -> Iterator[Item]:
+    """List the recordings of a directory, ZIP or TAR archive in name order"""
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for filename in sorted(files):
+                if is_recording(filename):
+                    path = os.path.join(root, filename)
+                    yield ('path', path, os.path.relpath(path, source))
+    elif not os.path.isfile(source):
+        raise ValueError(f"No such directory or archive: {source}")
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = sorted(n for n in archive.namelist() if is_recording(n))
+        for name in names:
+            yield ('zip', source, name)
+    elif tarfile.is_tarfile(source):
+        # Compressed tars are not seekable per member, so they are read in one pass here
+        with tarfile.open(source) as archive:
+            for member in archive:
+                if member.isfile() and is_recording(member.name):
+                    yield ('bytes', member.name, archive.extractfile(member).read())
+    else:
+        raise ValueError(f"Not a directory or a ZIP/TAR archive: {source}")
+
+
+class _Worker:
+    """Per-process recognizer, decoder and answer matcher (models load once per worker)"""
+
+    def __init__(self, backend: STTBackend, language: str, target_dbfs: Optional[float]):
+        self.backend = backend
+        self.language = language
+        self.ingestor = AudioIngestor(target_rate=backend.sample_rate, target_dbfs=target_dbfs, max_workers=1)
+        self.matcher = get_answer_matcher(language)
+        self._archives: Dict[str, zipfile.ZipFile] = {}
+        backend.warm_up()
+
+    def read(self, item: Item) -> Tuple[str, bytes]:
+        kind, location, extra = item
+        if kind == 'path':
+            with open(location, 'rb') as f:
+                return extra, f.read()
+        if kind == 'zip':
+            archive = self._archives.get(location)
+            if archive is None:
+                archive = self._archives[location] = zipfile.ZipFile(location)
+            return extra, archive.read(extra)
+        return location, extra
+
+    def transcribe(self, item: Item, options: Optional[Dict[str, str]]) -> Dict:
+        start = time.perf_counter()
+        row = dict.fromkeys(RESULT_COLUMNS)
+        row.update(transcript="", worker=os.getpid())
+        try:
+            row['file'], data = self.read(item)
+            audio = self.ingestor.convert(data)
+            decoded = time.perf_counter()
+            row.update(container=audio.container, duration_s=round(audio.duration, 3),
+                       decode_ms=round((decoded - start) * 1000, 2))
+            try:
+                row['transcript'] = self.backend.transcribe_pcm(audio.pcm, audio.sample_rate, self.language).strip()
+            except SpeechNotRecognized:
+                row['error'] = "no speech recognized"
+            row['transcribe_ms'] = round((time.perf_counter() - decoded) * 1000, 2)
+            # Same mapping as VoiceHandler.parse_voice_answer
+            row['answer'] = self.matcher.match(row['transcript'], options) if row['transcript'] else None
+        except Exception as e:
+            row['error'] = str(e) or type(e).__name__
+        row['total_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return row
+
+
+_worker: Optional[_Worker] = None
+
+
+def _init_worker(backend: STTBackend, language: str, target_dbfs: Optional[float]):
+    global _worker
+    _worker = _Worker(backend, language, target_dbfs)
+
+
+def _transcribe_item(index: int, item: Item, options: Optional[Dict[str, str]]) -> Tuple[int, Dict]:
+    return index, _worker.transcribe(item, options)
+
+
+def transcribe_batch(source: str, backend: Union[str, STTBackend, None] = None,
+                     language: Optional[str] = None, options: Optional[Dict[str, str]] = None,
+                     workers: Optional[int] = None) -> List[Dict]:
+    """Transcribe every recording of a directory or archive and parse the spoken answers
+
+    Recordings are decoded and recognized on a pool of worker processes,
+    each loading the recognizer once. At most a few recordings per worker are
+    in flight, so large archives are not held in memory. Rows come back in
+    input order with per-file decode, recognition and total timings; files
+    that fail carry an 'error' instead of stopping the batch.
+    """
+    if not isinstance(backend, STTBackend):
+        backend = create_stt_backend(backend)
+    language = language or Config.SPEECH_RECOGNITION_LANGUAGE
+    target_dbfs = Config.INGEST_TARGET_DBFS if Config.INGEST_NORMALIZE_LOUDNESS else None
+    workers = workers or Config.BATCH_TRANSCRIBE_WORKERS or os.cpu_count() or 1
+    items = enumerate(find_recordings(source))
+
+    if workers == 1:
+        worker = _Worker(backend, language, target_dbfs)
+        return [worker.transcribe(item, options) for _, item in items]
+
+    rows: Dict[int, Dict] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(backend, language, target_dbfs)) as pool:
+        pending = set()
+        for index, item in items:
+            pending.add(pool.submit(_transcribe_item, index, item, options))
+            if len(pending) >= workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                rows.update(future.result() for future in done)
+        rows.update(future.result() for future in pending)
+    return [rows[index] for index in sorted(rows)]
+
+
+def write_results(rows: List[Dict], path: str) -> str:
+    """Write result rows to a .csv or .parquet file and return the path"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+    elif extension == '.parquet':
+        pd.DataFrame(rows, columns=RESULT_COLUMNS).to_parquet(path, index=False)
+    else:
+        raise ValueError(f"Unsupported output format '{extension}'. Use .csv or .parquet")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('source', help="directory, .zip or .tar(.gz) of recordings")
+    parser.add_argument('output', help="results file (.csv or .parquet)")
+    parser.add_argument('--backend', help=f"STT backend (default: {Config.STT_BACKEND})")
+    parser.add_argument('--language', help="recognition language (default: SPEECH_RECOGNITION_LANGUAGE)")
+    parser.add_argument('--workers', type=int, help="worker processes (default: BATCH_TRANSCRIBE_WORKERS or CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = transcribe_batch(args.source, args.backend, args.language, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    write_results(rows, args.output)
+
+    audio = sum(row['duration_s'] or 0 for row in rows)
+    failed = sum(1 for row in rows if row['error'])
+    print(f"✅ {len(rows)} recordings ({audio:.1f} s of audio) in {elapsed:.1f} s"
+          f"{f', RTF {elapsed / audio:.3f}' if audio else ''} -> {args.output}")
+    if failed:
+        print(f"⚠️ {failed} recordings could not be transcribed (see the error column)")
+
+
+if __name__ == "__main__":
+    main()
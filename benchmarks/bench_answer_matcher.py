@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark spoken-answer parsing over a large labelled transcript corpus
+
+Compares the previous substring-scanning parse_voice_answer with the
+precompiled AnswerMatcher on speed and accuracy. Transcripts are generated
+from templates (answers by letter, NATO word, ordinal and option text,
+fillers, and sentences that contain letters without naming an answer).
+"""
+
+import random
+import sys
+import time
+sys.path.append('.')
+
+from answer_matcher import get_answer_matcher
+
+TRANSCRIPTS = 50000
+SEED = 7
+
+OPTIONS = {'A': "The size of each parameter update", 'B': "The number of layers",
+           'C': "The batch size", 'D': "The activation function"}
+NATO = {'A': 'alpha', 'B': 'bravo', 'C': 'charlie', 'D': 'delta'}
+ORDINALS = {'A': 'first', 'B': 'second', 'C': 'third', 'D': 'fourth'}
+
+TEMPLATES = [
+    "{letter}", "option {letter}", "{nato}", "I think it's {letter} because it makes sense",
+    "my answer is {letter}", "the {ordinal} one", "I'll go with the {ordinal} option",
+    "um, {letter}.", "answer {letter} please", "it's {option_text}", "{option_text}",
+    "I'm fairly sure it's {letter}, because of the gradient",
+]
+DISTRACTORS = [
+    "I have absolutely no idea", "can you repeat the question", "what does that mean",
+    "it is a tricky one, let me think", "hmm I don't know about that",
+]
+
+def legacy_parse(voice_text):
+    """parse_voice_answer before the precompiled matcher"""
+    if not voice_text:
+        return None
+    voice_text = voice_text.upper().strip()
+    for option in ['A', 'B', 'C', 'D']:
+        if option in voice_text:
+            if voice_text == option or f" {option} " in voice_text or voice_text.startswith(f"{option} ") or voice_text.endswith(f" {option}"):
+                return option
+    spelled_options = {
+        'ALPHA': 'A', 'BRAVO': 'B', 'CHARLIE': 'C', 'DELTA': 'D',
+        'OPTION A': 'A', 'OPTION B': 'B', 'OPTION C': 'C', 'OPTION D': 'D'
+    }
+    for spelled, letter in spelled_options.items():
+        if spelled in voice_text:
+            return letter
+    return None
+
+def make_corpus(count):
+    rng = random.Random(SEED)
+    corpus = []
+    for _ in range(count):
+        if rng.random() < 0.15:
+            corpus.append((rng.choice(DISTRACTORS), None))
+            continue
+        letter = rng.choice(list(NATO))
+        text = rng.choice(TEMPLATES).format(letter=letter, nato=NATO[letter], ordinal=ORDINALS[letter],
+                                            option_text=OPTIONS[letter].lower())
+        corpus.append((text, letter))
+    return corpus
+
+def run(label, parse, corpus):
+    start = time.perf_counter()
+    answers = [parse(text) for text, _ in corpus]
+    elapsed = time.perf_counter() - start
+    correct = sum(answer == expected for answer, (_, expected) in zip(answers, corpus))
+    print(f"{label:<30} {elapsed / len(corpus) * 1e6:6.1f} µs/transcript | "
+          f"accuracy {correct / len(corpus):6.1%}")
+
+def main():
+    print("🗣️  Answer Matcher Benchmark")
+    print("=" * 40)
+    corpus = make_corpus(TRANSCRIPTS)
+    print(f"{len(corpus)} transcripts")
+
+    start = time.perf_counter()
+    matcher = get_answer_matcher('en-US')
+    print(f"matcher compiled in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    run("legacy substring scan", legacy_parse, corpus)
+    run("AnswerMatcher", matcher.match, corpus)
+    run("AnswerMatcher + option texts", lambda text: matcher.match(text, OPTIONS), corpus)
+
+if __name__ == "__main__":
+    main()
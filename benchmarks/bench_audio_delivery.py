@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark memory allocated per clip on each audio delivery path
+
+Synthesis is replaced by a fixed 48 KB clip so only the delivery path is
+measured (gTTS needs network access). The playback rows run
+VoiceHandler.play_audio_bytes inside a Streamlit script run (AppTest), so
+st.audio really hands the clip to the runtime's media file manager, the
+inline player really base64-encodes it into the page, and the audio server
+really publishes it. Tracing restarts for every clip, which also works on
+Pythons without tracemalloc.reset_peak.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+sys.path.append('.')
+
+from audio_cache import AudioCache
+from tts_backends import TTSBackend
+from voice_handler import VoiceHandler
+
+CLIP_BYTES = 48 * 1024
+CLIPS = 50
+
+class FixedClipBackend(TTSBackend):
+    name = "fixed"
+
+    def __init__(self):
+        self.clip = os.urandom(CLIP_BYTES)
+
+    def synthesize(self, text, language, slow=False):
+        return self.clip
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def make_handler() -> VoiceHandler:
+    return QuietVoiceHandler(audio_cache=AudioCache(memory_bytes=64 * 1024 * 1024),
+                             tts_backend=FixedClipBackend())
+
+def measure(deliver) -> dict:
+    """Run deliver(i) for every clip and return traced allocations and time per clip"""
+    peak_per_clip = 0
+    retained = 0
+    start = time.perf_counter()
+    for i in range(CLIPS):
+        tracemalloc.start()
+        deliver(i)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_per_clip = max(peak_per_clip, peak)
+        retained += current
+    elapsed = time.perf_counter() - start
+    return {'peak_kb': peak_per_clip / 1024, 'retained_kb': retained / CLIPS / 1024,
+            'ms': elapsed / CLIPS * 1000}
+
+def report(label: str, result: dict):
+    print(f"{label:<34} peak {result['peak_kb']:7.1f} KB/clip, "
+          f"retained {result['retained_kb']:6.1f} KB/clip, {result['ms']:5.2f} ms/clip")
+
+def playback_app():
+    """AppTest script: play every clip with the delivery path named in session state"""
+    import os
+    import sys
+    sys.path[:0] = [os.getcwd(), os.path.join(os.getcwd(), 'benchmarks')]
+    import streamlit as st
+    from bench_audio_delivery import play_clips
+    st.session_state['result'] = play_clips(st.session_state['path'])
+
+def play_clips(path: str) -> dict:
+    """Deliver distinct clips through play_audio_bytes on one delivery path"""
+    import voice_handler
+    from config import Config
+
+    handler = make_handler()
+    clips = [os.urandom(CLIP_BYTES) for _ in range(CLIPS)]
+    voice_handler.ST_AUDIO_AUTOPLAY = path != 'inline'
+    Config.AUDIO_SERVER_ENABLED = path == 'server'
+    Config.AUDIO_SERVER_PORT = 0
+    # Warm up lazy imports, the duration index and the server outside the measurement
+    handler.play_audio_bytes(os.urandom(CLIP_BYTES), autoplay=True)
+    return measure(lambda i: handler.play_audio_bytes(clips[i], autoplay=True))
+
+def run_playback(path: str) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_function(playback_app, default_timeout=120)
+    app.session_state['path'] = path
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    return app.session_state['result']
+
+def main():
+    print("🔊 Audio Delivery Benchmark")
+    print("=" * 40)
+    print(f"{CLIPS} clips of {CLIP_BYTES // 1024} KB each")
+
+    handler = make_handler()
+    temp_files = []
+    texts = [f"Question {i}: what is the capital of France?" for i in range(CLIPS)]
+
+    def file_path_delivery(i):
+        path = handler.text_to_speech(texts[i])
+        temp_files.append(path)
+        handler.get_audio_html(path)
+
+    def bytes_html_delivery(i):
+        handler.get_audio_html(handler.text_to_speech_bytes(texts[i]))
+
+    print("\nRendering the player HTML (no Streamlit run)")
+    handler.audio_cache = AudioCache(memory_bytes=0)
+    report("temp file + re-read + base64", measure(file_path_delivery))
+    handler.cleanup_temp_files(temp_files)
+
+    handler.audio_cache = AudioCache(memory_bytes=64 * 1024 * 1024)
+    report("bytes + base64 (cold cache)", measure(bytes_html_delivery))
+    report("bytes + base64 (warm cache)", measure(bytes_html_delivery))
+
+    print("\nplay_audio_bytes inside a Streamlit script run")
+    for label, path in (("st.audio (media file manager)", 'st.audio'),
+                        ("inline base64 player", 'inline'),
+                        ("audio server URL", 'server')):
+        try:
+            report(label, run_playback(path))
+        except Exception as e:
+            print(f"{label:<34} ❌ {str(e)[:60]}")
+
+if __name__ == "__main__":
+    main()
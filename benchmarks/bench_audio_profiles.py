@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Compare audio encoding profiles on bytes per question and encode CPU time
+
+Question clips are synthesized with the configured TTS backend (pass a
+backend name to override, e.g. python benchmarks/bench_audio_profiles.py
+espeak) and encoded with every profile. When that backend cannot run here
+(gTTS offline, no espeak) the benchmark falls back to espeak, then to the
+silent backend. CPU time is that of the ffmpeg child processes; the second
+pass shows the cost of a cached encode.
+"""
+
+import resource
+import sys
+import time
+sys.path.append('.')
+
+from audio_cache import AudioCache
+from audio_profiles import PROFILES, AudioTranscoder
+from config import Config
+from tts_backends import create_tts_backend
+from voice_handler import VoiceHandler
+
+QUESTIONS = [
+    {
+        'question': "What does a learning rate control in gradient descent?",
+        'options': {'A': "The size of each parameter update", 'B': "The number of layers",
+                    'C': "The batch size", 'D': "The activation function"}
+    },
+    {
+        'question': "Which data structure gives constant-time average lookups by key?",
+        'options': {'A': "A linked list", 'B': "A hash table",
+                    'C': "A binary heap", 'D': "A sorted array"}
+    },
+    {
+        'question': "Which HTTP status code tells a client that a resource was not found?",
+        'options': {'A': "200", 'B': "301", 'C': "404", 'D': "500"}
+    },
+]
+
+def child_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+def synthesize_questions(requested: str):
+    """Return (backend, clips) from the first backend that can synthesize here"""
+    for name in dict.fromkeys([requested, 'espeak', 'silent']):
+        backend = create_tts_backend(name)
+        if not backend.is_available():
+            print(f"⏭️  TTS backend {name} is not available on this system")
+            continue
+        try:
+            return backend, [backend.synthesize(VoiceHandler._question_text(q), Config.TTS_LANGUAGE)
+                             for q in QUESTIONS]
+        except Exception as e:
+            print(f"⏭️  Synthesis with {name} failed: {str(e)[:60]}")
+
+def main():
+    print("📦 Audio Encoding Profile Benchmark")
+    print("=" * 40)
+    backend, clips = synthesize_questions(sys.argv[1] if len(sys.argv) > 1 else Config.TTS_BACKEND)
+    print(f"{len(clips)} questions synthesized with {backend.name} ({backend.mime})")
+
+    transcoder = AudioTranscoder(AudioCache(memory_bytes=64 * 1024 * 1024))
+    original = sum(len(clip) for clip in clips) / len(clips)
+    for profile in PROFILES.values():
+        if not profile.is_available():
+            print(f"{profile.name:<11} ⏭️  needs ffmpeg")
+            continue
+        cpu_before, start = child_cpu_seconds(), time.perf_counter()
+        encoded = [transcoder.encode(clip, backend.mime, profile.name)[0] for clip in clips]
+        cpu = child_cpu_seconds() - cpu_before
+        wall = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for clip in clips:
+            transcoder.encode(clip, backend.mime, profile.name)
+        cached = time.perf_counter() - start
+
+        size = sum(len(clip) for clip in encoded) / len(encoded)
+        print(f"{profile.name:<11} {size / 1024:7.1f} KB/question ({size / original:5.0%}) | "
+              f"encode CPU {cpu / len(clips) * 1000:6.1f} ms, wall {wall / len(clips) * 1000:6.1f} ms | "
+              f"cached {cached / len(clips) * 1000:5.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark the LLM-free cloze question generator on a 100-page document
+"""
+
+import os
+import sys
+import time
+sys.path.append('.')
+
+import numpy as np
+
+from cloze_generator import ClozeQuestionGenerator
+
+WORDS_PER_PAGE = 500
+SAMPLE_PATH = os.path.join('assets', 'sample_documents', 'machine_learning_basics.txt')
+
+def build_document(pages: int = 100, seed: int = 0) -> str:
+    """Build a synthetic document by recombining the sample document's vocabulary"""
+    with open(SAMPLE_PATH, encoding='utf-8') as f:
+        words = f.read().split()
+
+    rng = np.random.default_rng(seed)
+    sentences = []
+    total = 0
+    while total < pages * WORDS_PER_PAGE:
+        length = int(rng.integers(10, 25))
+        start = int(rng.integers(0, len(words) - length))
+        sentence = ' '.join(words[start:start + length]).rstrip('.:') + '.'
+        sentences.append(sentence[0].upper() + sentence[1:])
+        total += length
+    return '\n'.join(' '.join(sentences[i:i + 5]) for i in range(0, len(sentences), 5))
+
+def main():
+    print("⚡ Cloze Generator Benchmark")
+    print("=" * 40)
+
+    document = build_document()
+    print(f"Document: {len(document.split())} words, {len(document)} characters")
+
+    generator = ClozeQuestionGenerator()
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        questions = generator.generate(document, num_questions=50)
+        timings.append(time.perf_counter() - start)
+
+    print(f"Questions generated: {len(questions)}")
+    print(f"Best: {min(timings) * 1000:.1f} ms, median: {sorted(timings)[2] * 1000:.1f} ms")
+    print("✅ Under one second" if sorted(timings)[2] < 1.0 else "❌ Slower than one second")
+
+if __name__ == "__main__":
+    main()
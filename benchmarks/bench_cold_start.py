@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Measure cold start time and memory of the voice subsystem, voice disabled vs enabled
+
+Each run is a fresh interpreter. "disabled" imports voice_handler and builds a
+VoiceHandler the way app.initialize_components does; "enabled" then also
+brings up everything the first voice question needs (engines, recognizer,
+microphone probe, decode pool, scratch space, transcoder), which is what the
+constructor used to do eagerly. Peak RSS is the child's ru_maxrss.
+"""
+
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+sys.path.append('.')
+
+RUNS = 5
+HEAVY_MODULES = ['gtts', 'speech_recognition', 'pydub', 'pyaudio', 'vosk']
+
+def child(mode: str):
+    start = time.perf_counter()
+    import streamlit  # noqa: F401 (always loaded by the app, measured separately)
+    base = time.perf_counter()
+    from audio_cache import AudioCache
+    from capabilities import load_optional
+    from voice_handler import VoiceHandler
+
+    class QuietVoiceHandler(VoiceHandler):
+        def _check_dependencies(self):
+            pass
+
+    imported = time.perf_counter()
+    handler = QuietVoiceHandler(audio_cache=AudioCache(disk_dir=None))
+    if mode == 'enabled':
+        handler.prepare_voice()
+        handler.stt_backend.is_available()
+        for attr in ('recognizer', 'microphone', 'ingestor', 'scratch', 'transcoder'):
+            getattr(handler, attr)
+        if handler.tts_backend.name == 'gtts':
+            load_optional('gtts')
+        load_optional('pydub')
+    ready = time.perf_counter()
+    print(json.dumps({
+        'streamlit_ms': (base - start) * 1000,
+        'import_ms': (imported - base) * 1000,
+        'init_ms': (ready - imported) * 1000,
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'engines': [m for m in HEAVY_MODULES if m in sys.modules],
+    }))
+
+def measure(mode: str) -> dict:
+    samples = []
+    for _ in range(RUNS):
+        result = subprocess.run([sys.executable, __file__, '--child', mode],
+                                capture_output=True, text=True, timeout=120)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip()[-200:])
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    summary = {key: statistics.median(s[key] for s in samples)
+               for key in ('streamlit_ms', 'import_ms', 'init_ms', 'rss_mb')}
+    summary['engines'] = samples[-1]['engines']
+    return summary
+
+def main():
+    print("🥶 Voice Cold Start Benchmark")
+    print("=" * 40)
+    print(f"median of {RUNS} fresh interpreters (streamlit import excluded from the voice numbers)")
+    results = {}
+    for mode in ('disabled', 'enabled'):
+        try:
+            results[mode] = r = measure(mode)
+        except Exception as e:
+            print(f"❌ {mode}: {str(e)[:80]}")
+            return
+        print(f"voice {mode:<8} import {r['import_ms']:6.1f} ms | init {r['init_ms']:6.1f} ms | "
+              f"total {r['import_ms'] + r['init_ms']:6.1f} ms | peak RSS {r['rss_mb']:6.1f} MB | "
+              f"engines loaded: {', '.join(r['engines']) or 'none'}")
+    off, on = results['disabled'], results['enabled']
+    saved = on['import_ms'] + on['init_ms'] - off['import_ms'] - off['init_ms']
+    print(f"Voice off saves {saved:.1f} ms and {on['rss_mb'] - off['rss_mb']:.1f} MB per process "
+          f"(streamlit itself: {off['streamlit_ms']:.0f} ms)")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        child(sys.argv[2])
+    else:
+        main()
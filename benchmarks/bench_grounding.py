@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Benchmark the grounding filter on a 50-question batch
+"""
+
+import sys
+import time
+sys.path.append('.')
+
+from bench_cloze_generator import build_document
+from cloze_generator import ClozeQuestionGenerator
+from question_grounding import GroundingScorer
+
+def main():
+    print("🔎 Grounding Filter Benchmark")
+    print("=" * 40)
+
+    document = build_document()
+    questions = ClozeQuestionGenerator().generate(document, num_questions=50)
+    print(f"Document: {len(document.split())} words, batch: {len(questions)} questions")
+
+    scorer = GroundingScorer()
+    start = time.perf_counter()
+    scorer.index(document)
+    print(f"Index build (once per document): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    timings = []
+    for _ in range(20):
+        start = time.perf_counter()
+        kept, rejected = scorer.filter_questions(questions, document)
+        timings.append(time.perf_counter() - start)
+
+    median = sorted(timings)[len(timings) // 2]
+    print(f"Kept: {len(kept)}, rejected: {len(rejected)}")
+    print(f"Filter 50 questions: best {min(timings) * 1000:.1f} ms, median {median * 1000:.1f} ms")
+    print("✅ Under 50 ms" if median < 0.05 else "❌ Slower than 50 ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark time-to-first-audio of whole-clip versus sentence-chunked TTS
+
+gTTS needs network access, so synthesis is simulated with a latency model
+of a fixed round trip plus a per-character cost.
+"""
+
+import http.client
+import sys
+import time
+sys.path.append('.')
+
+from audio_cache import AudioCache
+from audio_server import AudioServer
+from tts_backends import TTSBackend
+from voice_handler import VoiceHandler
+
+ROUND_TRIP = 0.25
+PER_CHAR = 0.004
+
+QUESTION = {
+    'question': "Which property of gradient descent explains why a learning rate that is "
+                "too large makes the training loss oscillate or diverge?",
+    'options': {
+        'A': "The update overshoots the minimum along directions of high curvature",
+        'B': "The gradient vanishes once the weights become large",
+        'C': "Mini-batches are sampled without replacement",
+        'D': "The loss surface becomes convex near a saddle point"
+    },
+    'correct_answer': 'A',
+    'explanation': "Steps larger than the curvature allows jump across the valley."
+}
+
+class SimulatedBackend(TTSBackend):
+    name = "simulated"
+
+    def synthesize(self, text, language, slow=False):
+        time.sleep(ROUND_TRIP + PER_CHAR * len(text))
+        return b'\xff\xfb\x90\x00' + text.encode()
+
+class SimulatedVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def fresh_handler() -> SimulatedVoiceHandler:
+    return SimulatedVoiceHandler(audio_cache=AudioCache(disk_dir=None),
+                                 tts_backend=SimulatedBackend())
+
+def main():
+    print("⏱️  Progressive TTS Benchmark")
+    print("=" * 40)
+    text = VoiceHandler._question_text(QUESTION)
+    print(f"Question text: {len(text)} chars, simulated latency "
+          f"{ROUND_TRIP * 1000:.0f} ms + {PER_CHAR * 1000:.0f} ms/char")
+
+    handler = fresh_handler()
+    start = time.perf_counter()
+    handler.text_to_speech_bytes(text)
+    whole = time.perf_counter() - start
+    print(f"Whole clip:      first audio {whole * 1000:6.0f} ms, complete {whole * 1000:6.0f} ms")
+
+    handler = fresh_handler()
+    start = time.perf_counter()
+    futures = handler.render_segments(text)
+    futures[0].result()
+    first = time.perf_counter() - start
+    for future in futures:
+        future.result()
+    complete = time.perf_counter() - start
+    print(f"Chunked ({len(futures)} seg): first audio {first * 1000:6.0f} ms, "
+          f"complete {complete * 1000:6.0f} ms")
+
+    # Same measurement through the audio server's stream endpoint
+    handler = fresh_handler()
+    server = AudioServer(host='127.0.0.1', port=0)
+    server.start()
+    try:
+        start = time.perf_counter()
+        url = server.publish_stream(handler._tts_cache_key(text), handler.render_segments(text))
+        conn = http.client.HTTPConnection('127.0.0.1', server.port)
+        conn.request('GET', url.split(str(server.port), 1)[1])
+        response = conn.getresponse()
+        response.read1(1)
+        first_byte = time.perf_counter() - start
+        response.read()
+        conn.close()
+        print(f"Stream endpoint: first byte  {first_byte * 1000:6.0f} ms")
+    finally:
+        server.stop()
+
+    print(f"✅ Time to first audio reduced {whole / first:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark question dedup lookups as the question bank grows
+"""
+
+import sys
+import time
+sys.path.append('.')
+
+import numpy as np
+
+from question_dedup import QuestionDedupIndex
+
+def random_stems(count: int, seed: int = 0):
+    """Generate synthetic question stems over a 5,000 word pseudo-vocabulary"""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    vocab_rng = np.random.default_rng(42)
+    vocab = [''.join(vocab_rng.choice(letters, size=int(vocab_rng.integers(4, 10))))
+             for _ in range(5000)]
+    templates = ["What is the role of {} in {}?", "Which statement about {} is true for {}?",
+                 "How does {} affect {}?", "Why is {} important when studying {}?"]
+    for _ in range(count):
+        words = [vocab[i] for i in rng.integers(0, len(vocab), size=int(rng.integers(3, 7)))]
+        template = templates[int(rng.integers(0, len(templates)))]
+        yield template.format(' '.join(words[:-1]), words[-1])
+
+def main():
+    print("♻️ Question Dedup Benchmark")
+    print("=" * 40)
+
+    index = QuestionDedupIndex()
+    stems = random_stems(300_000)
+    probes = list(random_stems(1_000, seed=1))
+
+    for target in (10_000, 100_000, 300_000):
+        start = time.perf_counter()
+        while len(index) < target:
+            index.add(next(stems))
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for probe in probes:
+            index.find_duplicate(probe)
+        lookup = (time.perf_counter() - start) / len(probes)
+        print(f"{len(index):>7} stems: +{build:.1f}s to grow, {lookup * 1e6:.0f} µs per lookup")
+
+if __name__ == "__main__":
+    main()
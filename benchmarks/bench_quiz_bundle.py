@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Measure how fast a 100-question voice quiz starts from a bundle vs from exported JSON
+
+"json" is today's replay path: load the questions and render the first
+question's audio before it can play (with a simulated 150 ms per TTS call,
+roughly a gTTS round trip). "bundle" memory-maps the bundle and serves the
+first clip from it. "eager" reads the whole bundle into memory first, to
+show what the memory map saves.
+"""
+
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+sys.path.append('.')
+
+from audio_cache import AudioCache
+from quiz_bundle import QuizBundle, write_bundle
+from tts_backends import SilentBackend
+from voice_handler import VoiceHandler
+
+QUESTIONS = 100
+RUNS = 5
+TTS_LATENCY = 0.15
+
+class SlowBackend(SilentBackend):
+    """Silent clips with a network-like synthesis delay"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def synthesize(self, text, language, slow=False):
+        self.calls += 1
+        time.sleep(TTS_LATENCY)
+        return super().synthesize(text, language, slow)
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def make_questions():
+    return [{
+        'question': f"In the reading, what is the main reason behind observation number {i}?",
+        'options': {'A': "Temperature", 'B': "Pressure", 'C': "Humidity", 'D': "Altitude"},
+        'correct_answer': 'B',
+        'explanation': f"Observation {i} follows from the pressure gradient described in section {i % 7}."
+    } for i in range(QUESTIONS)]
+
+def make_handler():
+    return QuietVoiceHandler(audio_cache=AudioCache(disk_dir=None), tts_backend=SlowBackend())
+
+def build_files(root, questions):
+    exporter = QuietVoiceHandler(audio_cache=AudioCache(disk_dir=None), tts_backend=SilentBackend())
+    bundle_path = os.path.join(root, 'quiz.vqb')
+    write_bundle(bundle_path, questions, exporter.bundle_clips(questions), {'difficulty': 'medium'})
+    json_path = os.path.join(root, 'quiz.json')
+    with open(json_path, 'w') as f:
+        json.dump({'questions': questions}, f)
+    return json_path, bundle_path
+
+def start_from_json(path):
+    handler = make_handler()
+    with open(path) as f:
+        questions = json.load(f)['questions']
+    audio = handler.text_to_speech_bytes(handler._question_text(questions[0]))
+    return audio, handler.tts_backend.calls
+
+def start_from_bundle(path, eager=False):
+    handler = make_handler()
+    if eager:
+        with open(path, 'rb') as f:
+            f.read()
+    bundle = QuizBundle(path)
+    handler.attach_bundle(bundle)
+    audio = handler.get_ready_question_audio(bundle.questions[0])
+    bundle.close()
+    return audio, handler.tts_backend.calls
+
+def measure(start, path, **kwargs):
+    samples, calls = [], 0
+    for _ in range(RUNS):
+        began = time.perf_counter()
+        audio, calls = start(path, **kwargs)
+        samples.append((time.perf_counter() - began) * 1000)
+        assert audio
+    return statistics.median(samples), calls
+
+def main():
+    print("📦 Quiz Bundle Benchmark")
+    print("=" * 40)
+    questions = make_questions()
+    with tempfile.TemporaryDirectory() as root:
+        json_path, bundle_path = build_files(root, questions)
+        size_mb = os.path.getsize(bundle_path) / 1024 / 1024
+        print(f"{QUESTIONS} questions, bundle {size_mb:.1f} MB, simulated TTS {TTS_LATENCY * 1000:.0f} ms/call")
+        for label, start, path, kwargs in (
+            ("json + tts", start_from_json, json_path, {}),
+            ("bundle (eager read)", start_from_bundle, bundle_path, {'eager': True}),
+            ("bundle (mmap)", start_from_bundle, bundle_path, {}),
+        ):
+            ms, calls = measure(start, path, **kwargs)
+            print(f"{label:<20} first clip ready in {ms:8.2f} ms | TTS calls {calls}")
+
+if __name__ == "__main__":
+    main()
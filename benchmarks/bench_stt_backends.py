@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Measure speech-to-text real-time factor and answer accuracy on WAV fixtures
+
+Each backend runs twice: full transcription parsed with parse_voice_answer,
+and the constrained answer grammar used by VoiceHandler.recognize_answer.
+
+Fixtures are WAV files in benchmarks/fixtures/stt (or the directory given
+with --fixtures) whose names start with the expected answer letter, e.g.
+"b_option_b.wav". Record your own, or synthesize a set with an offline TTS
+backend:
+
+    python benchmarks/bench_stt_backends.py --make-fixtures espeak
+    python benchmarks/bench_stt_backends.py vosk
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+import wave
+sys.path.append('.')
+
+from answer_grammar import build_answer_grammar, grammar_phrases, match_answer
+from config import Config
+from stt_backends import STT_BACKENDS, SpeechNotRecognized, create_stt_backend
+from tts_backends import SilentBackend, create_tts_backend
+from voice_handler import VoiceHandler
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'stt')
+NATO = {'A': 'alpha', 'B': 'bravo', 'C': 'charlie', 'D': 'delta'}
+PHRASES = ["{letter}", "option {letter}", "I think the answer is {letter}",
+           "my answer is {nato}"]
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def make_fixtures(tts_name: str, directory: str):
+    backend = create_tts_backend(tts_name)
+    if not backend.is_available() or backend.mime != 'audio/wav':
+        print(f"❌ {tts_name} cannot synthesize WAV fixtures on this system")
+        return
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for letter, nato in NATO.items():
+        for i, phrase in enumerate(PHRASES):
+            text = phrase.format(letter=letter, nato=nato)
+            path = os.path.join(directory, f"{letter.lower()}_{i}.wav")
+            with open(path, 'wb') as f:
+                f.write(backend.synthesize(text, Config.TTS_LANGUAGE))
+            count += 1
+    print(f"✅ Wrote {count} fixtures to {directory}")
+
+def load_fixtures(directory: str):
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith('.wav') or name[0].upper() not in NATO:
+            continue
+        with open(os.path.join(directory, name), 'rb') as f:
+            data = f.read()
+        with wave.open(io.BytesIO(data), 'rb') as wav:
+            duration = wav.getnframes() / wav.getframerate()
+        fixtures.append((name, name[0].upper(), data, duration))
+    return fixtures
+
+def bench_backend(name: str, fixtures, handler: VoiceHandler):
+    backend = create_stt_backend(name)
+    if not backend.is_available():
+        print(f"{name:<7} ⏭️  not available on this system")
+        return
+
+    start = time.perf_counter()
+    backend.warm_up()
+    warm_up = time.perf_counter() - start
+
+    grammar = build_answer_grammar()
+    phrases = grammar_phrases(grammar)
+
+    def full(data):
+        try:
+            transcript = backend.transcribe(data, Config.SPEECH_RECOGNITION_LANGUAGE)
+        except SpeechNotRecognized:
+            return None
+        return handler.parse_voice_answer(transcript)
+
+    def spot(data):
+        try:
+            transcript, confidence = backend.spot(data, Config.SPEECH_RECOGNITION_LANGUAGE, phrases)
+        except SpeechNotRecognized:
+            return None
+        return match_answer(transcript, grammar, confidence)['answer']
+
+    audio = sum(duration for *_, duration in fixtures)
+    print(f"{name:<7} model load {warm_up * 1000:.0f} ms")
+    for mode, recognize in (("full", full), ("grammar", spot)):
+        processing = 0.0
+        correct = 0
+        for _, expected, data, _ in fixtures:
+            start = time.perf_counter()
+            try:
+                answer = recognize(data)
+            except Exception as e:
+                print(f"  {mode:<8} ❌ failed: {str(e)[:60]}")
+                break
+            processing += time.perf_counter() - start
+            correct += answer == expected
+        else:
+            print(f"  {mode:<8} RTF {processing / audio:5.3f} | accuracy {correct}/{len(fixtures)} "
+                  f"({correct / len(fixtures):.0%})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('backends', nargs='*', help="STT backends to run (default: all)")
+    parser.add_argument('--fixtures', default=FIXTURE_DIR, help="directory of WAV fixtures")
+    parser.add_argument('--make-fixtures', metavar='TTS_BACKEND',
+                        help="synthesize fixtures with a WAV-producing TTS backend and exit")
+    args = parser.parse_args()
+
+    print("🎙️  Speech-to-Text Benchmark")
+    print("=" * 40)
+    if args.make_fixtures:
+        make_fixtures(args.make_fixtures, args.fixtures)
+        return
+
+    fixtures = load_fixtures(args.fixtures) if os.path.isdir(args.fixtures) else []
+    if not fixtures:
+        print(f"⏭️  No WAV fixtures in {args.fixtures}; record some or use --make-fixtures espeak")
+        return
+    print(f"{len(fixtures)} fixtures, {sum(f[3] for f in fixtures):.1f} s of audio")
+
+    handler = QuietVoiceHandler(tts_backend=SilentBackend())
+    for name in args.backends or list(STT_BACKENDS):
+        bench_backend(name, fixtures, handler)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Benchmark hierarchical summarization of a 1000-page document
+"""
+
+import sys
+import time
+sys.path.append('.')
+
+from bench_cloze_generator import build_document
+from summarizer import HierarchicalSummarizer
+
+def main():
+    print("📚 Hierarchical Summarizer Benchmark")
+    print("=" * 40)
+
+    document = build_document(pages=1000)
+    print(f"Document: {len(document.split())} words, {len(document)} characters")
+
+    summarizer = HierarchicalSummarizer()
+    start = time.perf_counter()
+    result = summarizer.summarize(document)
+    cold = time.perf_counter() - start
+    print(f"Levels: {[len(level) for level in result['levels']]}")
+    print(f"Cold summarization: {cold:.2f} s")
+
+    start = time.perf_counter()
+    context = summarizer.build_context(document, topic="decision trees", budget_chars=3000)
+    print(f"Prompt context: {len(context)} characters in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms (cached levels)")
+
+    # A fresh summarizer still reuses unchanged chunk summaries from a shared cache
+    fresh = HierarchicalSummarizer()
+    fresh._cache = summarizer._cache
+    start = time.perf_counter()
+    fresh.summarize(document)
+    print(f"Rebuild from chunk cache: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Compare TTS backends on a fixed question set
+
+For every available backend this reports time-to-first-byte (the first
+segment of a question), the latency of whole question clips, and throughput
+when a quiz's segments are rendered on a thread pool. Pass backend names as
+arguments to limit the run, e.g. python benchmarks/bench_tts_backends.py espeak
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append('.')
+
+from audio_segments import speech_segments
+from config import Config
+from tts_backends import TTS_BACKENDS, create_tts_backend
+from voice_handler import VoiceHandler
+
+QUESTIONS = [
+    {
+        'question': "What does a learning rate control in gradient descent?",
+        'options': {'A': "The size of each parameter update", 'B': "The number of layers",
+                    'C': "The batch size", 'D': "The activation function"}
+    },
+    {
+        'question': "Which data structure gives constant-time average lookups by key?",
+        'options': {'A': "A linked list", 'B': "A hash table",
+                    'C': "A binary heap", 'D': "A sorted array"}
+    },
+    {
+        'question': "Why does photosynthesis matter for the carbon cycle?",
+        'options': {'A': "It releases methane", 'B': "It stores nitrogen in soil",
+                    'C': "It removes carbon dioxide from the air", 'D': "It melts polar ice"}
+    },
+    {
+        'question': "What is the main purpose of an index in a relational database?",
+        'options': {'A': "Encrypting rows", 'B': "Speeding up lookups and joins",
+                    'C': "Compressing backups", 'D': "Enforcing user permissions"}
+    },
+    {
+        'question': "Which HTTP status code tells a client that a resource was not found?",
+        'options': {'A': "200", 'B': "301", 'C': "404", 'D': "500"}
+    },
+]
+
+WORKERS = 4
+
+def bench_backend(name: str):
+    backend = create_tts_backend(name)
+    if not backend.is_available():
+        print(f"{name:<8} ⏭️  not available on this system")
+        return
+
+    texts = [VoiceHandler._question_text(q) for q in QUESTIONS]
+    segments = [segment for text in texts for segment in speech_segments(text)]
+    language = Config.TTS_LANGUAGE
+
+    try:
+        ttfb = []
+        for text in texts:
+            start = time.perf_counter()
+            backend.synthesize(speech_segments(text)[0], language)
+            ttfb.append(time.perf_counter() - start)
+
+        whole = []
+        total_bytes = 0
+        for text in texts:
+            start = time.perf_counter()
+            total_bytes += len(backend.synthesize(text, language))
+            whole.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            list(pool.map(lambda segment: backend.synthesize(segment, language), segments))
+        pooled = time.perf_counter() - start
+    except Exception as e:
+        print(f"{name:<8} ❌ failed: {str(e)[:60]}")
+        return
+
+    median_ttfb = sorted(ttfb)[len(ttfb) // 2]
+    median_whole = sorted(whole)[len(whole) // 2]
+    print(f"{name:<8} TTFB {median_ttfb * 1000:7.1f} ms | question clip {median_whole * 1000:7.1f} ms | "
+          f"{len(segments) / pooled:6.1f} segments/s ({WORKERS} workers) | "
+          f"{total_bytes / len(texts) / 1024:6.1f} KB/question ({backend.mime})")
+
+def main():
+    print("🗣️  TTS Backend Benchmark")
+    print("=" * 40)
+    print(f"{len(QUESTIONS)} questions, medians per question")
+    names = sys.argv[1:] or list(TTS_BACKENDS)
+    for name in names:
+        bench_backend(name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import importlib
+import importlib.util
+import threading
+from functools import lru_cache
+from types import ModuleType
+from typing import Dict, Optional
+
+
+@lru_cache(maxsize=None)
+def module_available(name: str) -> bool:
+    """Return True if an optional module is installed, without importing it
+
+    Probing only looks the module up on sys.path, so it costs microseconds
+    where importing speech_recognition, gTTS or vosk costs tens of
+    milliseconds each. Results are cached for the life of the process.
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+_loaded: Dict[str, Optional[ModuleType]] = {}
+_lock = threading.Lock()
+
+
+def load_optional(name: str) -> Optional[ModuleType]:
+    """Import an optional module on first use; None if it is missing or fails to import
+
+    The outcome is cached, so a broken install is attempted only once.
+    """
+    with _lock:
+        if name not in _loaded:
+            module = None
+            if module_available(name):
+                try:
+                    module = importlib.import_module(name)
+                except Exception:
+                    module = None
+            _loaded[name] = module
+        return _loaded[name]
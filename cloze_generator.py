@@ -0,0 +1,243 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+LETTERS = ['A', 'B', 'C', 'D']
+
+STOPWORDS = frozenset("""
+    a about above after again against all along also although am among an and
+    another any are as at be because been before being below between both but by
+    can could did do does doing down during each either every few for from
+    further had has have having he her here hers herself him himself his how i
+    if in into is it its itself just many may more most much must my myself
+    neither no nor not of off on once only or other ought our ours ourselves out
+    over own same she should since so some such than that the their theirs them
+    themselves then there these they this those through to too under until up
+    upon very was we were what when where which while who whom whose why will
+    with within without would you your yours yourself yourselves
+    called use used using uses include includes including example examples
+    different various several often usually make makes made well like one two
+""".split())
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+|\n+')
+_TOKEN = re.compile(r"[A-Za-z][A-Za-z\-']*[A-Za-z]|[A-Za-z]")
+
+
+class ClozeQuestionGenerator:
+    """Builds fill-in-the-blank multiple-choice questions without an LLM
+
+    Key terms (single words and two-word phrases made of content words) are
+    scored with TF-IDF over the document's sentences. Each question blanks the
+    best term of a high-scoring sentence and draws its distractors from other
+    high-scoring terms of the same document. All scoring runs on NumPy arrays,
+    so a 100-page document is processed in well under a second.
+    """
+
+    def __init__(self, max_terms: int = 400, min_word_length: int = 4,
+                 min_sentence_length: int = 40, max_sentence_length: int = 300,
+                 seed: int = 0):
+        self.max_terms = max_terms
+        self.min_word_length = min_word_length
+        self.min_sentence_length = min_sentence_length
+        self.max_sentence_length = max_sentence_length
+        self.seed = seed
+
+    def extract_key_terms(self, text: str, top_k: int = 20) -> List[Tuple[str, float]]:
+        """Return the top TF-IDF key terms of a text with their scores"""
+        _, terms, scores, _, _ = self._score_terms(self._split_sentences(text))
+        order = np.argsort(-scores, kind='stable')[:top_k]
+        return [(terms[i], float(scores[i])) for i in order]
+
+    def generate(self, text: str, num_questions: int = 5, difficulty: str = "medium",
+                 topic: str = "", avoid: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Generate cloze questions in the schema QuizManager consumes, skipping those in avoid"""
+        avoid = set(avoid or ())
+        sentences = self._split_sentences(text)
+        sentences, terms, scores, pair_sent, pair_term = self._score_terms(sentences)
+        if len(terms) < 4:
+            return []
+
+        # Keep only the top scoring terms as answer and distractor candidates
+        top = np.argsort(-scores, kind='stable')[:self.max_terms]
+        keep = np.zeros(len(terms), dtype=bool)
+        keep[top] = True
+        mask = keep[pair_term]
+        pair_sent, pair_term = pair_sent[mask], pair_term[mask]
+        if len(pair_sent) == 0:
+            return []
+
+        # Best term per sentence: sort pairs by (sentence, -score) and take the first of each run
+        order = np.lexsort((-scores[pair_term], pair_sent))
+        pair_sent, pair_term = pair_sent[order], pair_term[order]
+        first = np.r_[True, pair_sent[1:] != pair_sent[:-1]]
+        sent_ids, best_terms = pair_sent[first], pair_term[first]
+
+        # Rank sentences by the score of their best term, one question per answer term
+        ranking = np.argsort(-scores[best_terms], kind='stable')
+        _, unique_idx = np.unique(best_terms[ranking], return_index=True)
+        ranking = ranking[np.sort(unique_idx)]
+
+        sent_term_sets = self._terms_by_sentence(pair_sent, pair_term)
+        pool = top[scores[top] > 0]
+        lengths = np.array([len(t) for t in terms])
+        word_counts = np.array([t.count(' ') + 1 for t in terms])
+        rng = np.random.default_rng(self.seed)
+
+        questions = []
+        for idx in ranking:
+            if len(questions) >= num_questions:
+                break
+            sent_id, answer = int(sent_ids[idx]), int(best_terms[idx])
+            distractors = self._pick_distractors(answer, terms, pool, scores, lengths, word_counts,
+                                                 sent_term_sets.get(sent_id, set()),
+                                                 difficulty, rng)
+            if len(distractors) < 3:
+                continue
+
+            sentence = sentences[sent_id]
+            stem = self._blank_out(sentence, terms[answer])
+            if stem is None or f"Fill in the blank: {stem}" in avoid:
+                continue
+
+            correct = LETTERS[int(rng.integers(4))]
+            values = [self._display(sentence, terms[d]) for d in distractors]
+            values.insert(LETTERS.index(correct), self._display(sentence, terms[answer]))
+            questions.append((sent_id, {
+                "question": f"Fill in the blank: {stem}",
+                "options": dict(zip(LETTERS, values)),
+                "correct_answer": correct,
+                "explanation": f'The original text reads: "{sentence}"',
+                "difficulty": difficulty,
+                "topic": topic or self._topic_for(sent_term_sets.get(sent_id, set()),
+                                                  answer, terms, scores)
+            }))
+
+        # Present questions in document order
+        questions.sort(key=lambda item: item[0])
+        return [q for _, q in questions]
+
+    def _split_sentences(self, text: str) -> List[str]:
+        """Split text into cleaned, de-duplicated candidate sentences"""
+        seen = set()
+        sentences = []
+        for raw in _SENTENCE_SPLIT.split(text or ""):
+            sentence = ' '.join(raw.split())
+            if (self.min_sentence_length <= len(sentence) <= self.max_sentence_length
+                    and sentence not in seen):
+                seen.add(sentence)
+                sentences.append(sentence)
+        return sentences
+
+    def _score_terms(self, sentences: List[str]):
+        """Build the sentence/term incidence pairs and TF-IDF score every term"""
+        vocab: Dict[str, int] = {}
+        sent_idx: List[int] = []
+        term_idx: List[int] = []
+
+        for i, sentence in enumerate(sentences):
+            tokens = [t.lower() for t in _TOKEN.findall(sentence)]
+            content = [len(t) >= self.min_word_length and t not in STOPWORDS for t in tokens]
+            for j, token in enumerate(tokens):
+                if not content[j]:
+                    continue
+                sent_idx.append(i)
+                term_idx.append(vocab.setdefault(token, len(vocab)))
+                # Two adjacent content words form a candidate noun phrase
+                if j + 1 < len(tokens) and content[j + 1]:
+                    sent_idx.append(i)
+                    term_idx.append(vocab.setdefault(f"{token} {tokens[j + 1]}", len(vocab)))
+
+        terms = list(vocab)
+        if not terms:
+            empty = np.zeros(0, dtype=np.int64)
+            return sentences, terms, np.zeros(0), empty, empty
+
+        pair_sent = np.asarray(sent_idx, dtype=np.int64)
+        pair_term = np.asarray(term_idx, dtype=np.int64)
+        n_terms, n_sents = len(terms), max(len(sentences), 1)
+
+        tf = np.bincount(pair_term, minlength=n_terms).astype(np.float64)
+        unique_pairs = np.unique(pair_sent * n_terms + pair_term)
+        df = np.bincount(unique_pairs % n_terms, minlength=n_terms).astype(np.float64)
+        idf = np.log((1.0 + n_sents) / (1.0 + df)) + 1.0
+        scores = np.log1p(tf) * idf
+
+        # Phrases that occur only once are usually accidental word pairs
+        is_phrase = np.fromiter((' ' in t for t in terms), dtype=bool, count=n_terms)
+        scores[is_phrase & (tf < 2)] = 0.0
+        scores[is_phrase] *= 1.25
+
+        pair_sent = unique_pairs // n_terms
+        pair_term = unique_pairs % n_terms
+        nonzero = scores[pair_term] > 0
+        return sentences, terms, scores, pair_sent[nonzero], pair_term[nonzero]
+
+    @staticmethod
+    def _terms_by_sentence(pair_sent: np.ndarray, pair_term: np.ndarray) -> Dict[int, set]:
+        """Group the term ids of every sentence"""
+        groups: Dict[int, set] = {}
+        for s, t in zip(pair_sent.tolist(), pair_term.tolist()):
+            groups.setdefault(s, set()).add(t)
+        return groups
+
+    @staticmethod
+    def _pick_distractors(answer: int, terms: List[str], pool: np.ndarray, scores: np.ndarray,
+                          lengths: np.ndarray, word_counts: np.ndarray, exclude: set,
+                          difficulty: str, rng: np.random.Generator) -> List[int]:
+        """Choose three distractor terms from the document's high-scoring terms"""
+        candidates = pool[(pool != answer) & (word_counts[pool] == word_counts[answer])]
+        if exclude:
+            candidates = candidates[~np.isin(candidates, list(exclude))]
+        if len(candidates) < 3:
+            return []
+
+        # Harder quizzes get distractors closer in shape to the answer
+        closeness = 1.0 / (1.0 + np.abs(lengths[candidates] - lengths[answer]))
+        weight = scores[candidates] / scores[candidates].max()
+        if difficulty == "hard":
+            rank = closeness * 2.0 + weight
+        elif difficulty == "easy":
+            rank = weight + rng.random(len(candidates)) * 0.5
+        else:
+            rank = closeness + weight + rng.random(len(candidates)) * 0.25
+
+        chosen: List[int] = []
+        for c in candidates[np.argsort(-rank, kind='stable')].tolist():
+            # Avoid distractors that are inflections of the answer or of each other
+            if any(_same_stem(terms[c], terms[o]) for o in [answer] + chosen):
+                continue
+            chosen.append(c)
+            if len(chosen) == 3:
+                break
+        return chosen
+
+    @staticmethod
+    def _blank_out(sentence: str, term: str) -> Optional[str]:
+        """Replace the first occurrence of a term in a sentence with a blank"""
+        pattern = r'\b' + r'\s+'.join(re.escape(w) for w in term.split()) + r'\b'
+        stem, count = re.subn(pattern, '_____', sentence, count=1, flags=re.IGNORECASE)
+        return stem if count else None
+
+    @staticmethod
+    def _display(sentence: str, term: str) -> str:
+        """Return a term with the casing used in the sentence when possible"""
+        pattern = r'\b' + r'\s+'.join(re.escape(w) for w in term.split()) + r'\b'
+        match = re.search(pattern, sentence, flags=re.IGNORECASE)
+        return match.group(0) if match else term
+
+    @staticmethod
+    def _topic_for(sentence_terms: set, answer: int, terms: List[str],
+                   scores: np.ndarray) -> str:
+        """Use the strongest other term of the sentence as the question topic"""
+        others = [t for t in sentence_terms if t != answer]
+        if not others:
+            return "Key Terms"
+        best = max(others, key=lambda t: scores[t])
+        return terms[best].title()
+
+
+def _same_stem(a: str, b: str, prefix: int = 5) -> bool:
+    """Crude check whether two terms are inflections of the same word(s)"""
+    if a.startswith(b) or b.startswith(a):
+        return True
+    return len(a) >= prefix and len(b) >= prefix and a[:prefix] == b[:prefix]
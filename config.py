@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -10,17 +11,80 @@ class Config:
     OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
     OPENAI_MAX_TOKENS = int(os.getenv('OPENAI_MAX_TOKENS', 1000))
     OPENAI_TEMPERATURE = float(os.getenv('OPENAI_TEMPERATURE', 0.7))
+
+    # Question Generation Backend (openai, local, replay)
+    QUESTION_BACKEND = os.getenv('QUESTION_BACKEND', 'openai')
+    REPLAY_RECORDINGS_PATH = os.getenv('REPLAY_RECORDINGS_PATH', 'recordings/question_responses.json')
     
     # Quiz Configuration
     DEFAULT_QUESTIONS_PER_QUIZ = int(os.getenv('DEFAULT_QUESTIONS_PER_QUIZ', 10))
     DIFFICULTY_LEVELS = os.getenv('DIFFICULTY_LEVELS', 'easy,medium,hard').split(',')
     PERFORMANCE_THRESHOLD = float(os.getenv('PERFORMANCE_THRESHOLD', 0.7))
+
+    # Question Quality Configuration
+    GROUNDING_FILTER_ENABLED = os.getenv('GROUNDING_FILTER_ENABLED', 'true').lower() == 'true'
+    GROUNDING_MIN_SCORE = float(os.getenv('GROUNDING_MIN_SCORE', 0.3))
+    DEDUP_SIMILARITY_THRESHOLD = float(os.getenv('DEDUP_SIMILARITY_THRESHOLD', 0.7))
+    QUESTION_BANK_PATH = os.getenv('QUESTION_BANK_PATH', '')
+
+    # Long Document Configuration
+    PROMPT_CONTENT_CHARS = int(os.getenv('PROMPT_CONTENT_CHARS', 3000))
+    SUMMARY_MODE = os.getenv('SUMMARY_MODE', 'extractive')
+    SUMMARY_CACHE_DIR = os.getenv('SUMMARY_CACHE_DIR', '')
     
     # Voice Configuration
+    TTS_BACKEND = os.getenv('TTS_BACKEND', 'gtts')
     TTS_LANGUAGE = os.getenv('TTS_LANGUAGE', 'en')
+    ESPEAK_WORDS_PER_MINUTE = int(os.getenv('ESPEAK_WORDS_PER_MINUTE', 160))
+    ESPEAK_VOICE = os.getenv('ESPEAK_VOICE', '')
     SPEECH_RECOGNITION_LANGUAGE = os.getenv('SPEECH_RECOGNITION_LANGUAGE', 'en-US')
+    STT_BACKEND = os.getenv('STT_BACKEND', 'google')
+    VOSK_MODEL_PATH = os.getenv('VOSK_MODEL_PATH', 'models/vosk-model-small-en-us-0.15')
+    ANSWER_MIN_CONFIDENCE = float(os.getenv('ANSWER_MIN_CONFIDENCE', 0.6))
     AUDIO_TIMEOUT = int(os.getenv('AUDIO_TIMEOUT', 10))
     AUDIO_PHRASE_TIMEOUT = int(os.getenv('AUDIO_PHRASE_TIMEOUT', 5))
+    VAD_END_SILENCE_MS = int(os.getenv('VAD_END_SILENCE_MS', 500))
+    ANSWER_EARLY_COMMIT = os.getenv('ANSWER_EARLY_COMMIT', 'true').lower() == 'true'
+    NOISE_CALIBRATION_SECONDS = float(os.getenv('NOISE_CALIBRATION_SECONDS', 0.5))
+    NOISE_CALIBRATION_MAX_AGE_SECONDS = int(os.getenv('NOISE_CALIBRATION_MAX_AGE_SECONDS', 1800))
+    NOISE_RECALIBRATE_ERROR_RATE = float(os.getenv('NOISE_RECALIBRATE_ERROR_RATE', 0.5))
+    INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', 2))
+    INGEST_NORMALIZE_LOUDNESS = os.getenv('INGEST_NORMALIZE_LOUDNESS', 'true').lower() == 'true'
+    INGEST_TARGET_DBFS = float(os.getenv('INGEST_TARGET_DBFS', -20))
+    # Worker processes for batch_transcribe.py (0 = one per CPU)
+    BATCH_TRANSCRIBE_WORKERS = int(os.getenv('BATCH_TRANSCRIBE_WORKERS', 0))
+
+    # Audio Cache Configuration (shared by all sessions of a server)
+    TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'voice-quiz-audio-cache'))
+    TTS_CACHE_MEMORY_MB = int(os.getenv('TTS_CACHE_MEMORY_MB', 32))
+    TTS_CACHE_DISK_MB = int(os.getenv('TTS_CACHE_DISK_MB', 256))
+
+    # Scratch Space Configuration (per-process directory for short-lived audio files)
+    SCRATCH_QUOTA_MB = int(os.getenv('SCRATCH_QUOTA_MB', 64))
+    SCRATCH_MAX_FILES = int(os.getenv('SCRATCH_MAX_FILES', 256))
+    SCRATCH_TTL_SECONDS = int(os.getenv('SCRATCH_TTL_SECONDS', 900))
+    SCRATCH_JANITOR_INTERVAL_SECONDS = int(os.getenv('SCRATCH_JANITOR_INTERVAL_SECONDS', 60))
+    # Lease of pinned files (uploaded quiz bundles), renewed while the quiz is played
+    SCRATCH_PINNED_TTL_SECONDS = int(os.getenv('SCRATCH_PINNED_TTL_SECONDS', 7200))
+
+    # Audio Pre-rendering Configuration
+    TTS_PRERENDER_ENABLED = os.getenv('TTS_PRERENDER_ENABLED', 'true').lower() == 'true'
+    TTS_PRERENDER_WORKERS = int(os.getenv('TTS_PRERENDER_WORKERS', 2))
+    TTS_PRERENDER_WAIT_SECONDS = float(os.getenv('TTS_PRERENDER_WAIT_SECONDS', 15))
+
+    # Chunked TTS: questions render per sentence/option so playback starts early
+    TTS_CHUNKED_ENABLED = os.getenv('TTS_CHUNKED_ENABLED', 'true').lower() == 'true'
+    TTS_SEGMENT_WORKERS = int(os.getenv('TTS_SEGMENT_WORKERS', 4))
+
+    # Audio Server Configuration (serves clips by URL instead of inline base64)
+    AUDIO_SERVER_ENABLED = os.getenv('AUDIO_SERVER_ENABLED', 'false').lower() == 'true'
+    AUDIO_SERVER_HOST = os.getenv('AUDIO_SERVER_HOST', '127.0.0.1')
+    AUDIO_SERVER_PORT = int(os.getenv('AUDIO_SERVER_PORT', 8502))
+    AUDIO_SERVER_PUBLIC_URL = os.getenv('AUDIO_SERVER_PUBLIC_URL', '')
+    AUDIO_SERVER_MEMORY_MB = int(os.getenv('AUDIO_SERVER_MEMORY_MB', 64))
+    # Default encoding profile for clips sent to clients: original, speech_mp3 or opus_low
+    AUDIO_PROFILE = os.getenv('AUDIO_PROFILE', 'original')
+    AUDIO_PROFILE_CACHE_MB = int(os.getenv('AUDIO_PROFILE_CACHE_MB', 16))
     
     # File Upload Configuration
     MAX_FILE_SIZE_MB = 10
@@ -0,0 +1,58 @@
+from typing import Callable, List, Optional
+from audio_segments import concat_mp3
+
+CORRECT_PHRASE = "Correct! Well done."
+INCORRECT_PHRASE = "Incorrect. You answered"
+CORRECTION_PHRASE = "but the correct answer is"
+LETTERS = ['A', 'B', 'C', 'D']
+
+
+class FeedbackAudioComposer:
+    """Builds spoken feedback from reusable segments
+
+    Feedback is split into fixed phrases, answer letters and the question's
+    explanation. Phrases and letters are rendered once per language and shared
+    by every answer of every user; explanations are rendered once per question.
+    Composing a clip only joins the cached audio frames.
+    """
+
+    def __init__(self, render: Callable[[str], bytes],
+                 lookup: Callable[[str], Optional[bytes]],
+                 concat: Callable[[List[bytes]], bytes] = concat_mp3):
+        self.render = render
+        self.lookup = lookup
+        self.concat = concat
+
+    @staticmethod
+    def fixed_segments() -> List[str]:
+        """Segments shared by all feedback: the phrases and the answer letters"""
+        return [CORRECT_PHRASE, INCORRECT_PHRASE, CORRECTION_PHRASE] + LETTERS
+
+    @staticmethod
+    def segments(is_correct: bool, correct_answer: str, explanation: str,
+                 user_answer: str = "") -> List[str]:
+        """Return the segment texts of a feedback clip in playback order"""
+        if is_correct:
+            parts = [CORRECT_PHRASE]
+        else:
+            parts = [INCORRECT_PHRASE, (user_answer or "").strip().upper(),
+                     CORRECTION_PHRASE, (correct_answer or "").strip().upper()]
+        parts.append((explanation or "").strip())
+        return [part for part in parts if part]
+
+    def compose(self, is_correct: bool, correct_answer: str, explanation: str,
+                user_answer: str = "") -> bytes:
+        """Return the feedback clip, rendering any segment not cached yet"""
+        texts = self.segments(is_correct, correct_answer, explanation, user_answer)
+        return self.concat([self.render(text) for text in texts])
+
+    def compose_ready(self, is_correct: bool, correct_answer: str, explanation: str,
+                      user_answer: str = "") -> Optional[bytes]:
+        """Return the feedback clip only if every segment is already cached"""
+        clips = []
+        for text in self.segments(is_correct, correct_answer, explanation, user_answer):
+            clip = self.lookup(text)
+            if clip is None:
+                return None
+            clips.append(clip)
+        return self.concat(clips)
@@ -0,0 +1,197 @@
+import abc
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+from config import Config
+from cloze_generator import ClozeQuestionGenerator
+
+# Import OpenAI with error handling
+try:
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+    OpenAI = None
+
+SYSTEM_PROMPT = "You are an expert quiz generator. Create engaging and educational quiz questions."
+SUMMARY_SYSTEM_PROMPT = "You summarize study material concisely, keeping key facts and terminology."
+
+
+class GenerationBackend(abc.ABC):
+    """Base class for question generation backends
+
+    A backend receives the fully rendered prompt together with the raw request
+    parameters and returns the raw response text, which QuestionGenerator then
+    parses and validates exactly like a model response. ``avoid`` lists
+    questions that must not be repeated; model backends see it in the prompt,
+    backends that ignore the prompt must honour it themselves.
+    """
+
+    name = "base"
+    label = "generation backend"
+
+    def is_available(self) -> bool:
+        """Return True if the backend can serve requests"""
+        return True
+
+    @abc.abstractmethod
+    def generate(self, prompt: str, content: str, num_questions: int,
+                 difficulty: str, topic: str = "", avoid: Optional[List[str]] = None) -> str:
+        """Return the raw response text for a question generation request"""
+
+    def summarize(self, text: str, max_sentences: int) -> str:
+        """Summarize a passage; backends without a model raise NotImplementedError"""
+        raise NotImplementedError
+
+
+class OpenAIBackend(GenerationBackend):
+    """Generates questions with the OpenAI chat completions API"""
+
+    name = "openai"
+    label = "OpenAI GPT"
+
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 max_tokens: Optional[int] = None, temperature: Optional[float] = None):
+        self.api_key = api_key or Config.OPENAI_API_KEY
+        self.model = model or Config.OPENAI_MODEL
+        self.max_tokens = max_tokens or Config.OPENAI_MAX_TOKENS
+        self.temperature = temperature if temperature is not None else Config.OPENAI_TEMPERATURE
+        self.client = None
+        self.init_error = None
+
+        if OPENAI_AVAILABLE and self.is_configured():
+            try:
+                self.client = OpenAI(api_key=self.api_key)
+            except Exception as e:
+                self.init_error = str(e)
+
+    def is_configured(self) -> bool:
+        """Check whether a usable API key is present"""
+        return bool(self.api_key) and self.api_key != 'your_openai_api_key_here'
+
+    def is_available(self) -> bool:
+        return self.client is not None
+
+    def generate(self, prompt: str, content: str, num_questions: int,
+                 difficulty: str, topic: str = "", avoid: Optional[List[str]] = None) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
+        return response.choices[0].message.content
+
+    def summarize(self, text: str, max_sentences: int) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Summarize the following text in at most "
+                                            f"{max_sentences} sentences:\n\n{text}"}
+            ],
+            max_tokens=min(self.max_tokens, 60 * max_sentences),
+            temperature=0
+        )
+        return response.choices[0].message.content.strip()
+
+
+class LocalBackend(GenerationBackend):
+    """Deterministic offline backend that builds questions from the content itself
+
+    Questions come from ClozeQuestionGenerator: each one blanks out a TF-IDF key
+    term of a source sentence and uses other key terms of the document as
+    distractors. The prompt is not used, so questions listed in ``avoid`` are
+    skipped by the generator itself. The same content always yields the same
+    questions, which makes the backend suitable for load tests, benchmarks and
+    offline deployments.
+    """
+
+    name = "local"
+    label = "local question builder"
+
+    def __init__(self, generator: Optional[ClozeQuestionGenerator] = None):
+        self.generator = generator or ClozeQuestionGenerator()
+
+    def generate(self, prompt: str, content: str, num_questions: int,
+                 difficulty: str, topic: str = "", avoid: Optional[List[str]] = None) -> str:
+        return json.dumps(self.generator.generate(content, num_questions, difficulty, topic, avoid))
+
+
+class ReplayBackend(GenerationBackend):
+    """Serves recorded responses keyed by a hash of the prompt
+
+    Recordings are stored as a JSON object mapping prompt hashes to response
+    text. When a fallback backend is given, misses are forwarded to it and the
+    response is recorded, so a live run can be captured once and replayed later.
+    """
+
+    name = "replay"
+    label = "recorded responses"
+
+    def __init__(self, recordings_path: Optional[str] = None,
+                 fallback: Optional[GenerationBackend] = None):
+        self.recordings_path = recordings_path or Config.REPLAY_RECORDINGS_PATH
+        self.fallback = fallback
+        self.recordings: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        if self.recordings_path and os.path.exists(self.recordings_path):
+            with open(self.recordings_path, 'r', encoding='utf-8') as f:
+                self.recordings = json.load(f)
+
+    @staticmethod
+    def prompt_key(prompt: str) -> str:
+        """Return the recording key for a prompt"""
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    def is_available(self) -> bool:
+        return bool(self.recordings) or (self.fallback is not None and self.fallback.is_available())
+
+    def generate(self, prompt: str, content: str, num_questions: int,
+                 difficulty: str, topic: str = "", avoid: Optional[List[str]] = None) -> str:
+        key = self.prompt_key(prompt)
+        with self._lock:
+            if key in self.recordings:
+                return self.recordings[key]
+
+        if self.fallback is None:
+            raise KeyError(f"No recorded response for prompt {key[:12]}")
+
+        response = self.fallback.generate(prompt, content, num_questions, difficulty, topic, avoid)
+        self.record(prompt, response)
+        return response
+
+    def record(self, prompt: str, response: str):
+        """Store a response for a prompt and persist the recordings"""
+        with self._lock:
+            self.recordings[self.prompt_key(prompt)] = response
+            if self.recordings_path:
+                os.makedirs(os.path.dirname(self.recordings_path) or '.', exist_ok=True)
+                with open(self.recordings_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.recordings, f, indent=2)
+
+
+BACKENDS = {
+    OpenAIBackend.name: OpenAIBackend,
+    LocalBackend.name: LocalBackend,
+    ReplayBackend.name: ReplayBackend,
+}
+
+
+def create_backend(name: Optional[str] = None) -> GenerationBackend:
+    """Create a generation backend by name (defaults to Config.QUESTION_BACKEND)"""
+    name = (name or Config.QUESTION_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown question backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def list_backends() -> List[str]:
+    """Return the names of all registered backends"""
+    return list(BACKENDS)
@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+import numpy as np
+from config import Config
+from voice_activity import frame_features
+
+
+def measure_noise_floor(pcm: bytes, sample_rate: int, frame_ms: int = 20, percentile: float = 20.0) -> Optional[float]:
+    """Return the ambient noise floor (dBFS) of 16-bit mono PCM, or None if it is too short
+
+    A low percentile of the per-frame energies is used instead of the mean,
+    so a cough or a door in the sample does not raise the floor.
+    """
+    frame_len = max(1, sample_rate * frame_ms // 1000)
+    samples = np.frombuffer(pcm, dtype='<i2')
+    count = len(samples) // frame_len
+    if count == 0:
+        return None
+    energy_db, _ = frame_features(samples[:count * frame_len].reshape(count, frame_len))
+    return float(np.percentile(energy_db, percentile))
+
+
+class NoiseProfile:
+    """A measured noise floor for one microphone or session
+
+    The voice activity detector's energy threshold is the floor plus its
+    margin, so caching the floor caches the threshold.
+    """
+
+    def __init__(self, noise_floor_db: float, measured_at: Optional[float] = None, source: str = "calibration"):
+        self.noise_floor_db = noise_floor_db
+        self.measured_at = measured_at if measured_at is not None else time.time()
+        self.source = source
+
+
+class CalibrationCache:
+    """Noise floors measured once per microphone or session and reused for every answer
+
+    Each capture hands over its leading silence as ambient audio. The
+    outcome of every answer is recorded; when the recent error rate reaches
+    recalibrate_error_rate, the floor is re-measured from the collected
+    ambient audio on a background thread, so answers never wait for
+    calibration after the first one.
+    """
+
+    def __init__(self, max_age_seconds: float = 1800, recalibrate_error_rate: float = 0.5,
+                 window: int = 6, min_outcomes: int = 3, ambient_seconds: float = 3.0):
+        self.max_age_seconds = max_age_seconds
+        self.recalibrate_error_rate = recalibrate_error_rate
+        self.window = window
+        self.min_outcomes = min_outcomes
+        self.ambient_seconds = ambient_seconds
+        self._profiles: Dict[str, NoiseProfile] = {}
+        self._outcomes: Dict[str, Deque[bool]] = {}
+        self._ambient: Dict[str, Deque[bytes]] = {}
+        self._rates: Dict[str, int] = {}
+        self._refreshing: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+        self.calibrations = 0
+        self.refreshes = 0
+
+    def get(self, key: str) -> Optional[NoiseProfile]:
+        """Return the cached profile for a device or session, if it is still fresh"""
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None and time.time() - profile.measured_at > self.max_age_seconds:
+                del self._profiles[key]
+                profile = None
+            return profile
+
+    def calibrate(self, key: str, pcm: bytes, sample_rate: int, source: str = "calibration") -> Optional[NoiseProfile]:
+        """Measure the noise floor of ambient audio and cache it for the key"""
+        floor = measure_noise_floor(pcm, sample_rate)
+        if floor is None:
+            return None
+        profile = NoiseProfile(floor, source=source)
+        with self._lock:
+            self._profiles[key] = profile
+            self._outcomes.pop(key, None)
+            self.calibrations += 1
+        return profile
+
+    def observe_ambient(self, key: str, pcm: bytes, sample_rate: int):
+        """Keep the latest ambient audio of a device or session for later refreshes"""
+        if not pcm:
+            return
+        with self._lock:
+            if self._rates.get(key) != sample_rate:
+                self._ambient[key] = deque()
+                self._rates[key] = sample_rate
+            snippets = self._ambient[key]
+            snippets.append(pcm)
+            limit = int(self.ambient_seconds * sample_rate * 2)
+            while len(snippets) > 1 and sum(len(s) for s in snippets) > limit:
+                snippets.popleft()
+
+    def record_outcome(self, key: str, ok: bool) -> bool:
+        """Record whether an answer was recognized; return True if a refresh was started"""
+        with self._lock:
+            outcomes = self._outcomes.setdefault(key, deque(maxlen=self.window))
+            outcomes.append(ok)
+            errors = outcomes.count(False)
+            if (len(outcomes) < self.min_outcomes or errors / len(outcomes) < self.recalibrate_error_rate
+                    or key in self._refreshing):
+                return False
+            outcomes.clear()
+            if not self._ambient.get(key):
+                # Nothing to re-measure from; the next capture calibrates afresh
+                self._profiles.pop(key, None)
+                return False
+            thread = threading.Thread(target=self._refresh, args=(key,), name="noise-recalibration", daemon=True)
+            self._refreshing[key] = thread
+        thread.start()
+        return True
+
+    def _refresh(self, key: str):
+        try:
+            with self._lock:
+                pcm = b"".join(self._ambient.get(key, ()))
+                rate = self._rates.get(key)
+            if pcm and rate and self.calibrate(key, pcm, rate, source="refresh") is not None:
+                with self._lock:
+                    self.refreshes += 1
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def wait_for_refresh(self, key: str, timeout: Optional[float] = None):
+        """Block until a running background refresh of the key has finished"""
+        with self._lock:
+            thread = self._refreshing.get(key)
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'profiles': len(self._profiles),
+                'calibrations': self.calibrations,
+                'refreshes': self.refreshes,
+                'refreshing': len(self._refreshing),
+            }
+
+
+_shared_cache = None
+_lock = threading.Lock()
+
+
+def get_shared_calibration_cache() -> CalibrationCache:
+    """Return the process-wide calibration cache shared by all sessions"""
+    global _shared_cache
+    with _lock:
+        if _shared_cache is None:
+            _shared_cache = CalibrationCache(
+                max_age_seconds=Config.NOISE_CALIBRATION_MAX_AGE_SECONDS,
+                recalibrate_error_rate=Config.NOISE_RECALIBRATE_ERROR_RATE
+            )
+        return _shared_cache
@@ -0,0 +1,347 @@
+import hashlib
+import os
+import re
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# Journal header: magic and signature size, followed by fixed-size records
+_JOURNAL_MAGIC = b'QDJ1'
+_PREFIXES = ("fill in the blank ",)
+
+
+@contextmanager
+def _exclusive_lock(path: str):
+    """Hold an exclusive inter-process lock on <path>.lock"""
+    with open(path + '.lock', 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def normalize_stem(stem: str) -> str:
+    """Lowercase a question stem and strip punctuation and boilerplate prefixes"""
+    text = _NON_WORD.sub(' ', (stem or "").lower()).strip()
+    for prefix in _PREFIXES:
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+    return text
+
+
+class QuestionDedupIndex:
+    """Near-duplicate index over question stems
+
+    Each stem is normalized and stored twice: as an exact SHA-1 fingerprint and
+    as a MinHash signature of its character n-grams. Signatures are bucketed
+    with locality-sensitive hashing (bands of rows), so a lookup only compares
+    against the handful of stems sharing a bucket and stays fast as the index
+    grows to hundreds of thousands of questions.
+
+    On disk the index is a compacted NumPy archive plus an append-only
+    journal (<path>.journal) of the stems added since. Saving appends only
+    the new entries; the archive is rewritten once the journal outgrows it,
+    so persisting a quiz costs amortized O(1) per question. Loads and saves
+    hold an exclusive lock on <path>.lock, and a save first picks up what
+    other processes sharing the path have written, so none of it is lost.
+    """
+
+    def __init__(self, threshold: float = 0.7, ngram: int = 3, num_perm: int = 192,
+                 bands: int = 32, seed: int = 1, path: Optional[str] = None,
+                 compact_min: int = 1024):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.ngram = ngram
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.path = path
+        self.compact_min = compact_min
+        self._record = np.dtype([('fingerprint', 'S40'),
+                                 ('signature', '<u4', (num_perm,))])
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family: odd 64-bit multipliers, keep the high 32 bits
+        self._mul = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self._mul |= np.uint64(1)
+        self._add = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+        self._signatures = np.zeros((1024, num_perm), dtype=np.uint32)
+        self._fingerprints: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._size = 0
+        # Persistence state: what was on disk at _saved_path when last synced,
+        # and the ids added here that are not written yet
+        self._pending: List[int] = []
+        self._saved_path = None
+        self._archive_id = None
+        self._base_count = 0
+        self._journal_count = 0
+        self._lock = threading.Lock()
+
+        if path and (os.path.exists(path) or os.path.exists(self.journal_path(path))):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def fingerprint(stem: str) -> str:
+        """Exact fingerprint of a normalized stem"""
+        return hashlib.sha1(normalize_stem(stem).encode('utf-8')).hexdigest()
+
+    def signature(self, stem: str) -> np.ndarray:
+        """MinHash signature of the character n-grams of a normalized stem"""
+        text = normalize_stem(stem)
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        codes = codes.astype(np.uint64)
+        if len(codes) < self.ngram:
+            codes = np.pad(codes, (0, self.ngram - len(codes)))
+
+        # Polynomial hash of every n-gram, computed for all positions at once
+        grams = np.zeros(len(codes) - self.ngram + 1, dtype=np.uint64)
+        count = len(grams)
+        for k in range(self.ngram):
+            grams = grams * np.uint64(1000003) + codes[k:count + k]
+        grams = np.unique(grams)
+
+        hashed = self._mul[:, None] * grams[None, :] + self._add[:, None]
+        hashed >>= np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def find_duplicate(self, stem: str) -> Optional[Tuple[int, float]]:
+        """Return (id, estimated similarity) of the closest near-duplicate, if any"""
+        with self._lock:
+            return self._find(self.fingerprint(stem), self.signature(stem))
+
+    def is_duplicate(self, stem: str) -> bool:
+        """Check whether a stem duplicates one already in the index"""
+        return self.find_duplicate(stem) is not None
+
+    def add(self, stem: str) -> int:
+        """Add a stem to the index and return its id"""
+        fingerprint, signature = self.fingerprint(stem), self.signature(stem)
+        with self._lock:
+            return self._add_new(fingerprint, signature)
+
+    def filter_new(self, questions: List[Dict],
+                   add: bool = True) -> Tuple[List[Dict], List[Dict]]:
+        """Split questions into (unique, duplicates) against the index and each other"""
+        unique, duplicates = [], []
+        batch_fingerprints, batch_signatures = [], []
+        with self._lock:
+            for question in questions:
+                stem = question.get('question', '')
+                fingerprint, signature = self.fingerprint(stem), self.signature(stem)
+                in_batch = fingerprint in batch_fingerprints or any(
+                    (signature == other).mean() >= self.threshold
+                    for other in batch_signatures
+                )
+                if in_batch or self._find(fingerprint, signature) is not None:
+                    duplicates.append(question)
+                    continue
+                unique.append(question)
+                batch_fingerprints.append(fingerprint)
+                batch_signatures.append(signature)
+
+            if add:
+                for fingerprint, signature in zip(batch_fingerprints, batch_signatures):
+                    self._add_new(fingerprint, signature)
+        return unique, duplicates
+
+    @staticmethod
+    def journal_path(path: str) -> str:
+        """Path of the append-only journal kept next to an index archive"""
+        return path + '.journal'
+
+    def save(self, path: Optional[str] = None):
+        """Persist the stems added since the last save
+
+        New entries are appended to the journal. The archive is rewritten
+        (and the journal emptied) only when the journal would outgrow it, or
+        when saving to a different path.
+        """
+        path = path or self.path
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._lock, _exclusive_lock(path):
+            new_path = path != self._saved_path
+            self._sync(path)
+            pending = len(self._pending)
+            journal_limit = max(self.compact_min, self._base_count)
+            if new_path or self._journal_count + pending > journal_limit:
+                self._compact(path)
+            elif pending:
+                self._append_journal(path)
+
+    def load(self, path: str):
+        """Load an index saved with save(): the archive, then its journal"""
+        with self._lock, _exclusive_lock(path):
+            self._sync(path)
+
+    def _sync(self, path: str):
+        """Add the entries on disk that this index has not seen (both locks held)
+
+        Only journal records past the ones already read are added, unless
+        the archive was rewritten (or the path is new), which means
+        re-reading everything; entries already present are skipped.
+        """
+        archive_id = self._file_id(path)
+        full = path != self._saved_path or archive_id != self._archive_id
+        records = self._read_journal(path)
+        if records is not None and len(records) < self._journal_count:
+            full = True
+        if full:
+            self._base_count = 0
+            self._journal_count = 0
+            if archive_id is not None:
+                with np.load(path) as data:
+                    signatures = data['signatures']
+                    fingerprints = data['fingerprints'].tolist()
+                if signatures.shape[1:] != (self.num_perm,):
+                    raise ValueError(
+                        f"Index at {path} was built with a different signature size")
+                for fingerprint, signature in zip(fingerprints, signatures):
+                    self._add_signature(fingerprint, signature)
+                self._base_count = len(fingerprints)
+        if records is not None:
+            for record in records[self._journal_count:]:
+                self._add_signature(record['fingerprint'].decode('ascii'),
+                                    record['signature'])
+        self._journal_count = 0 if records is None else len(records)
+        self._archive_id = archive_id
+        self._saved_path = path
+
+    @staticmethod
+    def _file_id(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _compact(self, path: str):
+        """Rewrite the archive with every entry and drop the journal (locks held)"""
+        directory = os.path.dirname(path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, signatures=self._signatures[:self._size],
+                                    fingerprints=np.array(self._ids, dtype='U40'))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        # A crash before this point leaves journal entries that are also in the archive;
+        # loading skips them as exact duplicates
+        try:
+            os.unlink(self.journal_path(path))
+        except FileNotFoundError:
+            pass
+        self._pending = []
+        self._archive_id = self._file_id(path)
+        self._base_count = self._size
+        self._journal_count = 0
+
+    def _append_journal(self, path: str):
+        """Append the pending entries at the end of the journal (both locks held)"""
+        records = np.empty(len(self._pending), dtype=self._record)
+        records['fingerprint'] = [self._ids[i].encode('ascii') for i in self._pending]
+        records['signature'] = self._signatures[self._pending]
+        with open(self.journal_path(path), 'ab') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                f.write(_JOURNAL_MAGIC + struct.pack('<I', self.num_perm))
+            elif end > 8 + self._journal_count * self._record.itemsize:
+                # Drop a record cut short by a crash mid-append; _sync read the rest
+                f.truncate(8 + self._journal_count * self._record.itemsize)
+            f.write(records.tobytes())
+        self._journal_count += len(records)
+        self._pending = []
+
+    def _read_journal(self, path: str) -> Optional[np.ndarray]:
+        journal = self.journal_path(path)
+        if not os.path.exists(journal):
+            return None
+        with open(journal, 'rb') as f:
+            data = f.read()
+        if not data:
+            return None
+        if len(data) < 8 or data[:4] != _JOURNAL_MAGIC:
+            raise ValueError(f"Corrupt question bank journal at {journal}")
+        if struct.unpack_from('<I', data, 4)[0] != self.num_perm:
+            raise ValueError(
+                f"Journal at {journal} was built with a different signature size")
+        # A record cut short by a crash mid-append is ignored
+        body = data[8:]
+        usable = len(body) - len(body) % self._record.itemsize
+        return np.frombuffer(body[:usable], dtype=self._record)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        rows = self.rows
+        return [signature[b * rows:(b + 1) * rows].tobytes() for b in range(self.bands)]
+
+    def _find(self, fingerprint: str,
+              signature: np.ndarray) -> Optional[Tuple[int, float]]:
+        if fingerprint in self._fingerprints:
+            return self._fingerprints[fingerprint], 1.0
+
+        keys = self._band_keys(signature)
+        hits = [band[key] for band, key in zip(self._buckets, keys)
+                if key in band]
+        if not hits:
+            return None
+
+        ids = np.unique(np.fromiter(chain.from_iterable(hits), dtype=np.int64))
+        similarity = (self._signatures[ids] == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] >= self.threshold:
+            return int(ids[best]), float(similarity[best])
+        return None
+
+    def _add_new(self, fingerprint: str, signature: np.ndarray) -> int:
+        """Add an entry created here, to be written by the next save"""
+        size = self._size
+        item_id = self._add_signature(fingerprint, signature)
+        if self._size > size:
+            self._pending.append(item_id)
+        return item_id
+
+    def _add_signature(self, fingerprint: str, signature: np.ndarray) -> int:
+        if fingerprint in self._fingerprints:
+            return self._fingerprints[fingerprint]
+
+        if self._size == len(self._signatures):
+            grown = np.zeros((len(self._signatures) * 2, self.num_perm),
+                             dtype=np.uint32)
+            grown[:self._size] = self._signatures[:self._size]
+            self._signatures = grown
+
+        item_id = self._size
+        self._signatures[item_id] = signature
+        self._fingerprints[fingerprint] = item_id
+        self._ids.append(fingerprint)
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(key, []).append(item_id)
+        self._size += 1
+        return item_id
@@ -2,74 +2,125 @@ import json
 import streamlit as st
 from typing import List, Dict, Optional
 from config import Config
+from question_dedup import QuestionDedupIndex
+from question_grounding import GroundingScorer
+from summarizer import HierarchicalSummarizer
+from cloze_generator import ClozeQuestionGenerator
+from generation_backends import (
+    GenerationBackend, OpenAIBackend, OPENAI_AVAILABLE, create_backend
+)
 import random
 
-# Import OpenAI with error handling
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError as e:
-    st.error(f"OpenAI import failed: {e}")
-    OPENAI_AVAILABLE = False
-    OpenAI = None
+STRICT_REQUIREMENT = (
+    "- Only ask about facts stated explicitly in the content; the correct answer "
+    "and the explanation must use the content's own wording"
+)
 
-class QuestionGenerator:
-    """Generates quiz questions using OpenAI GPT"""
 
-    def __init__(self):
-        self.client = None
+def validate_question(question: Dict) -> bool:
+    """Check that a question has the fields and A-D options a quiz needs"""
+    if not isinstance(question, dict):
+        return False
+    required_fields = ['question', 'options', 'correct_answer', 'explanation']
 
-        if not OPENAI_AVAILABLE:
-            st.warning("⚠️ OpenAI library not available. Using sample questions.")
-        elif not Config.OPENAI_API_KEY or Config.OPENAI_API_KEY == 'your_openai_api_key_here':
-            st.warning("⚠️ OpenAI API key not configured. Please add your API key to the .env file.")
-        else:
-            try:
-                self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+    for field in required_fields:
+        if field not in question:
+            return False
+
+    # Validate options
+    if not isinstance(question['options'], dict):
+        return False
+
+    required_options = ['A', 'B', 'C', 'D']
+    for option in required_options:
+        if option not in question['options']:
+            return False
+
+    # Validate correct answer
+    if question['correct_answer'] not in required_options:
+        return False
+
+    return True
+
+
+class QuestionGenerator:
+    """Generates quiz questions using a pluggable generation backend"""
+
+    def __init__(self, backend: Optional[GenerationBackend] = None):
+        try:
+            self.backend = backend or create_backend()
+        except ValueError as e:
+            st.error(f"{str(e)}. Falling back to OpenAI.")
+            self.backend = OpenAIBackend()
+
+        if isinstance(self.backend, OpenAIBackend):
+            if not OPENAI_AVAILABLE:
+                st.warning("⚠️ OpenAI library not available. Using sample questions.")
+            elif not self.backend.is_configured():
+                st.warning("⚠️ OpenAI API key not configured. Please add your API key to the .env file.")
+            elif self.backend.init_error:
+                st.error(f"Error initializing OpenAI client: {self.backend.init_error}")
+            else:
                 st.success("✅ OpenAI client initialized successfully!")
-            except Exception as e:
-                st.error(f"Error initializing OpenAI client: {str(e)}")
 
-        self.model = Config.OPENAI_MODEL
-        self.max_tokens = Config.OPENAI_MAX_TOKENS
-        self.temperature = Config.OPENAI_TEMPERATURE
+        self.cloze_generator = ClozeQuestionGenerator()
+        self.grounding_scorer = GroundingScorer(min_score=Config.GROUNDING_MIN_SCORE)
+        self.question_bank = QuestionDedupIndex(threshold=Config.DEDUP_SIMILARITY_THRESHOLD,
+                                                path=Config.QUESTION_BANK_PATH or None)
+        self.summarizer = HierarchicalSummarizer(backend=self.backend, mode=Config.SUMMARY_MODE,
+                                                 cache_dir=Config.SUMMARY_CACHE_DIR or None)
+
+    @property
+    def client(self):
+        """OpenAI client of the active backend, if any"""
+        return getattr(self.backend, 'client', None)
     
     def generate_questions(self, content: str, num_questions: int = 5,
                          difficulty: str = "medium", topic: str = "") -> List[Dict]:
         """Generate quiz questions from content"""
 
-        # Check if OpenAI is available and configured
-        if not OPENAI_AVAILABLE:
-            st.info("🔄 Using sample questions (OpenAI not available)")
-            return self._generate_sample_questions(num_questions, difficulty)
-
-        if not self.client:
-            st.info("🔄 Using sample questions (API key not configured)")
+        # Check if the backend is available and configured
+        if not self.backend.is_available():
+            if isinstance(self.backend, OpenAIBackend) and not OPENAI_AVAILABLE:
+                st.info("🔄 Using sample questions (OpenAI not available)")
+            elif isinstance(self.backend, OpenAIBackend):
+                st.info("🔄 Using sample questions (API key not configured)")
+            else:
+                st.info(f"🔄 Using sample questions ({self.backend.label} not available)")
             return self._generate_sample_questions(num_questions, difficulty)
 
         try:
-            st.info("🤖 Generating questions using OpenAI GPT...")
+            st.info(f"🤖 Generating questions using {self.backend.label}...")
             prompt = self._create_prompt(content, num_questions, difficulty, topic)
 
-            # Use the new OpenAI API format
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert quiz generator. Create engaging and educational quiz questions."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
+            questions_text = self.backend.generate(
+                prompt, content, num_questions, difficulty, topic
             )
-
-            questions_text = response.choices[0].message.content
             questions = self._parse_questions(questions_text)
+            if questions:
+                # Questions were generated: filtering them may leave no quiz, but the
+                # demo samples (unrelated to the document) are never substituted
+                grounded = self._filter_ungrounded(questions, content)
+                if not grounded:
+                    grounded = self._regenerate_grounded(
+                        questions, content, num_questions, difficulty, topic
+                    )
+                if not grounded:
+                    st.error("❌ None of the generated questions are supported by the "
+                             "document, so no quiz was created")
+                    return []
+                questions = self._remove_duplicates(grounded, content, num_questions,
+                                                    difficulty, topic)
+                if not questions:
+                    st.error("❌ Only questions from earlier quizzes could be generated "
+                             "for this document")
+                    return []
 
             if questions:
-                st.success(f"✅ Generated {len(questions)} AI-powered questions!")
+                st.success(f"✅ Generated {len(questions)} questions using {self.backend.label}!")
                 return questions
             else:
-                st.warning("⚠️ AI generation failed, using sample questions")
+                st.warning("⚠️ Question generation failed, using sample questions")
                 return self._generate_sample_questions(num_questions, difficulty)
 
         except Exception as e:
@@ -83,9 +134,22 @@ class QuestionGenerator:
             st.info("🔄 Falling back to sample questions for demonstration.")
             return self._generate_sample_questions(num_questions, difficulty)
     
-    def _create_prompt(self, content: str, num_questions: int, 
-                      difficulty: str, topic: str) -> str:
-        """Create prompt for question generation"""
+    def generate_cloze_questions(self, content: str, num_questions: int = 5,
+                                 difficulty: str = "medium", topic: str = "") -> List[Dict]:
+        """Generate instant fill-in-the-blank questions without calling a model"""
+        questions = self.cloze_generator.generate(content, num_questions, difficulty, topic)
+
+        if questions:
+            st.success(f"⚡ Generated {len(questions)} quick practice questions!")
+            return questions
+
+        st.warning("⚠️ Not enough content for quick practice questions, using sample questions")
+        return self._generate_sample_questions(num_questions, difficulty)
+    
+    def _create_prompt(self, content: str, num_questions: int, difficulty: str,
+                       topic: str, avoid: Optional[List[str]] = None,
+                       strict: bool = False) -> str:
+        """Create prompt for question generation (strict: only stated facts)"""
         
         difficulty_instructions = {
             "easy": "Create simple, straightforward questions that test basic understanding.",
@@ -97,7 +161,7 @@ class QuestionGenerator:
 Based on the following content, generate {num_questions} multiple-choice quiz questions.
 
 Content:
-{content[:3000]}
+{self._prompt_content(content, topic)}
 
 Requirements:
 - Difficulty level: {difficulty} - {difficulty_instructions.get(difficulty, '')}
@@ -106,6 +170,8 @@ Requirements:
 - Provide a brief explanation for the correct answer
 - Questions should be relevant to the main topics in the content
 {f"- Focus on the topic: {topic}" if topic else ""}
+{"- Do not repeat or rephrase any of these existing questions: " + "; ".join(avoid) if avoid else ""}
+{STRICT_REQUIREMENT if strict else ""}
 
 IMPORTANT: Respond ONLY with valid JSON. No additional text before or after the JSON.
 
@@ -130,6 +196,18 @@ Return ONLY the JSON array. Do not include any explanatory text, markdown format
 """
         return prompt
     
+    def _prompt_content(self, content: str, topic: str) -> str:
+        """Fit content into the prompt budget, summarizing documents that are too long"""
+        budget = Config.PROMPT_CONTENT_CHARS
+        if len(content) <= budget:
+            return content
+
+        try:
+            return self.summarizer.build_context(content, topic, budget)
+        except Exception as e:
+            st.warning(f"⚠️ Could not summarize document, using its beginning: {str(e)}")
+            return content[:budget]
+    
     def _parse_questions(self, questions_text: str) -> List[Dict]:
         """Parse generated questions from GPT response"""
         try:
@@ -197,28 +275,75 @@ Return ONLY the JSON array. Do not include any explanatory text, markdown format
             st.error(f"❌ Error processing questions: {str(e)}")
             return []
     
+    def _filter_ungrounded(self, questions: List[Dict], content: str) -> List[Dict]:
+        """Drop questions whose answers are not supported by the source content"""
+        # Short manual topics are not source material, so there is nothing to ground against
+        if (not Config.GROUNDING_FILTER_ENABLED
+                or len(content.split()) < self.grounding_scorer.chunk_tokens):
+            return questions
+
+        kept, rejected = self.grounding_scorer.filter_questions(questions, content)
+        if not kept:
+            # Ungrounded questions never reach the quiz; the caller retries once instead
+            st.warning("⚠️ None of the generated questions could be matched to the document")
+            return []
+
+        if rejected:
+            st.info(f"🔎 Filtered out {len(rejected)} question(s) not grounded in the document")
+        return kept
+
+    def _regenerate_grounded(self, rejected: List[Dict], content: str,
+                             num_questions: int, difficulty: str,
+                             topic: str) -> List[Dict]:
+        """Ask once more, with a stricter prompt, after every question was ungrounded"""
+        st.info("🔁 Retrying with a prompt restricted to facts in the document...")
+        avoid = [q['question'] for q in rejected]
+        try:
+            prompt = self._create_prompt(content, num_questions, difficulty, topic,
+                                         avoid, strict=True)
+            questions = self._parse_questions(self.backend.generate(
+                prompt, content, num_questions, difficulty, topic, avoid
+            ))
+        except Exception as e:
+            st.warning(f"⚠️ Could not regenerate ungrounded questions: {str(e)}")
+            return []
+        return self._filter_ungrounded(questions, content) if questions else []
+    
+    def _remove_duplicates(self, questions: List[Dict], content: str, num_questions: int,
+                           difficulty: str, topic: str) -> List[Dict]:
+        """Drop near-duplicates of earlier questions and regenerate the shortfall once"""
+        unique, duplicates = self.question_bank.filter_new(questions)
+
+        if duplicates and len(unique) < num_questions:
+            missing = num_questions - len(unique)
+            avoid = [q['question'] for q in unique + duplicates]
+            try:
+                prompt = self._create_prompt(content, missing, difficulty, topic, avoid)
+                extra = self._parse_questions(
+                    self.backend.generate(prompt, content, missing, difficulty, topic, avoid)
+                )
+                extra = self._filter_ungrounded(extra, content) if extra else []
+            except Exception as e:
+                st.warning(f"⚠️ Could not regenerate duplicate questions: {str(e)}")
+                extra = []
+            more, _ = self.question_bank.filter_new(extra)
+            unique.extend(more[:missing])
+
+        if duplicates:
+            st.info(f"♻️ Replaced {len(duplicates)} question(s) already asked in earlier quizzes")
+        if not unique:
+            # Repeats never make up a quiz; the caller reports that no quiz was created
+            return []
+
+        try:
+            self.question_bank.save()
+        except Exception as e:
+            st.warning(f"⚠️ Could not save question bank: {str(e)}")
+        return unique
+    
     def _validate_question(self, question: Dict) -> bool:
         """Validate question structure"""
-        required_fields = ['question', 'options', 'correct_answer', 'explanation']
-        
-        for field in required_fields:
-            if field not in question:
-                return False
-        
-        # Validate options
-        if not isinstance(question['options'], dict):
-            return False
-        
-        required_options = ['A', 'B', 'C', 'D']
-        for option in required_options:
-            if option not in question['options']:
-                return False
-        
-        # Validate correct answer
-        if question['correct_answer'] not in required_options:
-            return False
-        
-        return True
+        return validate_question(question)
     
     def generate_adaptive_questions(self, content: str, performance_history: List[float],
                                   current_difficulty: str) -> List[Dict]:
@@ -0,0 +1,212 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from cloze_generator import STOPWORDS
+
+_WORD = re.compile(r"[A-Za-z0-9][A-Za-z0-9\-']*")
+_SUFFIXES = ('ing', 'ed', 'es', 's')
+
+
+def normalize_token(token: str) -> Optional[str]:
+    """Lowercase a token, drop stopwords and strip common inflection suffixes"""
+    token = token.lower().strip("-'")
+    if len(token) < 3 or token in STOPWORDS:
+        return None
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[:-len(suffix)]
+    return token
+
+
+def content_tokens(text: str) -> List[str]:
+    """Return the normalized content tokens of a text"""
+    tokens = (normalize_token(t) for t in _WORD.findall(text or ""))
+    return [t for t in tokens if t]
+
+
+class DocumentIndex:
+    """Overlapping token-window chunks of a document with their character offsets"""
+
+    def __init__(self, content: str, chunk_tokens: int = 120, stride: int = 90):
+        self.content = content
+        vocab: Dict[str, int] = {}
+        ids: List[int] = []
+        starts: List[int] = []
+        ends: List[int] = []
+
+        for match in _WORD.finditer(content):
+            token = normalize_token(match.group(0))
+            if token is None:
+                continue
+            ids.append(vocab.setdefault(token, len(vocab)))
+            starts.append(match.start())
+            ends.append(match.end())
+
+        self.vocab = vocab
+        token_ids = np.asarray(ids, dtype=np.int64)
+        token_starts = np.asarray(starts, dtype=np.int64)
+        token_ends = np.asarray(ends, dtype=np.int64)
+        n_tokens = len(token_ids)
+
+        # Window k covers tokens [k * stride, k * stride + chunk_tokens)
+        chunk_first = np.arange(0, max(n_tokens - chunk_tokens + stride, 1), stride)
+        chunk_first = chunk_first[chunk_first < max(n_tokens, 1)]
+        chunk_last = np.minimum(chunk_first + chunk_tokens, n_tokens)
+        self.n_chunks = len(chunk_first) if n_tokens else 0
+
+        if self.n_chunks:
+            lengths = chunk_last - chunk_first
+            pair_chunk = np.repeat(np.arange(self.n_chunks), lengths)
+            offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            pair_token = token_ids[np.repeat(chunk_first, lengths) + offsets]
+            pairs = np.unique(pair_chunk * max(len(vocab), 1) + pair_token)
+            self.pair_chunk = pairs // max(len(vocab), 1)
+            self.pair_term = pairs % max(len(vocab), 1)
+            self.chunk_starts = token_starts[chunk_first]
+            self.chunk_ends = token_ends[chunk_last - 1]
+            df = np.bincount(self.pair_term, minlength=len(vocab)).astype(np.float32)
+            self.idf = np.log((1.0 + self.n_chunks) / (1.0 + df)) + 1.0
+        else:
+            self.pair_chunk = self.pair_term = np.zeros(0, dtype=np.int64)
+            self.chunk_starts = self.chunk_ends = np.zeros(0, dtype=np.int64)
+            self.idf = np.zeros(0, dtype=np.float32)
+
+    def chunk_text(self, chunk_index: int) -> str:
+        """Return the source text of a chunk"""
+        return self.content[self.chunk_starts[chunk_index]:self.chunk_ends[chunk_index]]
+
+
+class GroundingScorer:
+    """Scores how well quiz questions are supported by the source document
+
+    Every question is scored by the IDF-weighted share of the terms in its
+    correct option and explanation that occur in the best-matching document
+    chunk. Distractors whose terms are just as well covered by that chunk are
+    flagged as ambiguous. A whole batch is scored with one matrix product, so
+    filtering 50 questions takes a few milliseconds once the document is indexed.
+    """
+
+    def __init__(self, min_score: float = 0.3, distractor_threshold: float = 0.8,
+                 chunk_tokens: int = 120, stride: int = 90, cache_size: int = 4):
+        self.min_score = min_score
+        self.distractor_threshold = distractor_threshold
+        self.chunk_tokens = chunk_tokens
+        self.stride = stride
+        self.cache_size = cache_size
+        self._indexes: "OrderedDict[str, DocumentIndex]" = OrderedDict()
+
+    def index(self, content: str) -> DocumentIndex:
+        """Return the (cached) chunk index of a document"""
+        key = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        if key in self._indexes:
+            self._indexes.move_to_end(key)
+            return self._indexes[key]
+
+        doc_index = DocumentIndex(content, self.chunk_tokens, self.stride)
+        self._indexes[key] = doc_index
+        if len(self._indexes) > self.cache_size:
+            self._indexes.popitem(last=False)
+        return doc_index
+
+    def score_questions(self, questions: List[Dict], content: str) -> List[Dict]:
+        """Return grounding details (score, source chunk, ambiguous options) per question"""
+        doc_index = self.index(content)
+        if not questions:
+            return []
+        if doc_index.n_chunks == 0:
+            return [self._result(0.0, None, doc_index, []) for _ in questions]
+
+        # Rows: one "answer" text per question followed by every option text
+        letters = ['A', 'B', 'C', 'D']
+        texts = []
+        for q in questions:
+            options = q.get('options', {})
+            correct = q.get('correct_answer', '')
+            texts.append(f"{options.get(correct, '')} {q.get('explanation', '')}")
+            texts.extend(str(options.get(letter, '')) for letter in letters)
+        row_tokens = [content_tokens(t) for t in texts]
+
+        # Restrict the document to the vocabulary used by this batch
+        columns: Dict[object, int] = {}
+        row_idx: List[int] = []
+        col_idx: List[int] = []
+        for row, tokens in enumerate(row_tokens):
+            for token in set(tokens):
+                term = doc_index.vocab.get(token)
+                # Terms missing from the document still count against coverage
+                col = columns.setdefault(term if term is not None else ('missing', token),
+                                         len(columns))
+                row_idx.append(row)
+                col_idx.append(col)
+
+        n_cols = max(len(columns), 1)
+        term_of_col = np.full(n_cols, -1, dtype=np.int64)
+        for term, col in columns.items():
+            if isinstance(term, int):
+                term_of_col[col] = term
+
+        col_of_term = np.full(len(doc_index.vocab), -1, dtype=np.int64)
+        known = term_of_col >= 0
+        col_of_term[term_of_col[known]] = np.nonzero(known)[0]
+
+        mask = col_of_term[doc_index.pair_term] >= 0
+        presence = np.zeros((doc_index.n_chunks, n_cols), dtype=np.float32)
+        presence[doc_index.pair_chunk[mask], col_of_term[doc_index.pair_term[mask]]] = 1.0
+
+        weights = np.ones(n_cols, dtype=np.float32)
+        weights[known] = doc_index.idf[term_of_col[known]]
+        # Unknown terms are weighted like the rarest document term
+        weights[~known] = doc_index.idf.max() if len(doc_index.idf) else 1.0
+
+        rows = np.zeros((len(texts), n_cols), dtype=np.float32)
+        rows[np.asarray(row_idx, dtype=np.int64), np.asarray(col_idx, dtype=np.int64)] = 1.0
+        rows *= weights
+        totals = rows.sum(axis=1, keepdims=True)
+        coverage = (rows @ presence.T) / np.maximum(totals, 1e-9)
+
+        coverage = coverage.reshape(len(questions), 5, doc_index.n_chunks)
+        best_chunk = coverage[:, 0, :].argmax(axis=1)
+        batch = np.arange(len(questions))
+        scores = coverage[batch, 0, best_chunk]
+        option_scores = coverage[batch, 1:, best_chunk]
+        empty_option = totals.reshape(len(questions), 5)[:, 1:] == 0
+
+        results = []
+        for i, q in enumerate(questions):
+            correct = q.get('correct_answer', '')
+            correct_pos = letters.index(correct) if correct in letters else -1
+            answer_option_score = option_scores[i, correct_pos] if correct_pos >= 0 else 0.0
+            ambiguous = [
+                letter for j, letter in enumerate(letters)
+                if j != correct_pos and not empty_option[i, j]
+                and option_scores[i, j] >= max(self.distractor_threshold, answer_option_score)
+            ]
+            chunk = int(best_chunk[i]) if scores[i] > 0 else None
+            results.append(self._result(float(scores[i]), chunk, doc_index, ambiguous))
+        return results
+
+    def filter_questions(self, questions: List[Dict], content: str,
+                         reject_ambiguous: bool = False) -> Tuple[List[Dict], List[Dict]]:
+        """Attach grounding details and split questions into (kept, rejected)"""
+        kept, rejected = [], []
+        for question, grounding in zip(questions, self.score_questions(questions, content)):
+            question = {**question, 'grounding': grounding}
+            ok = grounding['score'] >= self.min_score
+            if reject_ambiguous and grounding['ambiguous_options']:
+                ok = False
+            (kept if ok else rejected).append(question)
+        return kept, rejected
+
+    @staticmethod
+    def _result(score: float, chunk: Optional[int], doc_index: DocumentIndex,
+                ambiguous: List[str]) -> Dict:
+        source = None
+        if chunk is not None:
+            source = {
+                'chunk_index': chunk,
+                'start': int(doc_index.chunk_starts[chunk]),
+                'end': int(doc_index.chunk_ends[chunk])
+            }
+        return {'score': round(score, 4), 'source': source, 'ambiguous_options': ambiguous}
@@ -0,0 +1,141 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+# Header: magic, then the offset and length of the JSON index at the end of the file
+MAGIC = b'VQBUNDL1'
+HEADER = struct.Struct('<8sQQ')
+BUNDLE_SUFFIX = '.vqb'
+BUNDLE_VERSION = 1
+
+
+def write_bundle(target, questions: List[Dict], clips: Dict[str, Tuple[bytes, str]],
+                 metadata: Optional[Dict] = None):
+    """Write questions and their audio clips to a bundle file (a path or binary file)
+
+    clips maps audio cache keys to (clip bytes, file suffix). The clips are
+    stored back to back after the header and the index follows them, so
+    a bundle is written in one pass and read with a single seek.
+    """
+    if isinstance(target, (str, os.PathLike)):
+        directory = os.path.dirname(os.path.abspath(target))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write_bundle(f, questions, clips, metadata)
+            os.replace(tmp_path, target)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return
+
+    start = target.tell()
+    target.write(HEADER.pack(MAGIC, 0, 0))
+    index = {}
+    offset = HEADER.size
+    for key, (data, suffix) in clips.items():
+        target.write(data)
+        index[key] = [offset, len(data), suffix]
+        offset += len(data)
+    payload = json.dumps({
+        'version': BUNDLE_VERSION,
+        'metadata': metadata or {},
+        'questions': questions,
+        'clips': index,
+    }, ensure_ascii=False).encode('utf-8')
+    target.write(payload)
+    end = target.tell()
+    target.seek(start)
+    target.write(HEADER.pack(MAGIC, offset, len(payload)))
+    target.seek(end)
+
+
+class QuizBundle:
+    """A quiz bundle opened read-only through a memory map
+
+    Opening parses only the index; a clip's pages are read from the file
+    when the clip is first requested, so a large voice quiz starts without
+    loading or synthesizing its audio. Bundles can be attached to an
+    AudioCache as a read-only tier.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            if os.fstat(self._file.fileno()).st_size < HEADER.size:
+                raise ValueError(f"Not a quiz bundle: {path}")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, offset, length = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or offset + length > len(self._map):
+                raise ValueError(f"Not a quiz bundle: {path}")
+            try:
+                index = json.loads(self._map[offset:offset + length].decode())
+            except ValueError:
+                raise ValueError(f"Not a quiz bundle: {path}") from None
+            if not isinstance(index, dict):
+                raise ValueError(f"Not a quiz bundle: {path}")
+            if index.get('version') != BUNDLE_VERSION:
+                raise ValueError(
+                    f"Unsupported quiz bundle version: {index.get('version')}")
+            self.metadata: Dict = index.get('metadata')
+            self.questions: List[Dict] = index.get('questions')
+            self._clips: Dict[str, list] = index.get('clips')
+            self._check_index(offset)
+        except BaseException:
+            self.close()
+            raise
+
+    def _check_index(self, clips_end: int):
+        """Raise ValueError unless the index has the shape write_bundle produces"""
+        if not isinstance(self.metadata, dict) or not isinstance(self.questions, list):
+            raise ValueError(f"Quiz bundle index is incomplete: {self.path}")
+        if not isinstance(self._clips, dict):
+            raise ValueError(f"Quiz bundle index is incomplete: {self.path}")
+        for entry in self._clips.values():
+            valid = (isinstance(entry, list) and len(entry) == 3
+                     and all(isinstance(n, int) and n >= 0 for n in entry[:2])
+                     and entry[0] + entry[1] <= clips_end and isinstance(entry[2], str))
+            if not valid:
+                raise ValueError(f"Quiz bundle has a corrupt clip entry: {self.path}")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._clips
+
+    def __len__(self) -> int:
+        return len(self._clips)
+
+    def keys(self) -> List[str]:
+        return list(self._clips)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the bytes of a clip, or None if the bundle does not hold it"""
+        entry = self._clips.get(key)
+        if entry is None or self._map is None:
+            return None
+        offset, length, _ = entry
+        try:
+            return self._map[offset:offset + length]
+        except ValueError:
+            # Closed by another thread
+            return None
+
+    def suffix(self, key: str) -> str:
+        entry = self._clips.get(key)
+        return entry[2] if entry else '.mp3'
+
+    def close(self):
+        """Release the memory map and the file"""
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+        self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
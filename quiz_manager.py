@@ -3,12 +3,46 @@ import time
 from typing import List, Dict, Optional
 import pandas as pd
 from datetime import datetime
+import io
 import json
+import uuid
+from config import Config
+from question_generator import validate_question
+from quiz_bundle import QuizBundle, write_bundle
+
+
+def _new_stats() -> Dict:
+    """Running aggregates of a quiz session, updated on every answer"""
+    return {
+        'answers': 0,
+        'correct': 0,
+        'score_sum': 0.0,
+        'score_sq_sum': 0.0,
+        'timed': 0,
+        'time_sum': 0.0,
+        'time_sq_sum': 0.0,
+        'time_min': None,
+        'time_max': None,
+        'by_topic': {},
+        'by_difficulty': {},
+        'trend': [],
+        'rows': []
+    }
+
+
+def _variance(total: float, squares: float, count: int) -> float:
+    """Population variance from a running sum and sum of squares"""
+    if not count:
+        return 0.0
+    mean = total / count
+    return max(squares / count - mean * mean, 0.0)
+
 
 class QuizManager:
     """Manages quiz sessions, scoring, and performance tracking"""
 
-    def __init__(self):
+    def __init__(self, voice_handler=None):
+        self.voice_handler = voice_handler
         self.initialize_session_state()
     
     def initialize_session_state(self):
@@ -23,11 +57,15 @@ class QuizManager:
                 'end_time': None,
                 'difficulty': 'medium',
                 'performance_history': [],
-                'session_active': False
+                'session_active': False,
+                'stats': _new_stats()
             }
 
     def reset_session(self):
         """Reset quiz session data"""
+        if 'quiz_session' in st.session_state:
+            self._cancel_audio()
+            self._release_bundle()
         st.session_state.quiz_session = {
             'questions': [],
             'current_question': 0,
@@ -37,7 +75,8 @@ class QuizManager:
             'end_time': None,
             'difficulty': 'medium',
             'performance_history': [],
-            'session_active': False
+            'session_active': False,
+            'stats': _new_stats()
         }
     
     def start_quiz(self, questions: List[Dict], difficulty: str = 'medium'):
@@ -45,6 +84,7 @@ class QuizManager:
         # Ensure session state exists
         if 'quiz_session' not in st.session_state:
             self.initialize_session_state()
+        self._release_bundle()
 
         st.session_state.quiz_session.update({
             'questions': questions,
@@ -54,9 +94,102 @@ class QuizManager:
             'start_time': datetime.now(),
             'end_time': None,
             'difficulty': difficulty,
-            'session_active': True
+            'session_active': True,
+            'stats': _new_stats(),
+            'answer_timer': None,
+            'autoplayed_question': None
         })
+        self._prerender_audio()
+
+    def _audio_owner(self) -> str:
+        """Id of this quiz session in the shared audio pre-render queue"""
+        session = st.session_state.quiz_session
+        if 'audio_owner' not in session:
+            session['audio_owner'] = uuid.uuid4().hex
+        return session['audio_owner']
+
+    def _prerender_audio(self):
+        """Queue audio for the remaining questions, upcoming question first"""
+        if self.voice_handler is None or not Config.TTS_PRERENDER_ENABLED:
+            return
+        # Nothing is spoken with voice mode off, so leave the TTS engine unloaded
+        if not st.session_state.get('use_voice', True):
+            return
+        session = st.session_state.quiz_session
+        try:
+            self.voice_handler.prerender_quiz(session['questions'], session['current_question'],
+                                              owner=self._audio_owner())
+        except Exception:
+            # Audio is still rendered on demand if pre-rendering cannot be queued
+            pass
+
+    def _cancel_audio(self):
+        """Cancel the pending pre-render jobs of this quiz session"""
+        if self.voice_handler is None:
+            return
+        session = st.session_state.quiz_session
+        if 'audio_owner' in session:
+            self.voice_handler.cancel_prerender(session['audio_owner'])
     
+    def export_bundle(self, include_audio: bool = True) -> bytes:
+        """Export the quiz questions with their rendered audio as a quiz bundle
+
+        Clips that are not cached yet are rendered first, so exporting with
+        audio may call the TTS engine; replaying the bundle never does.
+        """
+        session = st.session_state.quiz_session
+        clips, metadata = {}, {'difficulty': session['difficulty'],
+                               'exported_at': datetime.now().isoformat()}
+        if include_audio and self.voice_handler is not None:
+            clips = self.voice_handler.bundle_clips(session['questions'])
+            metadata['voice'] = self.voice_handler.bundle_metadata()
+        buffer = io.BytesIO()
+        write_bundle(buffer, session['questions'], clips, metadata)
+        return buffer.getvalue()
+
+    def start_bundle(self, path: str) -> int:
+        """Start a quiz from a bundle file and return how many of its clips are playable
+
+        The bundle stays memory-mapped for the session and its clips are
+        served from the audio cache, so nothing is queued for rendering.
+        Raises ValueError for a bundle that is not a valid quiz; on any
+        failure the bundle is detached and closed again.
+        """
+        bundle = QuizBundle(path)
+        try:
+            questions = bundle.questions
+            if not questions or not all(validate_question(q) for q in questions):
+                raise ValueError("The bundle has no questions or malformed ones")
+            ready = 0
+            if self.voice_handler is not None:
+                ready = self.voice_handler.attach_bundle(bundle)
+            self.start_quiz(questions, bundle.metadata.get('difficulty', 'medium'))
+            st.session_state.quiz_session['bundle'] = bundle
+        except BaseException:
+            if self.voice_handler is not None:
+                self.voice_handler.detach_bundle(bundle)
+            bundle.close()
+            raise
+        return ready
+
+    def _renew_bundle(self):
+        """Renew the scratch lease of the bundle file while its quiz is played"""
+        bundle = st.session_state.quiz_session.get('bundle')
+        if bundle is not None and self.voice_handler is not None:
+            self.voice_handler.scratch.touch(bundle.path)
+
+    def _release_bundle(self):
+        """Detach and close the session's bundle and release its scratch file"""
+        bundle = st.session_state.quiz_session.pop('bundle', None)
+        if bundle is None:
+            return
+        if self.voice_handler is not None:
+            self.voice_handler.detach_bundle(bundle)
+        bundle.close()
+        scratch = self.voice_handler.scratch if self.voice_handler is not None else None
+        if scratch is not None and scratch.owns(bundle.path):
+            scratch.release(bundle.path)
+
     def get_current_question(self) -> Optional[Dict]:
         """Get the current question"""
         try:
@@ -72,8 +205,50 @@ class QuizManager:
             st.error(f"Error getting current question: {str(e)}")
             return None
     
-    def submit_answer(self, user_answer: str, time_taken: float = 0) -> Dict:
-        """Submit an answer and get feedback"""
+    def start_answer_timer(self, delay: float = 0.0, after_playback: bool = False):
+        """Start timing the answer to the current question, delay seconds from now
+
+        With after_playback the start is the end of the question's audio: the
+        first playback moves a timer started on display to the end of the
+        clip, and a playback that was cut short (a rerun stops the player) is
+        rescheduled. Replays of a clip heard in full do not reset the clock.
+        """
+        session = st.session_state.quiz_session
+        index = session['current_question']
+        timer = session.get('answer_timer')
+        now = time.time()
+        if timer and timer['question'] == index:
+            if not after_playback or (timer['after_playback'] and timer['starts_at'] <= now):
+                return
+        session['answer_timer'] = {'question': index, 'starts_at': now + delay,
+                                   'after_playback': after_playback}
+
+    def claim_autoplay(self) -> bool:
+        """Return True the first time the current question should auto-play
+
+        A question whose audio was scheduled to follow the previous feedback
+        is only played again if that playback had not finished.
+        """
+        session = st.session_state.quiz_session
+        index = session['current_question']
+        if session.get('autoplayed_question') == index:
+            return False
+        session['autoplayed_question'] = index
+        timer = session.get('answer_timer')
+        return not (timer and timer['question'] == index and timer['after_playback']
+                    and timer['starts_at'] <= time.time())
+
+    def answer_time_elapsed(self) -> float:
+        """Seconds since the current question's answer timer started (0 if it is not timed)"""
+        session = st.session_state.quiz_session
+        timer = session.get('answer_timer')
+        if not timer or timer['question'] != session['current_question']:
+            return 0
+        # 0 means untimed, so an answer given while the clip plays counts as immediate
+        return max(time.time() - timer['starts_at'], 0.01)
+
+    def submit_answer(self, user_answer: str, time_taken: Optional[float] = None) -> Dict:
+        """Submit an answer and get feedback (time_taken defaults to the answer timer)"""
         try:
             # Ensure session state is initialized
             self.initialize_session_state()
@@ -87,6 +262,8 @@ class QuizManager:
             st.error(f"Error in submit_answer: {str(e)}")
             return {'error': f'Session error: {str(e)}'}
         
+        if time_taken is None:
+            time_taken = self.answer_time_elapsed()
         correct_answer = current_q['correct_answer']
         is_correct = user_answer.upper() == correct_answer.upper()
         
@@ -108,6 +285,8 @@ class QuizManager:
         
         session['answers'].append(answer_data)
         session['scores'].append(final_score)
+        self._record_stats(session, current_q, answer_data)
+        self._renew_bundle()
         
         # Move to next question
         session['current_question'] += 1
@@ -115,6 +294,8 @@ class QuizManager:
         # Check if quiz is complete
         if session['current_question'] >= len(session['questions']):
             self.end_quiz()
+        else:
+            self._prerender_audio()
         
         return {
             'is_correct': is_correct,
@@ -124,11 +305,68 @@ class QuizManager:
             'quiz_complete': session['current_question'] >= len(session['questions'])
         }
     
+    def _session_stats(self, session: Dict) -> Dict:
+        """Running aggregates of the session, rebuilt from its answers if they are out of step"""
+        stats = session.get('stats')
+        if stats is None or stats['answers'] != len(session['answers']):
+            # Sessions created before the aggregates existed, or edited outside submit_answer
+            stats = session['stats'] = _new_stats()
+            for answer in session['answers']:
+                self._fold_answer(stats, session, session['questions'][answer['question_index']], answer)
+        return stats
+
+    def _record_stats(self, session: Dict, question: Dict, answer: Dict):
+        """Update the running aggregates with the answer just appended to the session"""
+        stats = session.get('stats')
+        if stats is not None and stats['answers'] == len(session['answers']) - 1:
+            self._fold_answer(stats, session, question, answer)
+        else:
+            self._session_stats(session)
+
+    def _fold_answer(self, stats: Dict, session: Dict, question: Dict, answer: Dict):
+        """Add one answer to the aggregates: counts, sums, sums of squares and tallies"""
+        score, time_taken, correct = answer['score'], answer['time_taken'], answer['is_correct']
+        stats['answers'] += 1
+        stats['correct'] += correct
+        stats['score_sum'] += score
+        stats['score_sq_sum'] += score * score
+        if time_taken > 0:
+            stats['timed'] += 1
+            stats['time_sum'] += time_taken
+            stats['time_sq_sum'] += time_taken * time_taken
+            stats['time_min'] = time_taken if stats['time_min'] is None else min(stats['time_min'], time_taken)
+            stats['time_max'] = time_taken if stats['time_max'] is None else max(stats['time_max'], time_taken)
+        groups = (('by_topic', question.get('topic') or 'General'),
+                  ('by_difficulty', question.get('difficulty') or session['difficulty']))
+        for field, name in groups:
+            tally = stats[field].setdefault(name, {'answers': 0, 'correct': 0, 'score_sum': 0.0})
+            tally['answers'] += 1
+            tally['correct'] += correct
+            tally['score_sum'] += score
+
+        # Moving average of the last 3 scores, as get_performance_trend reports it
+        count = stats['answers']
+        if count >= 3:
+            stats['trend'].append(sum(session['scores'][count - 3:count]) / 3)
+
+        index = answer['question_index']
+        text = question['question']
+        stats['rows'].append({
+            'Question': f"Q{index+1}",
+            'Question Text': text[:50] + "..." if len(text) > 50 else text,
+            'Your Answer': answer['user_answer'],
+            'Correct Answer': answer['correct_answer'],
+            'Result': '✓' if correct else '✗',
+            'Score': f"{score:.2f}",
+            'Time (s)': f"{time_taken:.1f}" if time_taken > 0 else "N/A"
+        })
+
     def end_quiz(self):
         """End the current quiz session"""
         session = st.session_state.quiz_session
         session['end_time'] = datetime.now()
         session['session_active'] = False
+        self._cancel_audio()
         
         # Calculate overall performance
         if session['scores']:
@@ -161,16 +399,18 @@ class QuizManager:
         if not session['answers']:
             return {'no_data': True}
         
-        correct_answers = sum(1 for ans in session['answers'] if ans['is_correct'])
-        total_answers = len(session['answers'])
+        # Read from the running aggregates instead of rescanning the answers
+        stats = self._session_stats(session)
+        correct_answers = stats['correct']
+        total_answers = stats['answers']
         accuracy = (correct_answers / total_answers * 100) if total_answers > 0 else 0
         
-        total_score = sum(session['scores'])
-        average_score = total_score / len(session['scores']) if session['scores'] else 0
+        total_score = stats['score_sum']
+        average_score = total_score / total_answers if total_answers else 0
         
         # Time statistics
-        times = [ans['time_taken'] for ans in session['answers'] if ans['time_taken'] > 0]
-        avg_time = sum(times) / len(times) if times else 0
+        avg_time = stats['time_sum'] / stats['timed'] if stats['timed'] else 0
+        time_variance = _variance(stats['time_sum'], stats['time_sq_sum'], stats['timed'])
         
         # Session duration
         duration = None
@@ -184,8 +424,28 @@ class QuizManager:
             'total_score': total_score,
             'average_score': average_score,
             'average_time_per_question': avg_time,
+            'score_variance': _variance(stats['score_sum'], stats['score_sq_sum'], total_answers),
+            'time_variance': time_variance,
+            'time_std': time_variance ** 0.5,
+            'min_time': stats['time_min'],
+            'max_time': stats['time_max'],
             'session_duration': duration,
-            'difficulty': session['difficulty']
+            'difficulty': session['difficulty'],
+            'by_topic': self._tally_summary(stats['by_topic']),
+            'by_difficulty': self._tally_summary(stats['by_difficulty'])
+        }
+
+    @staticmethod
+    def _tally_summary(tallies: Dict) -> Dict:
+        """Accuracy and average score per topic or difficulty"""
+        return {
+            name: {
+                'answers': tally['answers'],
+                'correct_answers': tally['correct'],
+                'accuracy_percentage': tally['correct'] / tally['answers'] * 100,
+                'average_score': tally['score_sum'] / tally['answers']
+            }
+            for name, tally in tallies.items()
         }
     
     def get_detailed_results(self) -> pd.DataFrame:
@@ -195,20 +455,8 @@ class QuizManager:
         if not session['answers']:
             return pd.DataFrame()
         
-        results_data = []
-        for i, answer in enumerate(session['answers']):
-            question = session['questions'][i]
-            results_data.append({
-                'Question': f"Q{i+1}",
-                'Question Text': question['question'][:50] + "..." if len(question['question']) > 50 else question['question'],
-                'Your Answer': answer['user_answer'],
-                'Correct Answer': answer['correct_answer'],
-                'Result': '✓' if answer['is_correct'] else '✗',
-                'Score': f"{answer['score']:.2f}",
-                'Time (s)': f"{answer['time_taken']:.1f}" if answer['time_taken'] > 0 else "N/A"
-            })
-        
-        return pd.DataFrame(results_data)
+        # Rows are formatted as answers come in
+        return pd.DataFrame(self._session_stats(session)['rows'])
     
     def export_session_data(self) -> str:
         """Export session data as JSON"""
@@ -240,13 +488,8 @@ class QuizManager:
         if len(session['scores']) < 3:
             return session['scores']
         
-        # Calculate moving average of last 3 questions
-        trend = []
-        for i in range(2, len(session['scores'])):
-            avg = sum(session['scores'][i-2:i+1]) / 3
-            trend.append(avg)
-        
-        return trend
+        # Moving average of the last 3 questions, extended on every answer
+        return list(self._session_stats(session)['trend'])
     
     def should_adjust_difficulty(self) -> Optional[str]:
         """Determine if difficulty should be adjusted"""
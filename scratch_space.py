@@ -0,0 +1,249 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from config import Config
+
+DIR_PREFIX = "voice-quiz-scratch-"
+# Windows API constants for the process liveness check
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_ERROR_ACCESS_DENIED = 5
+_STILL_ACTIVE = 259
+
+
+def _pid_alive(pid: int) -> bool:
+    """Return True if a process with this pid runs (or its state cannot be told)"""
+    if os.name == 'nt':
+        # os.kill(pid, 0) sends CTRL_C_EVENT on Windows, so ask the kernel instead
+        return _windows_pid_alive(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def _windows_pid_alive(pid: int) -> bool:
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    kernel32.GetExitCodeProcess.argtypes = (wintypes.HANDLE,
+                                            ctypes.POINTER(wintypes.DWORD))
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+    handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        # Access denied means the process exists but belongs to someone else
+        return ctypes.get_last_error() == _ERROR_ACCESS_DENIED
+    try:
+        code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+            return True
+        return code.value == _STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+class ScratchSpace:
+    """Managed directory for short-lived audio files
+
+    Every process gets its own directory under the system temp dir. Files
+    are tracked in LRU order; creating a file that would exceed the byte or
+    file quota first reclaims the least recently used ones, and a janitor
+    thread removes files older than ttl_seconds. Pinned files (kept open or
+    memory-mapped by their owner) are exempt from the quota and from LRU
+    reclamation but hold a lease of pinned_ttl_seconds, renewed by touch();
+    the janitor removes them once it runs out, so abandoned sessions cannot
+    pile them up. Directories left behind by processes that no longer run
+    are removed on start-up.
+    """
+
+    def __init__(self, quota_bytes: int = 64 * 1024 * 1024, max_files: int = 256,
+                 ttl_seconds: float = 15 * 60, janitor_interval: float = 60.0,
+                 parent_dir: Optional[str] = None,
+                 pinned_ttl_seconds: float = 2 * 60 * 60):
+        self.quota_bytes = quota_bytes
+        self.max_files = max_files
+        self.ttl_seconds = ttl_seconds
+        self.pinned_ttl_seconds = pinned_ttl_seconds
+        self.janitor_interval = janitor_interval
+        self.parent_dir = parent_dir or tempfile.gettempdir()
+        self._remove_orphans()
+        self.directory = tempfile.mkdtemp(prefix=f"{DIR_PREFIX}{os.getpid()}-",
+                                          dir=self.parent_dir)
+        self._files: "OrderedDict[str, tuple]" = OrderedDict()
+        # Pinned files: path -> (size, lease expiry on the monotonic clock)
+        self._pinned: Dict[str, tuple] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._janitor: Optional[threading.Thread] = None
+        self.created = 0
+        self.reclaimed = 0
+        self.expired = 0
+
+    def _remove_orphans(self):
+        try:
+            names = os.listdir(self.parent_dir)
+        except OSError:
+            return
+        for name in names:
+            if not name.startswith(DIR_PREFIX):
+                continue
+            pid = name[len(DIR_PREFIX):].split('-', 1)[0]
+            if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+                shutil.rmtree(os.path.join(self.parent_dir, name), ignore_errors=True)
+
+    def create(self, data: bytes, suffix: str = "", pinned: bool = False) -> str:
+        """Write data to a new scratch file and return its path
+
+        A pinned file is never reclaimed to make room and only expires when
+        its lease (pinned_ttl_seconds, renewed by touch()) runs out; the
+        caller should release it when done (e.g. a file that stays open or
+        memory-mapped).
+        """
+        size = len(data)
+        with self._lock:
+            if pinned:
+                fd, path = tempfile.mkstemp(dir=self.directory, suffix=suffix)
+                self._pinned[path] = (size, time.monotonic() + self.pinned_ttl_seconds)
+            else:
+                self._reclaim(size)
+                fd, path = tempfile.mkstemp(dir=self.directory, suffix=suffix)
+                self._files[path] = (size, time.monotonic())
+                self._bytes += size
+            self.created += 1
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+        except Exception:
+            self.release(path)
+            raise
+        self._ensure_janitor()
+        return path
+
+    def touch(self, path: str):
+        """Mark a file as recently used so it is spared (renews a pinned lease)"""
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None:
+                self._files[path] = (entry[0], time.monotonic())
+                self._files.move_to_end(path)
+            elif path in self._pinned:
+                self._pinned[path] = (self._pinned[path][0],
+                                      time.monotonic() + self.pinned_ttl_seconds)
+
+    def owns(self, path: Optional[str]) -> bool:
+        """Return True if the path is a live file of this scratch space"""
+        with self._lock:
+            return path in self._files or path in self._pinned
+
+    def release(self, path: str):
+        """Delete a scratch file now"""
+        with self._lock:
+            self._remove(path)
+
+    def _remove(self, path: str):
+        entry = self._files.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry[0]
+        elif self._pinned.pop(path, None) is None:
+            return
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _reclaim(self, incoming: int):
+        while self._files and (self._bytes + incoming > self.quota_bytes
+                               or len(self._files) >= self.max_files):
+            self._remove(next(iter(self._files)))
+            self.reclaimed += 1
+
+    def sweep(self) -> int:
+        """Remove files not used for ttl_seconds and pinned files whose lease ran out
+
+        Returns how many files were removed.
+        """
+        now = time.monotonic()
+        cutoff = now - self.ttl_seconds
+        removed = 0
+        with self._lock:
+            # Entries are in LRU order, so the expired ones come first
+            while self._files:
+                path, (_, used) = next(iter(self._files.items()))
+                if used > cutoff:
+                    break
+                self._remove(path)
+                removed += 1
+            for path in [p for p, (_, expiry) in self._pinned.items() if expiry <= now]:
+                self._remove(path)
+                removed += 1
+            self.expired += removed
+        return removed
+
+    def _ensure_janitor(self):
+        if self._janitor is not None or self.janitor_interval <= 0:
+            return
+        with self._lock:
+            if self._janitor is None:
+                self._janitor = threading.Thread(target=self._janitor_loop,
+                                                 name="scratch-janitor", daemon=True)
+                self._janitor.start()
+
+    def _janitor_loop(self):
+        while not self._stop.wait(self.janitor_interval):
+            self.sweep()
+
+    def stats(self) -> Dict:
+        """Return gauges for bytes and files in use plus lifetime counters"""
+        with self._lock:
+            return {
+                'bytes_in_use': self._bytes,
+                'files_in_use': len(self._files),
+                'pinned_files': len(self._pinned),
+                'pinned_bytes': sum(size for size, _ in self._pinned.values()),
+                'quota_bytes': self.quota_bytes,
+                'max_files': self.max_files,
+                'created': self.created,
+                'reclaimed': self.reclaimed,
+                'expired': self.expired
+            }
+
+    def close(self):
+        """Stop the janitor and delete the directory with everything in it"""
+        self._stop.set()
+        with self._lock:
+            self._files.clear()
+            self._pinned.clear()
+            self._bytes = 0
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+_shared_scratch = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_scratch_space() -> ScratchSpace:
+    """Return the process-wide scratch space, removed again at interpreter exit"""
+    global _shared_scratch
+    with _shared_lock:
+        if _shared_scratch is None:
+            _shared_scratch = ScratchSpace(
+                quota_bytes=Config.SCRATCH_QUOTA_MB * 1024 * 1024,
+                max_files=Config.SCRATCH_MAX_FILES,
+                ttl_seconds=Config.SCRATCH_TTL_SECONDS,
+                janitor_interval=Config.SCRATCH_JANITOR_INTERVAL_SECONDS,
+                pinned_ttl_seconds=Config.SCRATCH_PINNED_TTL_SECONDS
+            )
+            atexit.register(_shared_scratch.close)
+        return _shared_scratch
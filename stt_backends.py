@@ -0,0 +1,340 @@
+import io
+import json
+import os
+import threading
+import wave
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from capabilities import load_optional, module_available
+from config import Config
+
+# Optional engines are probed cheaply here and imported on first use
+SPEECH_RECOGNITION_AVAILABLE = module_available('speech_recognition')
+VOSK_AVAILABLE = module_available('vosk')
+KaldiRecognizer = Model = SetLogLevel = None
+
+
+def _load_vosk():
+    """Bind the Vosk classes on first use (tests may have bound stand-ins already)"""
+    global KaldiRecognizer, Model, SetLogLevel
+    if Model is None:
+        vosk = load_optional('vosk')
+        if vosk is None:
+            raise RuntimeError("vosk could not be imported")
+        KaldiRecognizer, Model, SetLogLevel = vosk.KaldiRecognizer, vosk.Model, vosk.SetLogLevel
+
+
+class SpeechNotRecognized(Exception):
+    """The audio did not contain any recognizable speech"""
+
+
+class RecognitionServiceError(Exception):
+    """The recognition engine or service failed"""
+
+
+def read_wav_pcm(wav_bytes: bytes) -> Tuple[bytes, int]:
+    """Decode WAV bytes into mono 16-bit PCM and its sample rate"""
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if channels == 1 and width == 2:
+        return frames, rate
+
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.int32) - 128) << 8
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.int32)
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype='<i4').astype(np.int64) >> 16
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return np.clip(samples, -32768, 32767).astype('<i2').tobytes(), rate
+
+
+def pcm_to_wav(pcm: bytes, rate: int) -> bytes:
+    """Wrap mono 16-bit PCM in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class BufferedSession:
+    """Streaming session for backends that can only transcribe whole recordings
+
+    Audio is collected as it arrives and recognized once in finish(); no
+    partial transcripts are produced.
+    """
+
+    def __init__(self, backend: 'STTBackend', rate: int, language: str,
+                 phrases: Optional[List[str]] = None):
+        self.backend = backend
+        self.rate = rate
+        self.language = language
+        self.phrases = phrases
+        self._chunks: List[bytes] = []
+
+    def accept(self, pcm: bytes) -> str:
+        """Feed 16-bit mono PCM and return the partial transcript so far"""
+        self._chunks.append(pcm)
+        return ""
+
+    def finish(self) -> Tuple[str, float]:
+        """Return (transcript, confidence) for everything fed so far"""
+        wav_bytes = pcm_to_wav(b"".join(self._chunks), self.rate)
+        if self.phrases:
+            return self.backend.spot(wav_bytes, self.language, self.phrases)
+        return self.backend.transcribe(wav_bytes, self.language), 1.0
+
+
+class STTBackend:
+    """Base class for speech-to-text backends
+
+    A backend transcribes one WAV recording (or mono PCM at any rate) into
+    text. It raises
+    SpeechNotRecognized when the audio holds no speech it understands and
+    RecognitionServiceError when the engine itself fails.
+    """
+
+    name = "base"
+    label = "speech recognizer"
+    # Native input rate; recordings are resampled to it before recognition
+    sample_rate = 16000
+
+    def is_available(self) -> bool:
+        """Return True if the backend can transcribe audio"""
+        return True
+
+    def warm_up(self):
+        """Load models ahead of the first request (no-op by default)"""
+
+    def transcribe(self, wav_bytes: bytes, language: str) -> str:
+        """Return the transcript of a WAV recording"""
+        raise NotImplementedError
+
+    def transcribe_pcm(self, pcm: bytes, rate: int, language: str) -> str:
+        """Return the transcript of mono 16-bit PCM held in memory"""
+        return self.transcribe(pcm_to_wav(pcm, rate), language)
+
+    def spot(self, wav_bytes: bytes, language: str, phrases: List[str]) -> Tuple[str, float]:
+        """Return (transcript, confidence) for a recording expected to be one of phrases
+
+        Backends that support a restricted grammar decode against the phrase
+        list only; the default falls back to full transcription.
+        """
+        return self.transcribe(wav_bytes, language), 1.0
+
+    def stream(self, rate: int, language: str, phrases: Optional[List[str]] = None):
+        """Start incremental recognition of one utterance of 16-bit mono PCM"""
+        return BufferedSession(self, rate, language, phrases)
+
+
+class GoogleSTTBackend(STTBackend):
+    """Google Web Speech API through speech_recognition (needs network access)"""
+
+    name = "google"
+    label = "Google Speech Recognition"
+
+    def __init__(self):
+        self._recognizer = None
+
+    @property
+    def recognizer(self):
+        """speech_recognition's Recognizer, imported and created on first use"""
+        if self._recognizer is None:
+            sr = load_optional('speech_recognition')
+            if sr is not None:
+                self._recognizer = sr.Recognizer()
+        return self._recognizer
+
+    def is_available(self) -> bool:
+        return SPEECH_RECOGNITION_AVAILABLE and self.recognizer is not None
+
+    def transcribe(self, wav_bytes: bytes, language: str) -> str:
+        sr = load_optional('speech_recognition')
+        with sr.AudioFile(io.BytesIO(wav_bytes)) as source:
+            audio = self.recognizer.record(source)
+        return self._recognize(audio, language)
+
+    def transcribe_pcm(self, pcm: bytes, rate: int, language: str) -> str:
+        sr = load_optional('speech_recognition')
+        return self._recognize(sr.AudioData(pcm, rate, 2), language)
+
+    def _recognize(self, audio, language: str) -> str:
+        sr = load_optional('speech_recognition')
+        try:
+            return self.recognizer.recognize_google(audio, language=language)
+        except sr.UnknownValueError:
+            raise SpeechNotRecognized()
+        except sr.RequestError as e:
+            raise RecognitionServiceError(str(e))
+
+    def spot(self, wav_bytes: bytes, language: str, phrases: List[str]) -> Tuple[str, float]:
+        sr = load_optional('speech_recognition')
+        with sr.AudioFile(io.BytesIO(wav_bytes)) as source:
+            audio = self.recognizer.record(source)
+        try:
+            response = self.recognizer.recognize_google(audio, language=language, show_all=True)
+        except sr.RequestError as e:
+            raise RecognitionServiceError(str(e))
+        alternatives = response.get('alternative', []) if isinstance(response, dict) else []
+        if not alternatives:
+            raise SpeechNotRecognized()
+        # Prefer the first alternative that is one of the expected phrases
+        expected = set(phrases)
+        best = next((alt for alt in alternatives
+                     if alt.get('transcript', '').lower().strip() in expected), alternatives[0])
+        confidence = alternatives[0].get('confidence', 0.5)
+        return best.get('transcript', ''), float(confidence)
+
+
+_vosk_models: Dict[str, object] = {}
+_vosk_lock = threading.Lock()
+
+
+def load_vosk_model(model_path: str):
+    """Return the Vosk model at a path, loading it only once per process"""
+    model_path = os.path.abspath(model_path)
+    with _vosk_lock:
+        model = _vosk_models.get(model_path)
+        if model is None:
+            _load_vosk()
+            SetLogLevel(-1)
+            model = Model(model_path)
+            _vosk_models[model_path] = model
+        return model
+
+
+class VoskBackend(STTBackend):
+    """Offline CPU recognition with Vosk (Kaldi) models
+
+    The model is loaded once per process and shared by every session; each
+    request only creates a lightweight recognizer over it.
+    """
+
+    name = "vosk"
+    label = "Vosk (offline)"
+    chunk_frames = 4000
+
+    def __init__(self, model_path: Optional[str] = None):
+        self.model_path = model_path or Config.VOSK_MODEL_PATH
+
+    def is_available(self) -> bool:
+        return VOSK_AVAILABLE and os.path.isdir(self.model_path)
+
+    def warm_up(self):
+        if self.is_available():
+            load_vosk_model(self.model_path)
+
+    def transcribe(self, wav_bytes: bytes, language: str) -> str:
+        pcm, rate = read_wav_pcm(wav_bytes)
+        return self.transcribe_pcm(pcm, rate, language)
+
+    def transcribe_pcm(self, pcm: bytes, rate: int, language: str) -> str:
+        try:
+            model = load_vosk_model(self.model_path)
+        except Exception as e:
+            raise RecognitionServiceError(f"Could not load Vosk model: {e}")
+
+        result = self._decode(model, pcm, rate)
+        text = result.get('text', '')
+        if not text.strip():
+            raise SpeechNotRecognized()
+        return text
+
+    def spot(self, wav_bytes: bytes, language: str, phrases: List[str]) -> Tuple[str, float]:
+        """Decode against a restricted grammar; confidence is the weakest word's"""
+        try:
+            model = load_vosk_model(self.model_path)
+        except Exception as e:
+            raise RecognitionServiceError(f"Could not load Vosk model: {e}")
+
+        pcm, rate = read_wav_pcm(wav_bytes)
+        result = self._decode(model, pcm, rate, json.dumps(phrases))
+        words = [w for w in result.get('result', []) if w.get('word') != '[unk]']
+        if not words:
+            raise SpeechNotRecognized()
+        transcript = ' '.join(w['word'] for w in words)
+        return transcript, float(min(w.get('conf', 1.0) for w in words))
+
+    def stream(self, rate: int, language: str, phrases: Optional[List[str]] = None):
+        try:
+            model = load_vosk_model(self.model_path)
+        except Exception as e:
+            raise RecognitionServiceError(f"Could not load Vosk model: {e}")
+        return VoskSession(self._recognizer(model, rate, json.dumps(phrases) if phrases else None))
+
+    @staticmethod
+    def _recognizer(model, rate: int, grammar: Optional[str] = None):
+        _load_vosk()
+        if grammar is None:
+            return KaldiRecognizer(model, rate)
+        recognizer = KaldiRecognizer(model, rate, grammar)
+        recognizer.SetWords(True)
+        return recognizer
+
+    def _decode(self, model, pcm: bytes, rate: int, grammar: Optional[str] = None) -> Dict:
+        recognizer = self._recognizer(model, rate, grammar)
+        step = self.chunk_frames * 2
+        for start in range(0, len(pcm), step):
+            recognizer.AcceptWaveform(pcm[start:start + step])
+        return json.loads(recognizer.FinalResult())
+
+
+class VoskSession:
+    """Incremental Vosk recognition that reports partial transcripts as audio arrives"""
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self._words: List[Dict] = []
+        self._texts: List[str] = []
+
+    def _collect(self, result: Dict):
+        words = [w for w in result.get('result', []) if w.get('word') != '[unk]']
+        self._words.extend(words)
+        text = ' '.join(w['word'] for w in words) if words else result.get('text', '')
+        text = text.replace('[unk]', '').strip()
+        if text:
+            self._texts.append(text)
+
+    def accept(self, pcm: bytes) -> str:
+        if self.recognizer.AcceptWaveform(pcm):
+            self._collect(json.loads(self.recognizer.Result()))
+            return ' '.join(self._texts)
+        partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        return ' '.join(self._texts + [partial.replace('[unk]', '').strip()]).strip()
+
+    def finish(self) -> Tuple[str, float]:
+        self._collect(json.loads(self.recognizer.FinalResult()))
+        transcript = ' '.join(self._texts)
+        if not transcript:
+            raise SpeechNotRecognized()
+        confidence = min((w.get('conf', 1.0) for w in self._words), default=1.0)
+        return transcript, float(confidence)
+
+
+STT_BACKENDS = {
+    GoogleSTTBackend.name: GoogleSTTBackend,
+    VoskBackend.name: VoskBackend,
+}
+
+
+def create_stt_backend(name: Optional[str] = None) -> STTBackend:
+    """Create a speech-to-text backend by name (defaults to Config.STT_BACKEND)"""
+    name = (name or Config.STT_BACKEND).lower()
+    if name not in STT_BACKENDS:
+        raise ValueError(f"Unknown STT backend '{name}'. Choose from: {', '.join(STT_BACKENDS)}")
+    return STT_BACKENDS[name]()
+
+
+def list_stt_backends() -> List[str]:
+    """Return the names of all registered speech-to-text backends"""
+    return list(STT_BACKENDS)
@@ -0,0 +1,267 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from question_grounding import content_tokens
+
+_SENTENCE = re.compile(r'[^\n.!?]+(?:[.!?]+|$)', re.MULTILINE)
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """Return (start, end) offsets of the non-empty sentences of a text"""
+    spans = []
+    for match in _SENTENCE.finditer(text or ""):
+        start, end = match.span()
+        while start < end and text[start].isspace():
+            start += 1
+        if end - start > 1:
+            spans.append((start, end))
+    return spans
+
+
+def textrank(sentences: List[str], damping: float = 0.85, iterations: int = 50,
+             tol: float = 1e-6) -> np.ndarray:
+    """Score sentences by TextRank centrality over a TF-IDF cosine similarity graph"""
+    n = len(sentences)
+    if n <= 2:
+        return np.full(n, 1.0 / max(n, 1))
+
+    vocab: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for i, sentence in enumerate(sentences):
+        for token in set(content_tokens(sentence)):
+            rows.append(i)
+            cols.append(vocab.setdefault(token, len(vocab)))
+    if not vocab:
+        return np.full(n, 1.0 / n)
+
+    vectors = np.zeros((n, len(vocab)), dtype=np.float32)
+    vectors[rows, cols] = 1.0
+    vectors *= np.log((1.0 + n) / (1.0 + vectors.sum(axis=0))) + 1.0
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    # Sentences without any neighbour jump uniformly
+    transition = np.divide(similarity, row_sums, out=np.full_like(similarity, 1.0 / n),
+                           where=row_sums > 0)
+
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for _ in range(iterations):
+        updated = (1.0 - damping) / n + damping * (transition.T @ scores)
+        converged = np.abs(updated - scores).sum() < tol
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def extractive_summary(text: str, max_sentences: int = 5) -> str:
+    """Return the most central sentences of a text, in their original order"""
+    # Repeated boilerplate (headers, footers) would otherwise dominate the ranking
+    sentences = list(dict.fromkeys(text[s:e].strip() for s, e in split_sentences(text)))
+    if len(sentences) <= max_sentences:
+        return ' '.join(sentences)
+    scores = textrank(sentences)
+    keep = np.sort(np.argsort(-scores, kind='stable')[:max_sentences])
+    return ' '.join(sentences[i] for i in keep)
+
+
+class HierarchicalSummarizer:
+    """Map-reduce summarization of documents far larger than the prompt window
+
+    The document is split into chunks that are summarized in parallel (map),
+    then groups of summaries are summarized again (reduce) until the result
+    fits the outline budget. Summaries come from the generation backend's model
+    when mode is "model", or from the local TextRank scorer otherwise. Every
+    summary is cached by a hash of its input text, so each level of an
+    unchanged document is only computed once.
+    """
+
+    def __init__(self, backend=None, mode: str = "extractive",
+                 chunk_chars: int = 4000, summary_sentences: int = 5, fan_in: int = 8,
+                 max_outline_chars: int = 1500, max_workers: int = 4,
+                 cache_dir: Optional[str] = None, cache_size: int = 4096):
+        self.backend = backend
+        self.mode = mode
+        self.chunk_chars = chunk_chars
+        self.summary_sentences = summary_sentences
+        self.fan_in = fan_in
+        self.max_outline_chars = max_outline_chars
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._results: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def chunk(self, content: str) -> List[Tuple[int, int]]:
+        """Split content into (start, end) chunks of whole sentences"""
+        chunks = []
+        chunk_start = chunk_end = None
+        for start, end in split_sentences(content):
+            if chunk_start is not None and end - chunk_start > self.chunk_chars:
+                chunks.append((chunk_start, chunk_end))
+                chunk_start = None
+            if chunk_start is None:
+                chunk_start = start
+            chunk_end = end
+        if chunk_start is not None:
+            chunks.append((chunk_start, chunk_end))
+        return chunks
+
+    def summarize(self, content: str) -> Dict:
+        """Summarize a document into an outline, keeping every intermediate level"""
+        doc_key = self._key(content)
+        with self._lock:
+            if doc_key in self._results:
+                self._results.move_to_end(doc_key)
+                return self._results[doc_key]
+
+        chunks = self.chunk(content)
+        level = self._summarize_all([content[s:e] for s, e in chunks])
+        levels = [level]
+
+        while len(level) > 1 and len('\n'.join(level)) > self.max_outline_chars:
+            groups = [' '.join(level[i:i + self.fan_in])
+                      for i in range(0, len(level), self.fan_in)]
+            level = self._summarize_all(groups)
+            levels.append(level)
+
+        outline = '\n'.join(f"- {s}" for s in level if s)[:self.max_outline_chars]
+        result = {'outline': outline, 'levels': levels, 'chunks': chunks}
+
+        with self._lock:
+            self._results[doc_key] = result
+            if len(self._results) > 8:
+                self._results.popitem(last=False)
+        return result
+
+    def build_context(self, content: str, topic: str = "", budget_chars: int = 3000,
+                      passage_chars: int = 600) -> str:
+        """Build prompt content from the outline plus passages targeted at the topic"""
+        result = self.summarize(content)
+        outline = result['outline'][:budget_chars // 2]
+        remaining = budget_chars - len(outline) - 60
+        n_passages = max(1, remaining // passage_chars)
+
+        chunk_texts = [' '.join(content[s:e].split()) for s, e in result['chunks']]
+        picked, focus = self._pick_chunks(chunk_texts, topic, n_passages)
+        if not picked:
+            return "Document outline:\n" + outline
+
+        limit = remaining // len(picked)
+        passages = [self._trim(chunk_texts[i], limit, focus) for i in picked]
+        return ("Document outline:\n" + outline
+                + "\n\nSelected passages:\n" + '\n\n'.join(passages))
+
+    def _pick_chunks(self, chunk_texts: List[str], topic: str,
+                     count: int) -> Tuple[List[int], Optional[str]]:
+        """Pick chunk indexes matching the topic, or spread evenly over the document
+
+        Returns the picked indexes and the most specific topic term they matched.
+        """
+        n = len(chunk_texts)
+        count = min(count, n)
+        if n == 0:
+            return [], None
+
+        terms = sorted(set(content_tokens(topic)))
+        if terms:
+            lowered = [text.lower() for text in chunk_texts]
+            # Substring counts of the normalized terms also match their inflections
+            counts = np.array(
+                [[text.count(term) for term in terms] for text in lowered],
+                dtype=np.float64,
+            )
+            idf = np.log((1.0 + n) / (1.0 + (counts > 0).sum(axis=0)))
+            relevance = counts @ idf
+            if relevance.max() > 0:
+                best = np.argsort(-relevance, kind='stable')[:count]
+                focus = terms[int(np.argmax(idf * (counts.sum(axis=0) > 0)))]
+                return sorted(int(i) for i in best if relevance[i] > 0), focus
+
+        spread = np.linspace(0, n - 1, count).round().astype(int).tolist()
+        return sorted(set(spread)), None
+
+    @staticmethod
+    def _trim(text: str, limit: int, focus: Optional[str] = None) -> str:
+        """Cut text to a character limit, starting near the focus term when given"""
+        start = 0
+        if focus:
+            hit = text.lower().find(focus)
+            if hit > limit // 4:
+                # Begin at the sentence boundary preceding the focus term
+                boundary = text.rfind('. ', 0, hit - limit // 4)
+                start = boundary + 2 if boundary >= 0 else hit - limit // 4
+        text = text[start:]
+        if len(text) <= limit:
+            return text
+        cut = text.rfind('. ', 0, limit)
+        return text[:cut + 1] if cut > limit // 2 else text[:limit]
+
+    def _summarize_all(self, texts: List[str]) -> List[str]:
+        if len(texts) <= 1 or self.max_workers <= 1:
+            return [self._summarize_cached(t) for t in texts]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(self._summarize_cached, texts))
+
+    def _summarize_cached(self, text: str) -> str:
+        key = self._key(text)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        summary = self._read_disk(key)
+        if summary is None:
+            summary = self._summarize(text)
+            self._write_disk(key, summary)
+
+        with self._lock:
+            self._cache[key] = summary
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return summary
+
+    def _summarize(self, text: str) -> str:
+        if self.mode == "model" and self.backend is not None:
+            try:
+                return self.backend.summarize(text, self.summary_sentences)
+            except Exception:
+                # Backends without a model (or failing calls) fall back to TextRank
+                pass
+        return extractive_summary(text, self.summary_sentences)
+
+    def _key(self, text: str) -> str:
+        params = f"{self.mode}|{self.summary_sentences}|"
+        return hashlib.sha256((params + text).encode('utf-8')).hexdigest()
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, f"{key}.txt")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, summary: str):
+        if not self.cache_dir:
+            return
+        try:
+            path = os.path.join(self.cache_dir, f"{key}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(summary)
+        except OSError:
+            pass
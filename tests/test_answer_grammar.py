@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test constrained-grammar recognition of spoken A/B/C/D answers
+"""
+
+import json
+import sys
+import tempfile
+sys.path.append('.')
+
+import stt_backends
+from answer_grammar import UNKNOWN, build_answer_grammar, grammar_phrases, match_answer
+from stt_backends import STTBackend, SpeechNotRecognized, VoskBackend
+from tts_backends import SilentBackend
+from voice_handler import VoiceHandler
+
+OPTIONS = {'A': 'Paris', 'B': 'London', 'C': 'The River Thames', 'D': 'Berlin'}
+
+class FakeGrammarRecognizer:
+    """Stands in for KaldiRecognizer and answers from the grammar it was given"""
+
+    grammars = []
+
+    def __init__(self, model, rate, grammar=None):
+        FakeGrammarRecognizer.grammars.append(grammar)
+        self.words = False
+
+    def SetWords(self, enabled):
+        self.words = enabled
+
+    def AcceptWaveform(self, data):
+        return False
+
+    def FinalResult(self):
+        return json.dumps({'text': 'the second one', 'result': [
+            {'word': 'the', 'conf': 0.98}, {'word': 'second', 'conf': 0.72},
+            {'word': 'one', 'conf': 0.95}, {'word': '[unk]', 'conf': 0.2}
+        ]})
+
+class ScriptedBackend(STTBackend):
+    name = "scripted"
+
+    def __init__(self, transcript, confidence):
+        self.transcript = transcript
+        self.confidence = confidence
+
+    def spot(self, wav_bytes, language, phrases):
+        if not self.transcript:
+            raise SpeechNotRecognized()
+        return self.transcript, self.confidence
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def test_grammar_covers_answer_forms():
+    print("🧪 Testing answer grammar")
+    grammar = build_answer_grammar(OPTIONS)
+    for phrase, letter in [('b', 'B'), ('bravo', 'B'), ('option c', 'C'), ('the second one', 'B'),
+                           ('fourth', 'D'), ('the river thames', 'C'), ('london', 'B')]:
+        assert grammar[phrase] == letter, phrase
+    assert grammar_phrases(grammar)[-1] == UNKNOWN
+
+    # Option texts that are already answer words keep their letter meaning
+    clashing = build_answer_grammar({'A': 'two', 'B': 'one', 'C': 'x', 'D': 'y'})
+    assert clashing['two'] == 'B' and clashing['one'] == 'A'
+    print("✅ Letters, NATO words, ordinals and option texts are in the grammar")
+
+def test_match_answer_scores_confidence():
+    print("🧪 Testing answer matching")
+    grammar = build_answer_grammar(OPTIONS)
+    assert match_answer("Option B", grammar, 0.9) == {'answer': 'B', 'confidence': 0.9, 'transcript': "Option B"}
+
+    embedded = match_answer("I think it's the third one", grammar)
+    assert embedded['answer'] == 'C' and embedded['confidence'] == 0.9
+
+    # A bare "a" in the middle of a sentence is an article, not an answer
+    assert match_answer("it is a city in France", grammar)['answer'] is None
+    assert match_answer("my answer is a", grammar)['answer'] == 'A'
+
+    conflicting = match_answer("alpha no bravo", grammar)
+    assert conflicting['answer'] in ('A', 'B') and conflicting['confidence'] < 0.5
+    assert match_answer("", grammar)['answer'] is None
+    print("✅ Transcripts resolve to a letter with a confidence")
+
+def test_vosk_spot_uses_restricted_grammar():
+    print("🧪 Testing Vosk grammar mode")
+    saved = (stt_backends.VOSK_AVAILABLE, stt_backends.Model,
+             stt_backends.KaldiRecognizer, stt_backends.SetLogLevel)
+    stt_backends.VOSK_AVAILABLE = True
+    stt_backends.Model = lambda path: object()
+    stt_backends.KaldiRecognizer = FakeGrammarRecognizer
+    stt_backends.SetLogLevel = lambda level: None
+    try:
+        with tempfile.TemporaryDirectory() as model_dir:
+            phrases = grammar_phrases(build_answer_grammar(OPTIONS))
+            speech = SilentBackend().synthesize("the second one", 'en')
+            transcript, confidence = VoskBackend(model_dir).spot(speech, 'en-US', phrases)
+        assert json.loads(FakeGrammarRecognizer.grammars[-1]) == phrases
+        assert transcript == 'the second one'
+        assert confidence == 0.72
+    finally:
+        (stt_backends.VOSK_AVAILABLE, stt_backends.Model,
+         stt_backends.KaldiRecognizer, stt_backends.SetLogLevel) = saved
+        stt_backends._vosk_models.clear()
+    print("✅ Vosk decodes against the phrase list and reports the weakest word confidence")
+
+def test_voice_handler_flags_low_confidence_for_reprompt():
+    print("🧪 Testing VoiceHandler.recognize_answer")
+    handler = QuietVoiceHandler(tts_backend=SilentBackend(), stt_backend=ScriptedBackend("bravo", 0.95))
+    wav = SilentBackend().synthesize("bravo", 'en')
+    result = handler.recognize_answer(wav, OPTIONS)
+    assert result['answer'] == 'B' and not result['reprompt']
+
+    handler.stt_backend = ScriptedBackend("bravo", 0.3)
+    assert handler.recognize_answer(wav, OPTIONS)['reprompt']
+
+    handler.stt_backend = ScriptedBackend("", 0.0)
+    silent = handler.recognize_answer(wav, OPTIONS)
+    assert silent['answer'] is None and silent['reprompt']
+    print("✅ Uncertain answers are flagged for a re-prompt")
+
+if __name__ == "__main__":
+    test_grammar_covers_answer_forms()
+    test_match_answer_scores_confidence()
+    test_vosk_spot_uses_restricted_grammar()
+    test_voice_handler_flags_low_confidence_for_reprompt()
+    print("🎉 All answer grammar tests passed!")
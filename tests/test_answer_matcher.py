@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test the precompiled multilingual answer matcher behind parse_voice_answer
+"""
+
+import sys
+sys.path.append('.')
+
+from answer_matcher import PhraseAutomaton, get_answer_matcher, language_code, tokenize
+from tts_backends import SilentBackend
+from voice_handler import VoiceHandler
+
+OPTIONS = {'A': 'Paris', 'B': 'London', 'C': 'The River Thames', 'D': 'Berlin'}
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def test_automaton_finds_overlapping_phrases():
+    print("🧪 Testing Aho-Corasick automaton")
+    automaton = PhraseAutomaton({'option b': 'B', 'b': 'B', 'the second one': 'B', 'second': 'B', 'one': 'A'})
+    matches = automaton.find(tokenize("option b or the second one"))
+    assert (0, 2, 'B') in matches and (1, 2, 'B') in matches
+    assert (3, 6, 'B') in matches and (4, 5, 'B') in matches and (5, 6, 'A') in matches
+    assert automaton.find(tokenize("abbey")) == []
+    print("✅ Every phrase occurrence is found in one pass on whole words")
+
+def test_english_answers():
+    print("🧪 Testing English answers")
+    matcher = get_answer_matcher('en-US')
+    cases = {
+        "A": 'A', "option B": 'B', "Charlie": 'C', "the fourth one": 'D', "number 2": 'B',
+        "I think it's A because of the river": 'A', "my answer is d.": 'D',
+        "it is a city in France": None, "that's a tricky one, let me think": None,
+        "Because I said so": None, "delta no wait charlie": 'C', "": None,
+        "B or C": None, "either the second or the third one": None, "option a and option b": None,
+        "B, C or D, no wait, A": 'A', "B no wait C or D": None, "option b, option b": 'B',
+    }
+    for text, expected in cases.items():
+        assert matcher.match(text) == expected, (text, matcher.match(text))
+    print("✅ Letters only count where they name an answer")
+
+def test_other_languages():
+    print("🧪 Testing multilingual tables")
+    assert language_code('fr-FR') == 'fr' and language_code('xx-YY') == 'en'
+    assert get_answer_matcher('es-ES').match("creo que es la opción b porque") == 'B'
+    assert get_answer_matcher('es-ES').match("la tercera") == 'C'
+    assert get_answer_matcher('fr-FR').match("je pense que c'est la deuxième réponse") == 'B'
+    assert get_answer_matcher('fr-FR').match("l'option d") == 'D'
+    assert get_answer_matcher('de-DE').match("ich nehme die dritte Antwort") == 'C'
+    assert get_answer_matcher('de-DE').match("Dora") == 'D'
+    assert get_answer_matcher('fr-FR').match("la première ou la deuxième") is None
+    print("✅ Spanish, French and German answers are recognized")
+
+def test_option_texts():
+    print("🧪 Testing option text matching")
+    matcher = get_answer_matcher('en-US')
+    assert matcher.match("I would say London", OPTIONS) == 'B'
+    assert matcher.match("the river tames", OPTIONS) == 'C'
+    assert matcher.match("it's the first option", OPTIONS) == 'A'
+    # A literal option text wins over the ordinal inside it
+    ordinal_options = {'A': 'Second law', 'B': 'First amendment', 'C': 'Third estate', 'D': 'None'}
+    assert matcher.match("first amendment", ordinal_options) == 'B'
+    assert matcher.match("something about rivers", OPTIONS) is None
+    assert matcher.match("B or C", OPTIONS) is None
+    print("✅ Option texts are matched literally and fuzzily")
+
+def test_parse_voice_answer_uses_recognition_language():
+    print("🧪 Testing VoiceHandler.parse_voice_answer")
+    handler = QuietVoiceHandler(tts_backend=SilentBackend())
+    assert handler.parse_voice_answer("option C") == 'C'
+    assert handler.parse_voice_answer("Berlin", OPTIONS) == 'D'
+    handler.recognition_language = 'de-DE'
+    assert handler.parse_voice_answer("die zweite") == 'B'
+    print("✅ parse_voice_answer delegates to the compiled matcher")
+
+if __name__ == "__main__":
+    test_automaton_finds_overlapping_phrases()
+    test_english_answers()
+    test_other_languages()
+    test_option_texts()
+    test_parse_voice_answer_uses_recognition_language()
+    print("🎉 All answer matcher tests passed!")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test the two-tier audio cache used for text-to-speech clips
+"""
+
+import os
+import sys
+import tempfile
+import threading
+sys.path.append('.')
+
+from audio_cache import AudioCache, audio_cache_key
+
+def test_cache_key_depends_on_settings():
+    """Text, language and voice settings all change the key"""
+    key = audio_cache_key("Question one", "en", engine="gtts", slow=False)
+    assert key == audio_cache_key("Question one", "en", slow=False, engine="gtts")
+    assert key != audio_cache_key("Question one", "fr", engine="gtts", slow=False)
+    assert key != audio_cache_key("Question one", "en", engine="gtts", slow=True)
+
+def test_memory_lru_eviction_and_hit_rate():
+    print("🧪 Testing memory tier")
+    cache = AudioCache(memory_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    assert cache.get("a") == b"12345"      # "a" becomes most recently used
+    cache.put("c", b"12345")               # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"12345"
+
+    stats = cache.stats()
+    assert stats['memory_hits'] == 2 and stats['misses'] == 1
+    assert abs(cache.hit_rate - 2 / 3) < 1e-9
+    assert stats['memory_bytes'] == 10
+
+def test_disk_tier_eviction_and_sharing():
+    print("🧪 Testing disk tier")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = AudioCache(memory_bytes=0, disk_dir=cache_dir, disk_bytes=25)
+        first = cache.put("first", b"x" * 10)
+        cache.put("second", b"y" * 10)
+        assert cache.owns(first) and os.path.exists(first)
+
+        cache.put("third", b"z" * 10)      # over 25 bytes: "first" is evicted
+        assert not os.path.exists(first)
+        assert cache.stats()['disk_bytes'] == 20
+
+        # A second cache over the same directory (another process) sees the clips
+        other = AudioCache(memory_bytes=0, disk_dir=cache_dir)
+        assert other.get("third") == b"z" * 10
+        assert other.get_path("second").endswith("second.mp3")
+        assert other.get("first") is None
+
+class SlowSource:
+    """Read-only source whose reads block until released, like a cold memory map"""
+
+    def __init__(self):
+        self.reading = threading.Event()
+        self.release = threading.Event()
+
+    def __contains__(self, key):
+        return key == "slow"
+
+    def get(self, key):
+        if key != "slow":
+            return None
+        self.reading.set()
+        self.release.wait(5)
+        return b"slow clip"
+
+    def suffix(self, key):
+        return '.wav'
+
+def test_slow_reads_do_not_block_other_lookups():
+    print("🧪 Testing lookups during a slow read")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = AudioCache(disk_dir=cache_dir)
+        cache.put("fast", b"fast clip")
+        source = SlowSource()
+        cache.attach(source)
+        reader = threading.Thread(target=cache.get, args=("slow",))
+        reader.start()
+        assert source.reading.wait(5)
+        results = []
+        lookup = threading.Thread(target=lambda: results.append(
+            (cache.get("fast"), cache.get_path("fast"), cache.contains("slow"))))
+        lookup.start()
+        lookup.join(1)
+        answered = list(results)
+        source.release.set()
+        reader.join()
+        lookup.join()
+        assert answered, "lookups waited for the slow read"
+        assert answered[0][0] == b"fast clip" and answered[0][1].endswith("fast.mp3")
+        assert cache.get("slow") == b"slow clip" and cache.stats()['source_hits'] == 1
+    print("✅ File and source reads happen outside the cache lock")
+
+if __name__ == "__main__":
+    test_cache_key_depends_on_settings()
+    test_memory_lru_eviction_and_hit_rate()
+    test_disk_tier_eviction_and_sharing()
+    test_slow_reads_do_not_block_other_lookups()
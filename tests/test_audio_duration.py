@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test clip durations from frame headers and the answer timer they drive
+"""
+
+import struct
+import sys
+import time
+sys.path.append('.')
+
+import quiz_manager as quiz_manager_module
+from audio_duration import DurationIndex, clip_duration
+from quiz_manager import QuizManager
+from tts_backends import SilentBackend
+from voice_handler import VoiceHandler
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo: 417-byte frames of 1152 samples
+MPEG1_FRAME = b'\xff\xfb\x90\x00' + bytes(413)
+# MPEG-2 Layer III, 64 kbps, 24 kHz, stereo: 192-byte frames of 576 samples
+MPEG2_FRAME = b'\xff\xf3\x84\x00' + bytes(188)
+ID3_TAG = b'ID3\x04\x00\x00\x00\x00\x00\x0a' + bytes(10)
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+class SessionState(dict):
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+class FakeStreamlit:
+    def __init__(self):
+        self.session_state = SessionState()
+
+def ogg_page(granule, packet, header_type=0):
+    header = struct.pack('<4sBBqIIIB', b'OggS', 0, header_type, granule, 1, 0, 0, 1)
+    return header + bytes([len(packet)]) + packet
+
+def test_mp3_duration_from_headers():
+    print("🧪 Testing MP3 durations from frame headers")
+    cbr = ID3_TAG + MPEG1_FRAME * 50
+    assert abs(clip_duration(cbr) - 50 * 1152 / 44100) < 1e-9
+    assert abs(clip_duration(MPEG2_FRAME * 40) - 40 * 0.024) < 1e-9
+    # Junk between frames is skipped by resynchronizing on the next header
+    assert abs(clip_duration(MPEG1_FRAME * 3 + b'\x00\xff\x00' + MPEG1_FRAME * 2) - 5 * 1152 / 44100) < 1e-9
+    xing = b'\xff\xfb\x90\x00' + bytes(32) + b'Xing' + struct.pack('>II', 1, 100)
+    vbr = xing + bytes(417 - len(xing)) + MPEG1_FRAME * 3
+    assert abs(clip_duration(vbr) - 100 * 1152 / 44100) < 1e-9
+    print("✅ CBR, MPEG-2 and Xing-tagged VBR clips are timed without decoding")
+
+def test_wav_and_ogg_duration():
+    print("🧪 Testing WAV and Ogg durations")
+    wav = SilentBackend(sample_rate=16000, ms_per_char=50).synthesize("x" * 20, "en")
+    assert abs(clip_duration(wav) - 1.0) < 1e-3
+    opus_head = b'OpusHead' + struct.pack('<BBHIhB', 1, 1, 312, 48000, 0, 0)
+    ogg = ogg_page(0, opus_head, 2) + ogg_page(0, b'OpusTags') + ogg_page(96312, bytes(40), 4)
+    assert abs(clip_duration(ogg) - 2.0) < 1e-9
+    assert clip_duration(b'not audio') is None and clip_duration(b'RIFF\x00') is None
+    print("✅ WAV chunk sizes and Ogg granule positions give the duration")
+
+def test_duration_index_caches():
+    print("🧪 Testing the duration index")
+    index = DurationIndex(max_entries=2)
+    clips = [MPEG1_FRAME * n for n in (10, 20, 30)]
+    for clip in clips + clips[-1:]:
+        index.duration(clip)
+    assert index.stats() == {'entries': 2, 'hits': 1, 'misses': 3}
+    handler = QuietVoiceHandler(tts_backend=SilentBackend(), duration_index=index)
+    played = []
+    handler.play_audio_bytes = lambda audio, autoplay=True, profile=None: played.append(audio)
+    handler._concat_clips = b''.join
+    ends = handler.play_audio_sequence([MPEG1_FRAME * 10, b'unknown', MPEG1_FRAME])
+    assert abs(ends[0] - 10 * 1152 / 44100) < 1e-9 and ends[1:] == [None, None]
+    assert len(played) == 1
+    print("✅ Repeated clips are timed from the index, sequences by cumulative end")
+
+def test_answer_timer_starts_after_playback():
+    print("🧪 Testing the answer timer")
+    original = quiz_manager_module.st
+    quiz_manager_module.st = FakeStreamlit()
+    try:
+        manager = QuizManager()
+        question = {'question': 'Q?', 'options': {'A': '1', 'B': '2'}, 'correct_answer': 'A'}
+        manager.start_quiz([question, dict(question)])
+        assert manager.answer_time_elapsed() == 0
+        # Shown, then auto-played: the clock starts when the 5 s clip ends
+        manager.start_answer_timer()
+        assert manager.claim_autoplay() and not manager.claim_autoplay()
+        manager.start_answer_timer(5.0, after_playback=True)
+        assert manager.answer_time_elapsed() == 0.01
+        result = manager.submit_answer('A')
+        assert result['is_correct'] and abs(result['score'] - 1.2) < 1e-3
+
+        # The next question was chained behind the feedback and has finished playing
+        manager.start_answer_timer(-3.0, after_playback=True)
+        manager.start_answer_timer()
+        assert not manager.claim_autoplay()
+        elapsed = manager.answer_time_elapsed()
+        assert 2.9 < elapsed < 4
+        # Replaying a clip heard in full does not reset the clock
+        manager.start_answer_timer(4.0, after_playback=True)
+        assert manager.answer_time_elapsed() >= elapsed
+        time.sleep(0.01)
+        assert manager.submit_answer('B')['score'] == 0
+    finally:
+        quiz_manager_module.st = original
+    print("✅ Time bonuses count from the end of the question audio")
+
+if __name__ == "__main__":
+    test_mp3_duration_from_headers()
+    test_wav_and_ogg_duration()
+    test_duration_index_caches()
+    test_answer_timer_starts_after_playback()
+    print("🎉 All audio duration tests passed!")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test ingestion of browser recordings: container detection, decoding and resampling
+"""
+
+import io
+import sys
+import threading
+import wave
+import numpy as np
+sys.path.append('.')
+
+import audio_ingest
+from audio_ingest import (
+    AudioIngestor, UnsupportedAudioFormat, detect_container, normalize_loudness, resample
+)
+from stt_backends import STTBackend
+from tts_backends import SilentBackend
+from voice_handler import VoiceHandler
+
+def make_wav(samples, rate, width=2):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(samples.shape[1] if samples.ndim == 2 else 1)
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        if width == 3:
+            ints = samples.astype('<i4').reshape(-1, 1).view(np.uint8).reshape(-1, 4)[:, :3]
+            wav.writeframes(ints.tobytes())
+        else:
+            wav.writeframes(samples.astype('<i2').tobytes())
+    return buffer.getvalue()
+
+def sine(freq, rate, seconds=1.0, amplitude=0.5):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+def peak_frequency(samples, rate):
+    spectrum = np.abs(np.fft.rfft(samples))
+    return np.argmax(spectrum) * rate / len(samples)
+
+class RecordingSTTBackend(STTBackend):
+    name = "recording"
+    sample_rate = 16000
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe_pcm(self, pcm, rate, language):
+        self.calls.append((len(pcm), rate))
+        return " option b "
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def test_detect_container():
+    print("🧪 Testing container detection")
+    assert detect_container(make_wav(np.zeros(10), 8000)) == 'wav'
+    assert detect_container(b'OggS\x00\x02' + b'\x00' * 20) == 'ogg'
+    assert detect_container(b'\x1a\x45\xdf\xa3\x9f\x42\x86\x81') == 'webm'
+    assert detect_container(b'ID3\x04\x00') == 'mp3'
+    assert detect_container(b'\xff\xfb\x90\x00') == 'mp3'
+    assert detect_container(b'\x00\x00\x00\x20ftypM4A ') == 'mp4'
+    assert detect_container(b'fLaC\x00') == 'flac'
+    assert detect_container(b'hello world') is None
+    print("✅ Containers are identified from magic bytes")
+
+def test_resample_and_normalize():
+    print("🧪 Testing NumPy resampling and loudness")
+    tone = sine(440, 48000)
+    down = resample(tone, 48000, 16000)
+    assert len(down) == 16000
+    assert abs(peak_frequency(down, 16000) - 440) < 2
+
+    quiet = sine(300, 16000, amplitude=0.01)
+    louder = normalize_loudness(quiet, -20.0)
+    rms_db = 20 * np.log10(np.sqrt(np.mean(louder ** 2)))
+    assert abs(rms_db - -20.0) < 0.5
+    # A clipped signal is limited by its peak instead of the RMS target
+    spiky = np.zeros(1000, dtype=np.float32)
+    spiky[0] = 0.5
+    assert np.max(np.abs(normalize_loudness(spiky, -20.0))) <= 0.99
+    print("✅ Resampling keeps the pitch and loudness reaches the target without clipping")
+
+def test_convert_stereo_24_bit_wav():
+    print("🧪 Testing WAV ingestion")
+    left = sine(220, 44100) * 8388607 * 0.5
+    stereo = np.stack([left, np.zeros_like(left)], axis=1)
+    audio = AudioIngestor(target_rate=16000).ingest(make_wav(stereo, 44100, width=3))
+    assert audio.container == 'wav' and audio.channels == 2 and audio.source_rate == 44100
+    assert audio.sample_rate == 16000 and abs(audio.duration - 1.0) < 0.01
+    pcm = np.frombuffer(audio.pcm, dtype='<i2') / 32768.0
+    assert abs(peak_frequency(pcm, 16000) - 220) < 2
+    print("✅ 24-bit stereo 44.1 kHz WAV becomes 16 kHz mono PCM")
+
+def test_compressed_audio_is_decoded_on_the_pool():
+    print("🧪 Testing pooled decoding")
+    seen = []
+
+    def fake_decode(data, container):
+        seen.append((container, threading.current_thread().name))
+        return sine(440, 48000)[:, None], 48000
+
+    saved = audio_ingest.decode_compressed
+    audio_ingest.decode_compressed = fake_decode
+    ingestor = AudioIngestor(max_workers=2)
+    try:
+        audio = ingestor.ingest(b'\x1a\x45\xdf\xa3' + b'\x00' * 64)
+        futures = [ingestor.submit(b'OggS' + b'\x00' * 64) for _ in range(4)]
+        assert all(f.result(timeout=5).container == 'ogg' for f in futures)
+    finally:
+        audio_ingest.decode_compressed = saved
+        ingestor.shutdown()
+    assert audio.container == 'webm' and audio.sample_rate == 16000
+    assert all(name.startswith('audio-ingest') for _, name in seen)
+
+    try:
+        AudioIngestor().ingest(b'not audio at all')
+        assert False, "unknown formats should be rejected"
+    except UnsupportedAudioFormat:
+        pass
+    print("✅ Browser formats decode on worker threads")
+
+def test_speech_to_text_hands_over_pcm():
+    print("🧪 Testing VoiceHandler.speech_to_text ingestion")
+    backend = RecordingSTTBackend()
+    handler = QuietVoiceHandler(tts_backend=SilentBackend(), stt_backend=backend)
+    recording = make_wav((sine(200, 48000) * 20000)[:, None].repeat(2, axis=1), 48000)
+    assert handler.speech_to_text(io.BytesIO(recording)) == "option b"
+    assert backend.calls == [(32000, 16000)]
+    print("✅ Recordings reach the recognizer as in-memory PCM at its native rate")
+
+if __name__ == "__main__":
+    test_detect_container()
+    test_resample_and_normalize()
+    test_convert_stereo_24_bit_wav()
+    test_compressed_audio_is_decoded_on_the_pool()
+    test_speech_to_text_hands_over_pcm()
+    print("🎉 All audio ingestion tests passed!")
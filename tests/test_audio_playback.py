@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test in-memory audio playback and pre-rendering in VoiceHandler
+"""
+
+import sys
+import time
+sys.path.append('.')
+
+from audio_cache import AudioCache
+from tts_backends import TTSBackend
+from voice_handler import VoiceHandler
+
+QUESTIONS = [
+    {
+        'question': f'Question {i}?',
+        'options': {'A': 'one', 'B': 'two', 'C': 'three', 'D': 'four'},
+        'correct_answer': 'B',
+        'explanation': f'Explanation {i}.'
+    }
+    for i in range(3)
+]
+
+class RecordingBackend(TTSBackend):
+    """TTS backend that records what it renders"""
+
+    name = "recording"
+
+    def __init__(self):
+        self.synthesized = []
+
+    def synthesize(self, text, language, slow=False):
+        self.synthesized.append(text)
+        return f"mp3:{text}".encode()
+
+class FakeVoiceHandler(VoiceHandler):
+    """VoiceHandler with a recording backend and a memory-only cache"""
+
+    def __init__(self):
+        super().__init__(audio_cache=AudioCache(disk_dir=None), tts_backend=RecordingBackend())
+        self.synthesized = self.tts_backend.synthesized
+
+    def _check_dependencies(self):
+        # The missing-dependency banner needs a running Streamlit app
+        pass
+
+def test_text_to_speech_bytes_uses_cache():
+    print("🧪 Testing in-memory text-to-speech")
+    handler = FakeVoiceHandler()
+    first = handler.text_to_speech_bytes("Hello")
+    second = handler.text_to_speech_bytes("Hello")
+    assert first == b"mp3:Hello"
+    assert second is first                 # served from the cache without a copy
+    assert handler.synthesized == ["Hello"]
+    assert 'base64,' in handler.get_audio_html(first)
+    print("✅ Clips are synthesized once and returned as bytes")
+
+def test_prerender_makes_audio_ready():
+    print("🧪 Testing quiz pre-rendering")
+    handler = FakeVoiceHandler()
+    assert handler.get_ready_question_audio(QUESTIONS[0]) is None
+
+    queued = handler.prerender_quiz(QUESTIONS, owner="session")
+    assert queued == 7 + 3 * 2             # shared phrases and letters, then question and explanation
+    deadline = time.time() + 5
+    while handler.get_prerender_stats()['completed'] < queued and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert handler.get_ready_question_audio(QUESTIONS[1]) is not None
+    assert handler.get_ready_feedback_audio(False, 'B', 'Explanation 2.', 'D') is not None
+    assert handler.prerender_quiz(QUESTIONS, owner="session") == 0
+    # Playing a pre-rendered question does not synthesize it again
+    handler.create_question_audio_bytes(QUESTIONS[0])
+    assert len(handler.synthesized) == queued
+    print("✅ Question and feedback audio is ready before it is requested")
+
+if __name__ == "__main__":
+    test_text_to_speech_bytes_uses_cache()
+    test_prerender_makes_audio_ready()
+    print("🎉 All audio playback tests passed!")
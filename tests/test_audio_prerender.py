@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test the background audio pre-render queue
+"""
+
+import sys
+import threading
+import time
+sys.path.append('.')
+
+from audio_prerender import AudioPrerenderer
+
+class BlockingRenderer:
+    """Render function that records the order of jobs and can be held on a gate"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.rendered = []
+
+    def __call__(self, key, text):
+        self.gate.wait(5)
+        if text == "broken":
+            raise RuntimeError("synthesis failed")
+        self.rendered.append(key)
+
+def wait_for_completed(prerenderer, count, timeout=5):
+    deadline = time.time() + timeout
+    while prerenderer.stats()['completed'] < count and time.time() < deadline:
+        time.sleep(0.01)
+
+def wait_for_running(prerenderer):
+    while prerenderer.stats()['running'] == 0:
+        time.sleep(0.01)
+
+def test_priority_order_and_reprioritize():
+    print("🧪 Testing pre-render priorities")
+    render = BlockingRenderer()
+    prerenderer = AudioPrerenderer(render, max_workers=1)
+
+    # The worker picks "busy" up and holds it while the rest are queued
+    prerenderer.submit("busy", "busy", priority=0)
+    wait_for_running(prerenderer)
+    prerenderer.submit("q3", "q3", priority=3)
+    prerenderer.submit("q2", "q2", priority=2)
+    prerenderer.submit("q1", "q1", priority=5)
+    prerenderer.submit("q1", "q1", priority=1)     # moves ahead of q2
+
+    render.gate.set()
+    wait_for_completed(prerenderer, 4)
+    assert render.rendered == ["busy", "q1", "q2", "q3"]
+    print("✅ Upcoming clips render first")
+
+def test_wait_moves_job_to_front():
+    render = BlockingRenderer()
+    prerenderer = AudioPrerenderer(render, max_workers=1)
+    prerenderer.submit("busy", "busy", priority=0)
+    wait_for_running(prerenderer)
+    prerenderer.submit("next", "next", priority=1)
+    prerenderer.submit("later", "later", priority=9)
+
+    threading.Timer(0.05, render.gate.set).start()
+    assert prerenderer.wait("later", timeout=5)
+    assert render.rendered[:2] == ["busy", "later"]
+    wait_for_completed(prerenderer, 3)
+
+def test_duplicate_submissions_render_once():
+    render = BlockingRenderer()
+    prerenderer = AudioPrerenderer(render, max_workers=2)
+    for _ in range(3):
+        prerenderer.submit("same", "same", priority=0, owner="s1")
+    render.gate.set()
+    assert prerenderer.wait("same", timeout=5)
+    assert render.rendered == ["same"]
+
+def test_cancel_only_drops_jobs_of_that_owner():
+    print("🧪 Testing cancellation")
+    render = BlockingRenderer()
+    prerenderer = AudioPrerenderer(render, max_workers=1)
+    prerenderer.submit("busy", "busy", priority=0, owner="s1")
+    wait_for_running(prerenderer)
+    prerenderer.submit("mine", "mine", priority=1, owner="s1")
+    prerenderer.submit("shared", "shared", priority=2, owner="s1")
+    prerenderer.submit("shared", "shared", priority=2, owner="s2")
+
+    assert prerenderer.cancel("s1") == 1          # "busy" is already rendering
+    assert not prerenderer.is_pending("mine")
+    assert prerenderer.is_pending("shared")
+
+    render.gate.set()
+    assert prerenderer.wait("shared", timeout=5)
+    assert render.rendered == ["busy", "shared"]
+    assert prerenderer.stats()['cancelled'] == 1
+    print("✅ Cancelled jobs are skipped")
+
+def test_failed_render_is_counted():
+    render = BlockingRenderer()
+    render.gate.set()
+    prerenderer = AudioPrerenderer(render, max_workers=1)
+    prerenderer.submit("bad", "broken")
+    assert prerenderer.wait("bad", timeout=5)
+    assert prerenderer.stats()['failed'] == 1
+    assert not prerenderer.is_pending("bad")
+
+if __name__ == "__main__":
+    test_priority_order_and_reprioritize()
+    test_wait_moves_job_to_front()
+    test_duplicate_submissions_render_once()
+    test_cancel_only_drops_jobs_of_that_owner()
+    test_failed_render_is_counted()
+    print("🎉 All pre-render tests passed!")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test per-client audio encoding profiles and the transcode cache
+"""
+
+import sys
+import threading
+import time
+sys.path.append('.')
+
+import audio_ingest
+from audio_cache import AudioCache
+from audio_profiles import AudioTranscoder, get_profile, list_profiles, profile_cache_key
+from tts_backends import TTSBackend
+from voice_handler import VoiceHandler
+
+class CountingEncoder:
+    """Stands in for ffmpeg: tags the clip with the profile and counts calls"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def __call__(self, data, profile):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("encoder crashed")
+        return profile.name.encode() + b":" + data[:4]
+
+class FixedBackend(TTSBackend):
+    name = "fixed"
+
+    def synthesize(self, text, language, slow=False):
+        return b"ID3" + text.encode()
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def with_ffmpeg(test):
+    def run():
+        saved = audio_ingest.FFMPEG
+        audio_ingest.FFMPEG = "/usr/bin/ffmpeg"
+        try:
+            test()
+        finally:
+            audio_ingest.FFMPEG = saved
+    run.__name__ = test.__name__
+    return run
+
+def test_profiles_catalogue():
+    print("🧪 Testing profile catalogue")
+    assert {'original', 'speech_mp3', 'opus_low'} <= set(list_profiles())
+    assert get_profile('missing').name == 'original' and get_profile(None).passthrough
+    assert get_profile('opus_low').mime == 'audio/ogg'
+    clip = b"clip"
+    assert profile_cache_key(clip, get_profile('opus_low')) != profile_cache_key(clip, get_profile('speech_mp3'))
+    print("✅ Profiles are looked up by name with original as the fallback")
+
+@with_ffmpeg
+def test_clips_are_encoded_once_per_profile():
+    print("🧪 Testing transcode cache")
+    encoder = CountingEncoder()
+    transcoder = AudioTranscoder(AudioCache(disk_dir=None), encoder=encoder)
+    assert transcoder.encode(b"clip", 'audio/mpeg', 'original') == (b"clip", 'audio/mpeg')
+    first = transcoder.encode(b"clip", 'audio/mpeg', 'opus_low')
+    assert first == (b"opus_low:clip", 'audio/ogg')
+    assert transcoder.encode(b"clip", 'audio/mpeg', 'opus_low') == first
+    transcoder.encode(b"clip", 'audio/mpeg', 'speech_mp3')
+    transcoder.encode(b"other", 'audio/mpeg', 'opus_low')
+    assert encoder.calls == 3
+    print("✅ Each clip is encoded once per profile")
+
+@with_ffmpeg
+def test_concurrent_requests_share_one_encode():
+    print("🧪 Testing single-flight encoding")
+    encoder = CountingEncoder(delay=0.1)
+    transcoder = AudioTranscoder(AudioCache(disk_dir=None), encoder=encoder)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(transcoder.encode(b"clip", 'audio/mpeg', 'opus_low')))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert encoder.calls == 1 and len(set(results)) == 1
+    print("✅ Clients requesting the same clip wait for one encode")
+
+@with_ffmpeg
+def test_failed_encodes_fall_back_to_original():
+    print("🧪 Testing encoder failures")
+    transcoder = AudioTranscoder(AudioCache(disk_dir=None), encoder=CountingEncoder(fail=True))
+    assert transcoder.encode(b"clip", 'audio/mpeg', 'speech_mp3') == (b"clip", 'audio/mpeg')
+    assert transcoder.failures == 1
+
+    saved = audio_ingest.FFMPEG
+    audio_ingest.FFMPEG = None
+    try:
+        assert not get_profile('opus_low').is_available()
+        assert transcoder.encode(b"clip", 'audio/mpeg', 'opus_low') == (b"clip", 'audio/mpeg')
+    finally:
+        audio_ingest.FFMPEG = saved
+    print("✅ Playback falls back to the original clip")
+
+@with_ffmpeg
+def test_voice_handler_encodes_for_client():
+    print("🧪 Testing VoiceHandler.encode_for_client")
+    handler = QuietVoiceHandler(audio_cache=AudioCache(disk_dir=None), tts_backend=FixedBackend())
+    handler.transcoder.encoder = CountingEncoder()
+    clip = handler.text_to_speech_bytes("hello")
+    before = handler.audio_cache.stats()
+    assert handler.encode_for_client(clip, 'opus_low') == (b"opus_low:ID3h", 'audio/ogg')
+    assert handler.encode_for_client(clip, 'opus_low') == (b"opus_low:ID3h", 'audio/ogg')
+    assert handler.encode_for_client(clip, 'original') == (clip, handler.tts_backend.mime)
+    # Encodes are kept apart from the TTS cache and its hit rate
+    assert handler.audio_cache.stats() == before
+    assert handler.transcoder.cache is not handler.audio_cache
+    print("✅ Clients get clips in their own profile")
+
+if __name__ == "__main__":
+    test_profiles_catalogue()
+    test_clips_are_encoded_once_per_profile()
+    test_concurrent_requests_share_one_encode()
+    test_failed_encodes_fall_back_to_original()
+    test_voice_handler_encodes_for_client()
+    print("🎉 All audio profile tests passed!")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test splitting speech into segments and joining MP3 clips
+"""
+
+import sys
+sys.path.append('.')
+
+from audio_segments import concat_mp3, speech_segments, strip_id3
+
+def id3v2(payload_size):
+    """ID3v2 header with a syncsafe size followed by padding"""
+    size = bytes([(payload_size >> shift) & 0x7F for shift in (21, 14, 7, 0)])
+    return b'ID3\x04\x00\x00' + size + b'\x00' * payload_size
+
+def test_question_segments():
+    print("🧪 Testing speech segmentation")
+    text = ("Question: What is overfitting?\n\nOptions:\nA: Memorizing noise\nB: Underfitting\n"
+            "C: Regularization\nD: Dropout\n\nPlease say your answer: A, B, C, or D.")
+    segments = speech_segments(text)
+    assert segments[0] == "Question: What is overfitting?"
+    # The short "Options:" heading is merged into the first option
+    assert segments[1] == "Options: A: Memorizing noise"
+    assert segments[-1] == "Please say your answer: A, B, C, or D."
+    assert len(segments) == 6
+    print("✅ Questions split into question, option and instruction segments")
+
+def test_long_lines_split_at_sentences():
+    sentence = "This sentence is about forty characters. "
+    segments = speech_segments(sentence * 10, max_chars=100)
+    assert all(len(segment) <= 100 for segment in segments)
+    assert ' '.join(segments) == (sentence * 10).strip()
+
+def test_strip_id3_and_concat():
+    frames_a, frames_b = b'\xff\xfbAAAA', b'\xff\xfbBBBB'
+    tagged = id3v2(20) + frames_b + b'TAG' + b'\x00' * 125
+    assert bytes(strip_id3(tagged)) == frames_b
+    assert bytes(strip_id3(frames_a)) == frames_a
+    assert concat_mp3([frames_a, tagged]) == frames_a + frames_b
+
+if __name__ == "__main__":
+    test_question_segments()
+    test_long_lines_split_at_sentences()
+    test_strip_id3_and_concat()
+    print("🎉 All audio segment tests passed!")
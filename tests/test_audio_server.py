@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed audio asset server
+"""
+
+import http.client
+import sys
+import threading
+from concurrent.futures import Future
+sys.path.append('.')
+
+from audio_server import AudioAssetStore, AudioServer, parse_range
+
+CLIP = bytes(range(256)) * 40
+
+def request(server, path, headers=None, method='GET'):
+    conn = http.client.HTTPConnection('127.0.0.1', server.port, timeout=5)
+    conn.request(method, path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=500-5000", 1000) == (500, 999)
+    assert parse_range("bytes=1000-", 1000) is None
+    assert parse_range("bytes=5-2", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+
+def test_store_deduplicates_and_evicts():
+    store = AudioAssetStore(memory_bytes=2 * len(CLIP))
+    first = store.add(CLIP)
+    assert store.add(CLIP) == first
+    assert store.get(first)[0] is CLIP          # kept by reference, not copied
+    store.add(CLIP + b"1")
+    store.add(CLIP + b"2")
+    assert store.get(first) is None
+    assert store.stats()['assets'] == 1
+
+def test_server_caching_and_ranges():
+    print("🧪 Testing audio server")
+    server = AudioServer(host='127.0.0.1', port=0)
+    assert server.start()
+    try:
+        url = server.publish(CLIP)
+        path = url.split(str(server.port), 1)[1]
+        assert path.endswith('.mp3')
+
+        response, body = request(server, path)
+        assert response.status == 200 and body == CLIP
+        assert 'immutable' in response.getheader('Cache-Control')
+        assert response.getheader('Content-Type') == 'audio/mpeg'
+        etag = response.getheader('ETag')
+
+        response, body = request(server, path, {'If-None-Match': etag})
+        assert response.status == 304 and body == b""
+
+        response, body = request(server, path, {'Range': 'bytes=100-199'})
+        assert response.status == 206 and body == CLIP[100:200]
+        assert response.getheader('Content-Range') == f"bytes 100-199/{len(CLIP)}"
+
+        response, _ = request(server, path, {'Range': f'bytes={len(CLIP)}-'})
+        assert response.status == 416
+
+        response, body = request(server, path, method='HEAD')
+        assert response.status == 200 and body == b""
+        assert response.getheader('Content-Length') == str(len(CLIP))
+
+        response, _ = request(server, '/audio/' + '0' * 64 + '.mp3')
+        assert response.status == 404
+        print("✅ Clips are served with caching headers and byte ranges")
+    finally:
+        server.stop()
+
+def test_stream_sends_segments_as_they_finish():
+    print("🧪 Testing progressive stream")
+    server = AudioServer(host='127.0.0.1', port=0)
+    assert server.start()
+    try:
+        segments = [Future(), Future(), Future()]
+        url = server.publish_stream('a' * 64, segments)
+        segments[0].set_result(b'\xff\xfbfirst')
+        segments[1].set_exception(RuntimeError("synthesis failed"))
+
+        conn = http.client.HTTPConnection('127.0.0.1', server.port, timeout=5)
+        conn.request('GET', url.split(str(server.port), 1)[1])
+        response = conn.getresponse()
+        # The first segment arrives while the last one is still rendering
+        assert response.read(len(b'\xff\xfbfirst')) == b'\xff\xfbfirst'
+        threading.Timer(0.05, segments[2].set_result, [b'\xff\xfbthird']).start()
+        assert response.read() == b'\xff\xfbthird'
+        conn.close()
+
+        response, body = request(server, url.split(str(server.port), 1)[1], method='HEAD')
+        assert response.status == 200 and response.getheader('Content-Type') == 'audio/mpeg' and body == b''
+        response, _ = request(server, '/stream/' + 'b' * 64 + '.mp3')
+        assert response.status == 404
+        print("✅ Segments stream in order and failed ones are skipped")
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    test_parse_range()
+    test_store_deduplicates_and_evicts()
+    test_server_caching_and_ranges()
+    test_stream_sends_segments_as_they_finish()
+    print("🎉 All audio server tests passed!")
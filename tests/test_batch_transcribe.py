@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test batch transcription of recorded answer archives
+"""
+
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import wave
+import zipfile
+import pandas as pd
+sys.path.append('.')
+
+from batch_transcribe import RESULT_COLUMNS, find_recordings, transcribe_batch, write_results
+from stt_backends import SpeechNotRecognized, STTBackend
+
+class LengthBackend(STTBackend):
+    """Answers by recording length: 1 s says "option b", 2 s "I think it's C", 3 s is silence"""
+    name = "length"
+
+    def transcribe_pcm(self, pcm, rate, language):
+        seconds = round(len(pcm) / 2 / rate)
+        if seconds == 3:
+            raise SpeechNotRecognized()
+        return {1: " option b ", 2: "I think it's C"}[seconds]
+
+def make_wav(seconds, rate=8000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b'\x10\x00' * int(rate * seconds))
+    return buffer.getvalue()
+
+RECORDINGS = {
+    'q1/alice.wav': make_wav(1),
+    'q1/bob.wav': make_wav(2),
+    'q2/carol.wav': make_wav(3),
+    'q2/dave.wav': b'not really audio',
+}
+EXPECTED = {
+    'q1/alice.wav': ('B', None),
+    'q1/bob.wav': ('C', None),
+    'q2/carol.wav': (None, "no speech recognized"),
+}
+
+def write_directory(root):
+    for name, data in RECORDINGS.items():
+        path = os.path.join(root, *name.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+    with open(os.path.join(root, 'notes.txt'), 'w') as f:
+        f.write("not a recording")
+
+def check_rows(rows):
+    assert [row['file'] for row in rows] == sorted(RECORDINGS)
+    for row in rows:
+        assert set(row) == set(RESULT_COLUMNS)
+        if row['file'] in EXPECTED:
+            assert (row['answer'], row['error']) == EXPECTED[row['file']], row
+            assert row['decode_ms'] >= 0 and row['transcribe_ms'] >= 0
+        else:
+            assert row['answer'] is None and row['error'] and row['transcribe_ms'] is None
+        assert row['total_ms'] >= 0
+
+def test_directory_in_process():
+    print("🧪 Testing batch transcription of a directory")
+    with tempfile.TemporaryDirectory() as root:
+        write_directory(root)
+        assert len(list(find_recordings(root))) == 4
+        rows = transcribe_batch(root, LengthBackend(), language='en-US', workers=1)
+    check_rows(rows)
+    assert rows[1]['duration_s'] == 2.0 and rows[1]['container'] == 'wav'
+    print("✅ Every recording gets a row, failures carry an error")
+
+def test_archives_on_process_pool():
+    print("🧪 Testing ZIP and TAR archives on a process pool")
+    with tempfile.TemporaryDirectory() as root:
+        zip_path = os.path.join(root, 'answers.zip')
+        with zipfile.ZipFile(zip_path, 'w') as archive:
+            for name, data in RECORDINGS.items():
+                archive.writestr(name, data)
+        tar_path = os.path.join(root, 'answers.tar.gz')
+        with tarfile.open(tar_path, 'w:gz') as archive:
+            for name, data in sorted(RECORDINGS.items()):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+        for path in (zip_path, tar_path):
+            rows = transcribe_batch(path, LengthBackend(), language='en-US', workers=2)
+            check_rows(rows)
+            assert all(row['worker'] != os.getpid() for row in rows)
+
+        try:
+            transcribe_batch(os.path.join(root, 'answers.zip.missing'), LengthBackend(), workers=1)
+            assert False, "unknown sources should be rejected"
+        except ValueError:
+            pass
+    print("✅ Archives are transcribed by worker processes in input order")
+
+def test_write_csv_and_parquet():
+    print("🧪 Testing result files")
+    with tempfile.TemporaryDirectory() as root:
+        write_directory(root)
+        rows = transcribe_batch(root, LengthBackend(), language='en-US', workers=1)
+        for extension in ('.csv', '.parquet'):
+            path = write_results(rows, os.path.join(root, 'results' + extension))
+            frame = pd.read_csv(path) if extension == '.csv' else pd.read_parquet(path)
+            assert list(frame.columns) == RESULT_COLUMNS and len(frame) == len(rows)
+            assert list(frame['answer'].fillna('')) == ['B', 'C', '', '']
+        try:
+            write_results(rows, os.path.join(root, 'results.xlsx'))
+            assert False, "unknown output formats should be rejected"
+        except ValueError:
+            pass
+    print("✅ Results are written to CSV and Parquet")
+
+if __name__ == "__main__":
+    test_directory_in_process()
+    test_archives_on_process_pool()
+    test_write_csv_and_parquet()
+    print("🎉 All batch transcription tests passed!")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test the LLM-free cloze question generator
+"""
+
+import os
+import sys
+sys.path.append('.')
+
+from cloze_generator import ClozeQuestionGenerator
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', 'sample_documents',
+                           'machine_learning_basics.txt')
+
+def load_sample() -> str:
+    with open(SAMPLE_PATH, encoding='utf-8') as f:
+        return f.read()
+
+def test_key_terms():
+    """Key terms of the sample document are topical"""
+    print("🧪 Testing key term extraction")
+    terms = [term for term, _ in ClozeQuestionGenerator().extract_key_terms(load_sample(), 10)]
+    print(f"Top terms: {terms}")
+    assert 'machine learning' in terms
+
+def test_cloze_questions_schema():
+    """Generated questions follow the QuizManager schema and are answerable"""
+    print("🧪 Testing cloze question generation")
+    questions = ClozeQuestionGenerator().generate(load_sample(), num_questions=8,
+                                                  difficulty="hard", topic="ML")
+    assert len(questions) == 8
+
+    for q in questions:
+        assert q['question'].startswith("Fill in the blank:") and '_____' in q['question']
+        assert set(q['options']) == {'A', 'B', 'C', 'D'}
+        assert len({v.lower() for v in q['options'].values()}) == 4
+        answer = q['options'][q['correct_answer']]
+        # Putting the answer back into the blank restores the source sentence
+        restored = q['question'][len("Fill in the blank: "):].replace('_____', answer)
+        assert restored in q['explanation']
+        assert q['difficulty'] == "hard" and q['topic'] == "ML"
+    print(f"✅ {len(questions)} valid cloze questions")
+
+def test_short_content():
+    """Content without enough sentences yields no questions instead of failing"""
+    assert ClozeQuestionGenerator().generate("Too short.", 5) == []
+
+if __name__ == "__main__":
+    test_key_terms()
+    test_cloze_questions_schema()
+    test_short_content()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test composing feedback audio from reusable phrase segments
+"""
+
+import sys
+sys.path.append('.')
+
+from feedback_audio import FeedbackAudioComposer, CORRECT_PHRASE, CORRECTION_PHRASE, INCORRECT_PHRASE
+
+class SegmentCache:
+    """Render/lookup pair that counts how often each segment is synthesized"""
+
+    def __init__(self):
+        self.clips = {}
+        self.renders = []
+
+    def render(self, text):
+        if text not in self.clips:
+            self.renders.append(text)
+            self.clips[text] = b'\xff\xfb' + text.encode()
+        return self.clips[text]
+
+    def lookup(self, text):
+        return self.clips.get(text)
+
+def test_segments():
+    assert FeedbackAudioComposer.segments(True, 'B', 'Because.') == [CORRECT_PHRASE, 'Because.']
+    assert FeedbackAudioComposer.segments(False, 'c', 'Because.', 'a') == [
+        INCORRECT_PHRASE, 'A', CORRECTION_PHRASE, 'C', 'Because.'
+    ]
+    assert FeedbackAudioComposer.segments(True, 'B', '') == [CORRECT_PHRASE]
+
+def test_phrases_render_once_across_answers():
+    print("🧪 Testing feedback composition")
+    cache = SegmentCache()
+    composer = FeedbackAudioComposer(cache.render, cache.lookup)
+
+    assert composer.compose_ready(False, 'C', 'Explanation one.', 'A') is None
+    first = composer.compose(False, 'C', 'Explanation one.', 'A')
+    assert first == b''.join(cache.clips[t] for t in
+                             [INCORRECT_PHRASE, 'A', CORRECTION_PHRASE, 'C', 'Explanation one.'])
+
+    composer.compose(False, 'A', 'Explanation two.', 'C')
+    composer.compose(True, 'A', 'Explanation two.')
+    # Only the new explanation and the "correct" phrase were rendered after the first clip
+    assert cache.renders[5:] == ['Explanation two.', CORRECT_PHRASE]
+    assert composer.compose_ready(True, 'A', 'Explanation two.') is not None
+    print("✅ Fixed phrases and letters are shared by every feedback clip")
+
+if __name__ == "__main__":
+    test_segments()
+    test_phrases_render_once_across_answers()
+    print("🎉 All feedback audio tests passed!")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test lazy initialization of the voice subsystems and cached capability probes
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append('.')
+
+import capabilities
+import voice_handler as voice_handler_module
+from audio_cache import AudioCache
+from capabilities import load_optional, module_available
+from stt_backends import GoogleSTTBackend
+from tts_backends import SilentBackend
+from voice_handler import VoiceHandler
+
+HEAVY_MODULES = ['gtts', 'speech_recognition', 'pydub', 'pyaudio', 'vosk']
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def test_probes_are_cached_and_do_not_import():
+    print("🧪 Testing capability probes")
+    assert module_available('json') and not module_available('no_such_voice_module')
+    assert module_available.cache_info().currsize >= 2
+    assert load_optional('no_such_voice_module') is None
+    assert 'no_such_voice_module' in capabilities._loaded
+    assert load_optional('json') is sys.modules['json']
+    print("✅ Probes look modules up once and imports happen on demand")
+
+def test_construction_creates_nothing():
+    print("🧪 Testing VoiceHandler construction")
+    handler = QuietVoiceHandler(audio_cache=AudioCache(disk_dir=None))
+    assert not any(handler.voice_initialized().values())
+
+    handler.tts_backend = SilentBackend()
+    assert handler.text_to_speech_bytes("hello") is not None
+    state = handler.voice_initialized()
+    assert state['tts_backend'] and not state['stt_backend'] and not state['microphone']
+    assert handler.encode_for_client(b"clip", 'original')[0] == b"clip"
+    assert handler.voice_initialized()['transcoder']
+    print("✅ Engines are created on first use only")
+
+def test_stt_backend_and_microphone_are_created_once():
+    print("🧪 Testing first-use creation")
+    handler = QuietVoiceHandler(audio_cache=AudioCache(disk_dir=None))
+    backend = handler.stt_backend
+    assert isinstance(backend, GoogleSTTBackend) and handler.stt_backend is backend
+    assert backend._recognizer is None
+
+    first = handler.microphone
+    assert handler.voice_initialized()['microphone'] and handler.microphone is first
+    print("✅ The recognizer and microphone are probed once and cached")
+
+class SlowPool(ThreadPoolExecutor):
+    """A pool whose construction is slow enough for callers to race"""
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        time.sleep(0.05)
+        SlowPool.created += 1
+        super().__init__(*args, **kwargs)
+
+def test_segment_pool_is_created_once_across_threads():
+    print("🧪 Testing concurrent segment rendering")
+    handler = QuietVoiceHandler(audio_cache=AudioCache(disk_dir=None))
+    handler.tts_backend = SilentBackend()
+    original = voice_handler_module.ThreadPoolExecutor
+    voice_handler_module.ThreadPoolExecutor = SlowPool
+    SlowPool.created = 0
+    try:
+        start = threading.Barrier(4)
+        futures = []
+
+        def render():
+            start.wait()
+            futures.extend(handler.render_segments("First sentence. Second sentence."))
+
+        threads = [threading.Thread(target=render) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(future.result() for future in futures)
+        assert SlowPool.created == 1 and handler.voice_initialized()['segment_pool']
+    finally:
+        voice_handler_module.ThreadPoolExecutor = original
+        handler.segment_pool.shutdown(wait=True)
+    print("✅ Threads rendering at once share one segment pool")
+
+def test_voice_off_imports_no_engines():
+    print("🧪 Testing cold start with voice disabled")
+    script = (
+        "import sys; sys.path.append('.')\n"
+        "from audio_cache import AudioCache\n"
+        "from voice_handler import VoiceHandler\n"
+        "class Quiet(VoiceHandler):\n"
+        "    def _check_dependencies(self): pass\n"
+        "Quiet(audio_cache=AudioCache(disk_dir=None)).get_cache_stats()\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    loaded = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    assert loaded == "", f"imported at startup: {loaded}"
+    print("✅ No speech engine is imported until voice mode is used")
+
+if __name__ == "__main__":
+    test_probes_are_cached_and_do_not_import()
+    test_construction_creates_nothing()
+    test_stt_backend_and_microphone_are_created_once()
+    test_segment_pool_is_created_once_across_threads()
+    test_voice_off_imports_no_engines()
+    print("🎉 All lazy voice tests passed!")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test cached ambient-noise calibration and its background refresh
+"""
+
+import sys
+import numpy as np
+sys.path.append('.')
+
+from noise_calibration import CalibrationCache, measure_noise_floor
+from stt_backends import STTBackend, SpeechNotRecognized
+from tts_backends import SilentBackend
+from voice_activity import SILENCE, SPEECH, UtteranceCapture, VoiceActivityDetector, capture_utterance
+from voice_handler import VoiceHandler
+
+RATE = 16000
+
+def tone(seconds, amplitude=8000, freq=220):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype('<i2')
+
+def noise(seconds, amplitude=30, seed=0):
+    return np.random.default_rng(seed).integers(-amplitude, amplitude, int(seconds * RATE)).astype('<i2')
+
+def chunks(samples, size=1600):
+    return [samples[i:i + size].tobytes() for i in range(0, len(samples), size)]
+
+class WordSession:
+    def __init__(self, word):
+        self.word = word
+
+    def accept(self, pcm):
+        return ""
+
+    def finish(self):
+        if not self.word:
+            raise SpeechNotRecognized()
+        return self.word, 0.9
+
+class FinalBackend(STTBackend):
+    name = "final"
+
+    def __init__(self, word):
+        self.word = word
+
+    def stream(self, rate, language, phrases=None):
+        return WordSession(self.word)
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def test_noise_floor_ignores_bursts():
+    print("🧪 Testing noise floor measurement")
+    quiet = measure_noise_floor(noise(1.0).tobytes(), RATE)
+    with_cough = measure_noise_floor(np.concatenate((noise(0.8), tone(0.2))).tobytes(), RATE)
+    louder = measure_noise_floor(noise(1.0, amplitude=600).tobytes(), RATE)
+    assert -70 < quiet < -60 and abs(with_cough - quiet) < 2 and louder > quiet + 20
+    assert measure_noise_floor(b"\x00\x00" * 10, RATE) is None
+    print(f"✅ Floor {quiet:.1f} dBFS, unaffected by a burst of speech")
+
+def test_calibrated_vad_hears_speech_from_the_first_frame():
+    print("🧪 Testing a VAD seeded with a cached floor")
+    speech = tone(0.5, amplitude=2000)
+    assert VoiceActivityDetector(RATE).process(speech) == SILENCE
+    floor = measure_noise_floor(noise(0.5).tobytes(), RATE)
+    seeded = VoiceActivityDetector(RATE, noise_floor_db=floor)
+    assert seeded.process(speech) == SPEECH and seeded.speech_start_frame == 0
+    seeded.reset()
+    assert seeded.noise_floor_db == floor
+    print("✅ Speech right at the start of listening is not mistaken for noise")
+
+def test_leading_silence_is_harvested():
+    print("🧪 Testing leading silence of a capture")
+    capture = UtteranceCapture(RATE, vad=VoiceActivityDetector(RATE, end_silence_ms=300))
+    capture_utterance(chunks(np.concatenate((noise(0.4), tone(0.5), noise(1.0)))), capture)
+    leading = np.frombuffer(capture.leading_silence(), dtype='<i2')
+    assert abs(len(leading) / RATE - 0.4) < 0.05 and np.abs(leading).max() < 100
+    print("✅ The audio before speech onset is available as ambient noise")
+
+def test_refresh_runs_in_background_when_errors_rise():
+    print("🧪 Testing background recalibration")
+    cache = CalibrationCache(window=4, min_outcomes=3, recalibrate_error_rate=0.5)
+    first = cache.calibrate('mic', noise(0.5).tobytes(), RATE)
+    assert cache.get('mic') is first
+    cache.observe_ambient('mic', noise(0.5, amplitude=600, seed=1).tobytes(), RATE)
+    assert not cache.record_outcome('mic', True)
+    assert not cache.record_outcome('mic', False)
+    assert cache.record_outcome('mic', False)
+    cache.wait_for_refresh('mic', timeout=5)
+    refreshed = cache.get('mic')
+    assert refreshed.source == "refresh" and refreshed.noise_floor_db > first.noise_floor_db + 20
+    assert cache.stats()['refreshes'] == 1
+
+    bare = CalibrationCache(min_outcomes=1, recalibrate_error_rate=0.5)
+    bare.calibrate('session', noise(0.5).tobytes(), RATE)
+    assert not bare.record_outcome('session', False) and bare.get('session') is None
+
+    stale = CalibrationCache(max_age_seconds=-1)
+    stale.calibrate('mic', noise(0.5).tobytes(), RATE)
+    assert stale.get('mic') is None
+    print("✅ Rising error rates re-measure the floor off the answer path")
+
+def test_stream_answer_reuses_calibration():
+    print("🧪 Testing VoiceHandler.stream_answer calibration")
+    cache = CalibrationCache()
+    handler = QuietVoiceHandler(tts_backend=SilentBackend(), stt_backend=FinalBackend("bravo"),
+                                calibration_cache=cache)
+    first = handler.stream_answer(chunks(np.concatenate((noise(0.5), tone(0.5), noise(1.0)))), RATE,
+                                  calibration_key='session-1')
+    assert first['answer'] == 'B' and cache.get('session-1').source == "capture"
+    # Speaking straight away is heard because the floor is already known
+    second = handler.stream_answer(chunks(np.concatenate((tone(0.5, amplitude=2000), noise(1.0)))), RATE,
+                                   calibration_key='session-1')
+    assert second['answer'] == 'B' and second['reason'] == "endpoint"
+    assert cache.stats()['calibrations'] == 1
+    print("✅ The first capture calibrates and later answers reuse it")
+
+class FakeMicrophone:
+    CHUNK = 1600
+    SAMPLE_RATE = RATE
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, device_index, samples):
+        self.device_index = device_index
+        self.stream = self
+        self._chunks = chunks(samples, self.CHUNK)
+
+    def read(self, size):
+        return self._chunks.pop(0) if self._chunks else b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def test_listen_for_answer_keys_calibration_by_device():
+    print("🧪 Testing VoiceHandler.listen_for_answer calibration keys")
+    cache = CalibrationCache()
+    handler = QuietVoiceHandler(tts_backend=SilentBackend(), calibration_cache=cache,
+                                stt_backend=FinalBackend("bravo"))
+    handler._microphone_probed = True
+    for device_index, key in ((0, 'microphone:0'), (None, 'microphone:default')):
+        speech = np.concatenate((noise(1.5), tone(0.5), noise(1.0)))
+        handler._microphone = FakeMicrophone(device_index, speech)
+        assert handler.listen_for_answer()['answer'] == 'B'
+        assert cache.get(key).source == "calibration"
+    assert cache.stats()['calibrations'] == 2
+    print("✅ Device 0 and the default microphone keep separate noise floors")
+
+if __name__ == "__main__":
+    test_noise_floor_ignores_bursts()
+    test_calibrated_vad_hears_speech_from_the_first_frame()
+    test_leading_silence_is_harvested()
+    test_refresh_runs_in_background_when_errors_rise()
+    test_stream_answer_reuses_calibration()
+    test_listen_for_answer_keys_calibration_by_device()
+    print("🎉 All noise calibration tests passed!")
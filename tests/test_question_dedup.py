@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test cross-batch question deduplication
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append('.')
+
+from question_dedup import QuestionDedupIndex, normalize_stem
+
+def make_question(stem: str) -> dict:
+    return {"question": stem, "options": {"A": "1", "B": "2", "C": "3", "D": "4"},
+            "correct_answer": "A", "explanation": ""}
+
+def test_normalization():
+    """Case, punctuation and boilerplate do not change the fingerprint"""
+    assert normalize_stem("Fill in the blank: What IS  overfitting?") == "what is overfitting"
+    assert (QuestionDedupIndex.fingerprint("What is overfitting?") ==
+            QuestionDedupIndex.fingerprint("what is overfitting"))
+
+def test_near_duplicates():
+    """Rephrased stems are caught, unrelated stems are not"""
+    print("🧪 Testing near-duplicate lookup")
+    index = QuestionDedupIndex()
+    index.add("What is the primary function of machine learning?")
+
+    assert index.is_duplicate("What is the primary function of Machine Learning")
+    assert index.is_duplicate("What is the main function of machine learning?")
+    assert not index.is_duplicate("Which algorithm is commonly used for clustering?")
+    print("✅ Near duplicates detected")
+
+def test_filter_new_across_batches():
+    """Duplicates are rejected within a batch and against earlier batches"""
+    index = QuestionDedupIndex()
+    first = [make_question("What does overfitting mean in machine learning?"),
+             make_question("What does overfitting mean for machine learning?"),
+             make_question("What is cross-validation used for?")]
+    unique, duplicates = index.filter_new(first)
+    assert len(unique) == 2 and len(duplicates) == 1
+
+    second = [make_question("What is cross validation used for?"),
+              make_question("Name a reinforcement learning application.")]
+    unique, duplicates = index.filter_new(second)
+    assert [q['question'] for q in unique] == ["Name a reinforcement learning application."]
+    assert len(index) == 3
+
+def test_save_and_load():
+    """A saved question bank keeps detecting duplicates after reloading"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'bank.npz')
+        index = QuestionDedupIndex(path=path)
+        index.add("What is supervised learning?")
+        index.save()
+
+        reloaded = QuestionDedupIndex(path=path)
+        assert len(reloaded) == 1
+        assert reloaded.is_duplicate("What is supervised learning")
+
+def test_save_appends_and_compacts():
+    """Saves append only new stems to the journal until it outgrows the archive"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'bank.npz')
+        journal = QuestionDedupIndex.journal_path(path)
+        index = QuestionDedupIndex(path=path, compact_min=4)
+        index.add("What is supervised learning?")
+        index.save()
+        archive_mtime = os.stat(path).st_mtime_ns
+        for i in range(3):
+            index.add(f"Which algorithm number {i} clusters unlabeled points?")
+            index.save()
+        assert os.stat(path).st_mtime_ns == archive_mtime and os.path.exists(journal)
+
+        # Half a record left by a crash is ignored
+        with open(journal, 'ab') as f:
+            f.write(b'\x00' * 17)
+        reloaded = QuestionDedupIndex(path=path, compact_min=4)
+        assert len(reloaded) == 4
+        assert reloaded.is_duplicate("Which algorithm number 2 clusters unlabeled points")
+
+        reloaded.add("What is a decision tree?")
+        reloaded.save()
+        assert len(QuestionDedupIndex(path=path)) == 5
+
+        reloaded.add("How does gradient descent update the weights?")
+        reloaded.add("What does a confusion matrix show?")
+        reloaded.save()
+        assert not os.path.exists(journal)
+        assert len(QuestionDedupIndex(path=path)) == 7
+
+def test_instances_sharing_a_path_keep_each_others_entries():
+    """Two indexes saving to one bank (two processes) never cut off each other's records"""
+    print("🧪 Testing a bank shared by two writers")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'bank.npz')
+        seed = QuestionDedupIndex(path=path, compact_min=6)
+        seed.add("What is supervised learning?")
+        seed.save()
+
+        first = QuestionDedupIndex(path=path, compact_min=6)
+        second = QuestionDedupIndex(path=path, compact_min=6)
+        for i in range(3):
+            first.add(f"Which planet is number {i} from the sun in our system?")
+            first.save()
+            second.add(f"Which river flows through capital city number {i}?")
+            second.save()
+        # The second writer learned the first writer's stems while saving
+        assert second.is_duplicate("Which planet is number 1 from the sun in our system")
+        assert len(QuestionDedupIndex(path=path)) == 7
+
+        # A compaction by one writer is picked up by the other
+        first.add("What does a confusion matrix show?")
+        first.save()
+        assert not os.path.exists(QuestionDedupIndex.journal_path(path))
+        second.add("How does gradient descent update the weights?")
+        second.save()
+        reloaded = QuestionDedupIndex(path=path)
+        assert len(reloaded) == 9
+        assert reloaded.is_duplicate("What does a confusion matrix show")
+    print("✅ Every writer's stems survive appends and compactions")
+
+if __name__ == "__main__":
+    test_normalization()
+    test_near_duplicates()
+    test_filter_new_across_batches()
+    test_save_and_load()
+    test_save_appends_and_compacts()
+    test_instances_sharing_a_path_keep_each_others_entries()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test how QuestionGenerator filters generated questions before they reach a quiz
+"""
+
+import json
+import sys
+sys.path.append('.')
+
+import question_generator as question_generator_module
+from generation_backends import GenerationBackend, LocalBackend
+from question_dedup import QuestionDedupIndex
+from question_generator import STRICT_REQUIREMENT, QuestionGenerator
+from test_question_grounding import GROUNDED, UNGROUNDED, load_sample
+
+class QuietStreamlit:
+    """Swallows st.info/warning/... calls made while generating"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+class ScriptedBackend(GenerationBackend):
+    name = "scripted"
+    label = "Scripted"
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate(self, prompt, content, num_questions, difficulty, topic="", avoid=None):
+        self.prompts.append(prompt)
+        return json.dumps(self.responses.pop(0) if self.responses else [])
+
+def make_generator(backend):
+    generator = QuestionGenerator(backend=backend)
+    generator.question_bank = QuestionDedupIndex(path=None)
+    return generator
+
+def test_all_ungrounded_returns_no_quiz():
+    print("🧪 Testing a batch with no grounded question")
+    original = question_generator_module.st
+    question_generator_module.st = QuietStreamlit()
+    try:
+        mars = dict(UNGROUNDED, question="What is on Mars?")
+        backend = ScriptedBackend([UNGROUNDED], [mars])
+        generator = make_generator(backend)
+        questions = generator.generate_questions(load_sample(), 2)
+        assert questions == [], "no demo samples stand in for the document"
+        assert len(backend.prompts) == 2, "generation is retried once"
+        assert STRICT_REQUIREMENT in backend.prompts[1]
+        assert STRICT_REQUIREMENT not in backend.prompts[0]
+        assert len(generator.question_bank) == 0
+    finally:
+        question_generator_module.st = original
+    print("✅ Ungrounded questions never reach the quiz")
+
+def test_strict_retry_keeps_grounded():
+    print("🧪 Testing the stricter retry after an ungrounded batch")
+    original = question_generator_module.st
+    question_generator_module.st = QuietStreamlit()
+    try:
+        backend = ScriptedBackend([UNGROUNDED], [GROUNDED])
+        generator = make_generator(backend)
+        questions = generator.generate_questions(load_sample(), 1)
+        assert [q['question'] for q in questions] == [GROUNDED['question']]
+        assert UNGROUNDED['question'] in backend.prompts[1], "rejected ones are avoided"
+    finally:
+        question_generator_module.st = original
+    print("✅ A grounded retry becomes the quiz")
+
+def test_only_repeats_are_not_returned():
+    print("🧪 Testing a batch of previously asked questions")
+    original = question_generator_module.st
+    question_generator_module.st = QuietStreamlit()
+    try:
+        repeat = dict(GROUNDED, question="In machine learning, what is meant by overfitting?")
+        backend = ScriptedBackend([repeat], [repeat])
+        generator = make_generator(backend)
+        generator.question_bank.add(repeat['question'])
+        questions = generator.generate_questions(load_sample(), 1)
+        assert len(backend.prompts) == 2, "the shortfall is regenerated once"
+        assert questions == [], "neither repeats nor demo samples make up the quiz"
+    finally:
+        question_generator_module.st = original
+    print("✅ Repeats are regenerated, never returned as the quiz")
+
+def test_local_backend_replaces_repeats():
+    print("🧪 Testing repeats with the local backend")
+    original = question_generator_module.st
+    question_generator_module.st = QuietStreamlit()
+    try:
+        generator = make_generator(LocalBackend())
+        first = generator.generate_questions(load_sample(), 3)
+        second = generator.generate_questions(load_sample(), 3)
+        assert all(q['question'].startswith("Fill in the blank") for q in first + second)
+        assert not {q['question'] for q in first} & {q['question'] for q in second}
+    finally:
+        question_generator_module.st = original
+    print("✅ The local backend skips questions the bank has already seen")
+
+if __name__ == "__main__":
+    test_all_ungrounded_returns_no_quiz()
+    test_strict_retry_keeps_grounded()
+    test_only_repeats_are_not_returned()
+    test_local_backend_replaces_repeats()
+    print("🎉 All question generator tests passed!")
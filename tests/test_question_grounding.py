@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the local answerability and grounding scorer
+"""
+
+import os
+import sys
+sys.path.append('.')
+
+from question_grounding import GroundingScorer
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', 'sample_documents',
+                           'machine_learning_basics.txt')
+
+GROUNDED = {
+    "question": "What does 'overfitting' mean in machine learning?",
+    "options": {
+        "A": "The model performs well on training data but poorly on new data",
+        "B": "The model uses a GPU",
+        "C": "The model has too few parameters",
+        "D": "The model trains too quickly"
+    },
+    "correct_answer": "A",
+    "explanation": "Overfitting occurs when a model learns the training data too well, including noise and outliers."
+}
+
+UNGROUNDED = {
+    "question": "What colour is the sky on Mars?",
+    "options": {"A": "Red", "B": "Butterscotch", "C": "Blue", "D": "Green"},
+    "correct_answer": "B",
+    "explanation": "Dust particles scatter sunlight in the Martian atmosphere."
+}
+
+def load_sample() -> str:
+    with open(SAMPLE_PATH, encoding='utf-8') as f:
+        return f.read()
+
+def test_grounding_scores_and_sources():
+    """Grounded questions score high and cite the chunk containing the answer"""
+    print("🧪 Testing grounding scores")
+    content = load_sample()
+    grounded, ungrounded = GroundingScorer().score_questions([GROUNDED, UNGROUNDED], content)
+    print(f"Grounded: {grounded}")
+    print(f"Ungrounded: {ungrounded}")
+
+    assert grounded['score'] > 0.5
+    assert ungrounded['score'] < 0.1
+    source = grounded['source']
+    assert 'Overfitting occurs' in content[source['start']:source['end']]
+
+def test_filter_questions():
+    """Filtering keeps grounded questions and attaches grounding details"""
+    kept, rejected = GroundingScorer().filter_questions([GROUNDED, UNGROUNDED], load_sample())
+    assert [q['question'] for q in kept] == [GROUNDED['question']]
+    assert [q['question'] for q in rejected] == [UNGROUNDED['question']]
+    assert 'grounding' in kept[0] and 'grounding' not in GROUNDED
+
+def test_ambiguous_distractors():
+    """A distractor that is also supported by the source chunk is flagged"""
+    question = dict(GROUNDED, options=dict(GROUNDED['options'],
+                                           C="The model learns the training data too well"))
+    result = GroundingScorer().score_questions([question], load_sample())[0]
+    assert result['ambiguous_options'] == ['C']
+
+if __name__ == "__main__":
+    test_grounding_scores_and_sources()
+    test_filter_questions()
+    test_ambiguous_distractors()
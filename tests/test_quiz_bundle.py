@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Test quiz bundles: questions plus pre-rendered audio in one memory-mapped file
+"""
+
+import json
+import os
+import sys
+import tempfile
+sys.path.append('.')
+
+import quiz_manager as quiz_manager_module
+from audio_cache import AudioCache
+from quiz_bundle import HEADER, MAGIC, QuizBundle, write_bundle
+from quiz_manager import QuizManager
+from scratch_space import ScratchSpace
+from tts_backends import SilentBackend
+from voice_handler import VoiceHandler
+
+QUESTIONS = [
+    {'question': f'Question {i}?', 'options': {'A': 'one', 'B': 'two', 'C': 'three', 'D': 'four'},
+     'correct_answer': 'B', 'explanation': f'Because of reason {i}.'}
+    for i in range(3)
+]
+
+class CountingBackend(SilentBackend):
+    def __init__(self):
+        super().__init__(ms_per_char=5)
+        self.calls = 0
+
+    def synthesize(self, text, language, slow=False):
+        self.calls += 1
+        return super().synthesize(text, language, slow)
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+class SessionState(dict):
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+class FakeStreamlit:
+    def __init__(self):
+        self.session_state = SessionState()
+
+def make_handler(scratch_space=None):
+    return QuietVoiceHandler(audio_cache=AudioCache(disk_dir=None), tts_backend=CountingBackend(),
+                             scratch_space=scratch_space)
+
+def test_round_trip():
+    print("🧪 Testing bundle round trip")
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'quiz.vqb')
+        clips = {'k1': (b'first clip', '.wav'), 'k2': (b'\x00' * 1000, '.mp3')}
+        write_bundle(path, QUESTIONS, clips, {'difficulty': 'hard'})
+        with QuizBundle(path) as bundle:
+            assert bundle.questions == QUESTIONS and bundle.metadata['difficulty'] == 'hard'
+            assert len(bundle) == 2 and 'k1' in bundle and 'k3' not in bundle
+            assert bundle.get('k1') == b'first clip' and bundle.get('k2') == b'\x00' * 1000
+            assert bundle.suffix('k1') == '.wav' and bundle.get('k3') is None
+        assert bundle.get('k1') is None
+
+        junk = os.path.join(root, 'junk.vqb')
+        for data in (b'', b'not a bundle at all, just some bytes'):
+            with open(junk, 'wb') as f:
+                f.write(data)
+            try:
+                QuizBundle(junk)
+                assert False, "files that are not bundles should be rejected"
+            except ValueError:
+                pass
+    print("✅ Questions and clips come back byte for byte")
+
+def open_files():
+    return len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else 0
+
+def test_incomplete_index_is_rejected():
+    print("🧪 Testing bundles with an incomplete index")
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'bad.vqb')
+        past_end = {'version': 1, 'metadata': {}, 'questions': [],
+                    'clips': {'k': [8, 10**6, '.wav']}}
+        for index in ({'version': 1, 'metadata': {}}, past_end, [1, 2, 3]):
+            payload = json.dumps(index).encode('utf-8')
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, HEADER.size, len(payload)) + payload)
+            before = open_files()
+            try:
+                QuizBundle(path)
+                assert False, "incomplete bundles should be rejected"
+            except ValueError:
+                pass
+            assert open_files() == before, "the file is closed again"
+    print("✅ Bad indexes raise ValueError without leaking the file")
+
+def fail_to_start(questions, difficulty='medium'):
+    raise RuntimeError("session state unavailable")
+
+def test_failed_start_detaches_bundle():
+    print("🧪 Testing a bundle quiz that cannot start")
+    original = quiz_manager_module.st
+    quiz_manager_module.st = FakeStreamlit()
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'quiz.vqb')
+            handler = make_handler()
+            manager = QuizManager(handler)
+            broken = [dict(QUESTIONS[0], correct_answer='Z')]
+            write_bundle(path, broken, {'clip': (b'audio', '.wav')})
+            try:
+                manager.start_bundle(path)
+                assert False, "malformed questions should be rejected"
+            except ValueError:
+                pass
+            assert handler.audio_cache.stats()['sources'] == 0
+
+            write_bundle(path, QUESTIONS, {'clip': (b'audio', '.wav')})
+            manager.start_quiz = fail_to_start
+            try:
+                manager.start_bundle(path)
+                assert False, "start_quiz errors propagate"
+            except RuntimeError:
+                pass
+            assert handler.audio_cache.stats()['sources'] == 0
+            session = quiz_manager_module.st.session_state.get('quiz_session', {})
+            assert 'bundle' not in session
+    finally:
+        quiz_manager_module.st = original
+    print("✅ Failed starts leave nothing attached or open")
+
+def test_cache_serves_attached_bundle():
+    print("🧪 Testing a bundle attached to the audio cache")
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'quiz.vqb')
+        write_bundle(path, [], {'clip': (b'audio', '.wav')})
+        with QuizBundle(path) as bundle:
+            cache = AudioCache(disk_dir=os.path.join(root, 'cache'))
+            assert not cache.contains('clip')
+            cache.attach(bundle)
+            cache.attach(bundle)
+            assert cache.contains('clip') and cache.stats()['sources'] == 1
+            assert cache.get_path('clip').endswith('clip.wav')
+            assert cache.get('clip') == b'audio'
+            stats = cache.stats()
+            assert stats['source_hits'] == 1 and stats['misses'] == 0
+            cache.detach(bundle)
+            assert cache.stats()['sources'] == 0 and cache.get('clip') == b'audio'
+    print("✅ Bundle clips are promoted into the cache on first use")
+
+def test_replay_needs_no_tts():
+    print("🧪 Testing a quiz replayed from a bundle")
+    original = quiz_manager_module.st
+    quiz_manager_module.st = FakeStreamlit()
+    try:
+        exporter = QuizManager(make_handler())
+        exporter.start_quiz(QUESTIONS, 'hard')
+        data = exporter.export_bundle()
+        rendered = exporter.voice_handler.tts_backend.calls
+        assert rendered > 0
+
+        with tempfile.TemporaryDirectory() as root:
+            quiz_manager_module.st = FakeStreamlit()
+            handler = make_handler(ScratchSpace(ttl_seconds=0, janitor_interval=0, parent_dir=root))
+            # Uploads are pinned scratch files, as in the app
+            path = handler.scratch.create(data, suffix='.vqb', pinned=True)
+            manager = QuizManager(handler)
+            assert manager.start_bundle(path) == len(handler._quiz_clip_texts(QUESTIONS))
+            session = quiz_manager_module.st.session_state.quiz_session
+            assert session['questions'] == QUESTIONS and session['difficulty'] == 'hard'
+            assert handler.prerender_quiz(QUESTIONS) == 0
+            for question in QUESTIONS:
+                assert handler.get_ready_question_audio(question)
+            assert handler.get_ready_feedback_audio(False, 'B', QUESTIONS[0]['explanation'], 'A')
+            assert handler.tts_backend.calls == 0
+            assert handler.scratch.sweep() == 0 and os.path.exists(path)
+            manager.reset_session()
+            assert handler.audio_cache.stats()['sources'] == 0
+            assert not os.path.exists(path)
+            handler.scratch.close()
+    finally:
+        quiz_manager_module.st = original
+    print(f"✅ {rendered} clips rendered once at export, none on replay")
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_incomplete_index_is_rejected()
+    test_failed_start_detaches_bundle()
+    test_cache_serves_attached_bundle()
+    test_replay_needs_no_tts()
+    print("🎉 All quiz bundle tests passed!")
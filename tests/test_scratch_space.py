@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test the managed scratch space for short-lived audio files
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append('.')
+
+from audio_cache import AudioCache
+import scratch_space
+from scratch_space import DIR_PREFIX, ScratchSpace
+from tts_backends import TTSBackend
+from voice_handler import VoiceHandler
+
+class FixedBackend(TTSBackend):
+    name = "fixed"
+
+    def synthesize(self, text, language, slow=False):
+        return b"x" * 100
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_quota_reclaims_least_recently_used():
+    print("🧪 Testing scratch quotas")
+    with tempfile.TemporaryDirectory() as parent:
+        scratch = ScratchSpace(quota_bytes=250, max_files=10, janitor_interval=0, parent_dir=parent)
+        first = scratch.create(b"a" * 100, suffix=".mp3")
+        second = scratch.create(b"b" * 100)
+        scratch.touch(first)
+        third = scratch.create(b"c" * 100)
+        assert not os.path.exists(second) and os.path.exists(first) and os.path.exists(third)
+        stats = scratch.stats()
+        assert stats['bytes_in_use'] == 200 and stats['files_in_use'] == 2 and stats['reclaimed'] == 1
+
+        counted = ScratchSpace(quota_bytes=10**6, max_files=2, janitor_interval=0, parent_dir=parent)
+        paths = [counted.create(b"x") for _ in range(3)]
+        assert [os.path.exists(p) for p in paths] == [False, True, True]
+        scratch.close()
+        counted.close()
+        assert not os.path.exists(scratch.directory)
+    print("✅ Byte and file quotas evict the least recently used files")
+
+def test_janitor_removes_expired_files():
+    print("🧪 Testing janitor thread")
+    with tempfile.TemporaryDirectory() as parent:
+        scratch = ScratchSpace(ttl_seconds=0.05, janitor_interval=0.02, parent_dir=parent)
+        path = scratch.create(b"wav")
+        assert wait_for(lambda: not os.path.exists(path))
+        assert scratch.stats()['files_in_use'] == 0 and scratch.stats()['expired'] == 1
+        scratch.close()
+    print("✅ Expired files are removed in the background")
+
+def test_pinned_files_are_never_reclaimed():
+    print("🧪 Testing pinned scratch files")
+    with tempfile.TemporaryDirectory() as parent:
+        scratch = ScratchSpace(quota_bytes=150, max_files=2, ttl_seconds=0, janitor_interval=0,
+                               parent_dir=parent)
+        pinned = scratch.create(b"p" * 100, suffix=".vqb", pinned=True)
+        others = [scratch.create(b"x" * 100) for _ in range(3)]
+        assert scratch.sweep() == 1
+        assert os.path.exists(pinned) and scratch.owns(pinned)
+        assert not any(os.path.exists(p) for p in others)
+        stats = scratch.stats()
+        assert stats['pinned_files'] == 1 and stats['pinned_bytes'] == 100 and stats['bytes_in_use'] == 0
+        scratch.release(pinned)
+        assert not os.path.exists(pinned) and scratch.stats()['pinned_files'] == 0
+        scratch.close()
+    print("✅ Pinned files skip quotas and expiry until released")
+
+def test_pinned_leases_run_out():
+    print("🧪 Testing pinned file leases")
+    with tempfile.TemporaryDirectory() as parent:
+        scratch = ScratchSpace(janitor_interval=0, parent_dir=parent,
+                               pinned_ttl_seconds=0.2)
+        pinned = scratch.create(b"bundle", pinned=True)
+        time.sleep(0.12)
+        scratch.touch(pinned)
+        time.sleep(0.12)
+        assert scratch.sweep() == 0 and os.path.exists(pinned), "touch renews the lease"
+        time.sleep(0.25)
+        assert scratch.sweep() == 1 and not os.path.exists(pinned)
+        assert scratch.stats()['pinned_files'] == 0
+        scratch.close()
+    print("✅ Abandoned pinned files are removed when their lease runs out")
+
+def test_orphaned_directories_are_removed():
+    print("🧪 Testing orphan cleanup")
+    with tempfile.TemporaryDirectory() as parent:
+        # PIDs above the kernel's pid_max are never alive
+        orphan = os.path.join(parent, f"{DIR_PREFIX}99999999-abc")
+        os.makedirs(orphan)
+        open(os.path.join(orphan, 'leak.wav'), 'wb').close()
+        unrelated = os.path.join(parent, "other-dir")
+        os.makedirs(unrelated)
+        scratch = ScratchSpace(janitor_interval=0, parent_dir=parent)
+        assert not os.path.exists(orphan) and os.path.exists(unrelated)
+        scratch.close()
+    print("✅ Directories of dead processes are cleaned up at start-up")
+
+def test_liveness_check_never_signals_on_windows():
+    print("🧪 Testing the Windows liveness check")
+    calls = []
+    original_name, original_check = os.name, scratch_space._windows_pid_alive
+    scratch_space._windows_pid_alive = lambda pid: calls.append(pid) or False
+    try:
+        # Signal 0 is CTRL_C_EVENT on Windows, so os.kill must not be used there
+        os.name = 'nt'
+        assert not scratch_space._pid_alive(4242) and calls == [4242]
+    finally:
+        os.name = original_name
+        scratch_space._windows_pid_alive = original_check
+    assert scratch_space._pid_alive(os.getpid())
+    print("✅ Windows asks the kernel instead of sending signal 0")
+
+def test_voice_handler_uses_scratch_space():
+    print("🧪 Testing VoiceHandler scratch files")
+    with tempfile.TemporaryDirectory() as parent:
+        scratch = ScratchSpace(janitor_interval=0, parent_dir=parent)
+        handler = QuietVoiceHandler(audio_cache=AudioCache(disk_dir=None), tts_backend=FixedBackend(),
+                                    scratch_space=scratch)
+        path = handler.text_to_speech("hello")
+        assert path.startswith(scratch.directory)
+        assert handler.get_scratch_stats()['files_in_use'] == 1
+        handler.cleanup_temp_files([path])
+        assert not os.path.exists(path) and handler.get_scratch_stats()['bytes_in_use'] == 0
+        scratch.close()
+    print("✅ Memory-only caches spill to managed scratch files")
+
+if __name__ == "__main__":
+    test_quota_reclaims_least_recently_used()
+    test_janitor_removes_expired_files()
+    test_pinned_files_are_never_reclaimed()
+    test_pinned_leases_run_out()
+    test_orphaned_directories_are_removed()
+    test_liveness_check_never_signals_on_windows()
+    test_voice_handler_uses_scratch_space()
+    print("🎉 All scratch space tests passed!")
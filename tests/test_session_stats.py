@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the running session statistics kept by QuizManager
+"""
+
+import random
+import statistics
+import sys
+sys.path.append('.')
+
+import quiz_manager as quiz_manager_module
+from quiz_manager import QuizManager
+
+TOPICS = ['Algebra', 'Geometry', 'Calculus']
+
+class SessionState(dict):
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+class FakeStreamlit:
+    def __init__(self):
+        self.session_state = SessionState()
+
+    def error(self, message):
+        raise AssertionError(message)
+
+def make_questions(count, seed=0):
+    rng = random.Random(seed)
+    return [{
+        'question': f"Question number {i} about a fairly long subject that needs truncating?",
+        'options': {'A': '1', 'B': '2', 'C': '3', 'D': '4'},
+        'correct_answer': rng.choice('ABCD'),
+        'topic': TOPICS[i % 3],
+        'difficulty': ['easy', 'hard'][i % 2]
+    } for i in range(count)]
+
+def run_quiz(manager, questions, seed=0):
+    rng = random.Random(seed)
+    manager.start_quiz(questions, 'medium')
+    for question in questions:
+        answer = question['correct_answer'] if rng.random() < 0.6 else 'A'
+        # Some answers are untimed (0), as when there is no answer timer
+        manager.submit_answer(answer, rng.choice([0, rng.uniform(1, 40)]))
+
+def check_against_rescan(manager):
+    session = quiz_manager_module.st.session_state.quiz_session
+    answers = session['answers']
+    stats = manager.get_session_stats()
+    times = [a['time_taken'] for a in answers if a['time_taken'] > 0]
+    scores = [a['score'] for a in answers]
+    assert stats['total_questions'] == len(answers)
+    assert stats['correct_answers'] == sum(a['is_correct'] for a in answers)
+    assert abs(stats['total_score'] - sum(scores)) < 1e-9
+    assert abs(stats['average_time_per_question'] - statistics.mean(times)) < 1e-9
+    assert abs(stats['time_variance'] - statistics.pvariance(times)) < 1e-6
+    assert abs(stats['score_variance'] - statistics.pvariance(scores)) < 1e-9
+    assert stats['min_time'] == min(times) and stats['max_time'] == max(times)
+    for topic in TOPICS:
+        picked = [a for a in answers if session['questions'][a['question_index']]['topic'] == topic]
+        tally = stats['by_topic'][topic]
+        assert tally['answers'] == len(picked)
+        assert abs(tally['accuracy_percentage'] - sum(a['is_correct'] for a in picked) / len(picked) * 100) < 1e-9
+    assert sum(t['answers'] for t in stats['by_difficulty'].values()) == len(answers)
+    trend = [sum(scores[i - 2:i + 1]) / 3 for i in range(2, len(scores))]
+    assert manager.get_performance_trend() == trend
+    frame = manager.get_detailed_results()
+    assert len(frame) == len(answers) and list(frame['Question'])[-1] == f"Q{len(answers)}"
+    assert frame['Question Text'][0].endswith("...")
+
+def test_running_aggregates_match_a_rescan():
+    print("🧪 Testing running aggregates")
+    original = quiz_manager_module.st
+    quiz_manager_module.st = FakeStreamlit()
+    try:
+        manager = QuizManager()
+        run_quiz(manager, make_questions(40))
+        check_against_rescan(manager)
+        # A new quiz starts from empty aggregates
+        run_quiz(manager, make_questions(5, seed=1), seed=1)
+        check_against_rescan(manager)
+    finally:
+        quiz_manager_module.st = original
+    print("✅ Counts, sums, variances and tallies match a full rescan")
+
+def test_sessions_without_aggregates_are_rebuilt():
+    print("🧪 Testing sessions created before the aggregates")
+    original = quiz_manager_module.st
+    quiz_manager_module.st = FakeStreamlit()
+    try:
+        manager = QuizManager()
+        run_quiz(manager, make_questions(9))
+        del quiz_manager_module.st.session_state.quiz_session['stats']
+        check_against_rescan(manager)
+        assert manager.get_session_stats()['by_topic']['Algebra']['answers'] == 3
+        manager.reset_session()
+        assert manager.get_session_stats() == {'no_data': True}
+    finally:
+        quiz_manager_module.st = original
+    print("✅ Missing aggregates are rebuilt once from the answers")
+
+if __name__ == "__main__":
+    test_running_aggregates_match_a_rescan()
+    test_sessions_without_aggregates_are_rebuilt()
+    print("🎉 All session statistics tests passed!")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the pluggable speech-to-text backends
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import wave
+import numpy as np
+sys.path.append('.')
+
+import stt_backends
+from stt_backends import (
+    SpeechNotRecognized, VoskBackend, create_stt_backend, list_stt_backends, read_wav_pcm
+)
+
+def make_wav(samples, channels=1, width=2, rate=16000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+class FakeModel:
+    loads = 0
+
+    def __init__(self, path):
+        FakeModel.loads += 1
+
+class FakeRecognizer:
+    def __init__(self, model, rate):
+        self.received = 0
+
+    def AcceptWaveform(self, data):
+        self.received += len(data)
+
+    def FinalResult(self):
+        return json.dumps({'text': 'option b' if self.received else ''})
+
+def test_registry():
+    assert set(list_stt_backends()) >= {'google', 'vosk'}
+    assert isinstance(create_stt_backend('vosk'), VoskBackend)
+    try:
+        create_stt_backend('missing')
+        assert False, "unknown backend should raise"
+    except ValueError:
+        pass
+
+def test_read_wav_pcm_downmixes_to_mono_16_bit():
+    print("🧪 Testing WAV decoding")
+    stereo = np.array([[1000, 3000], [-2000, -4000]], dtype='<i2')
+    pcm, rate = read_wav_pcm(make_wav(stereo, channels=2, rate=8000))
+    assert rate == 8000
+    assert np.frombuffer(pcm, dtype='<i2').tolist() == [2000, -3000]
+
+    eight_bit = np.array([128, 255, 0], dtype=np.uint8)
+    pcm, _ = read_wav_pcm(make_wav(eight_bit, width=1))
+    assert np.frombuffer(pcm, dtype='<i2').tolist() == [0, 127 << 8, -128 << 8]
+    print("✅ Stereo and 8-bit WAV are converted for the recognizer")
+
+def test_vosk_model_loaded_once_per_process():
+    print("🧪 Testing Vosk backend")
+    saved = (stt_backends.VOSK_AVAILABLE, stt_backends.Model,
+             stt_backends.KaldiRecognizer, stt_backends.SetLogLevel)
+    stt_backends.VOSK_AVAILABLE = True
+    stt_backends.Model = FakeModel
+    stt_backends.KaldiRecognizer = FakeRecognizer
+    stt_backends.SetLogLevel = lambda level: None
+    try:
+        with tempfile.TemporaryDirectory() as model_dir:
+            first, second = VoskBackend(model_dir), VoskBackend(model_dir)
+            assert first.is_available()
+            speech = make_wav(np.zeros(16000, dtype='<i2'))
+            assert first.transcribe(speech, 'en-US') == 'option b'
+            assert second.transcribe(speech, 'en-US') == 'option b'
+            assert FakeModel.loads == 1
+
+            try:
+                first.transcribe(make_wav(np.zeros(0, dtype='<i2')), 'en-US')
+                assert False, "empty audio should not be recognized"
+            except SpeechNotRecognized:
+                pass
+        assert not VoskBackend(os.path.join(model_dir, 'missing')).is_available()
+    finally:
+        (stt_backends.VOSK_AVAILABLE, stt_backends.Model,
+         stt_backends.KaldiRecognizer, stt_backends.SetLogLevel) = saved
+        stt_backends._vosk_models.clear()
+    print("✅ The Vosk model is shared by every recognizer")
+
+if __name__ == "__main__":
+    test_registry()
+    test_read_wav_pcm_downmixes_to_mono_16_bit()
+    test_vosk_model_loaded_once_per_process()
+    print("🎉 All STT backend tests passed!")
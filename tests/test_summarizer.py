@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test hierarchical summarization of long documents
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append('.')
+
+from summarizer import HierarchicalSummarizer, extractive_summary, textrank
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', 'sample_documents',
+                           'machine_learning_basics.txt')
+
+def load_sample() -> str:
+    with open(SAMPLE_PATH, encoding='utf-8') as f:
+        return f.read()
+
+def test_textrank_prefers_central_sentences():
+    """A sentence sharing terms with the others outranks an unrelated one"""
+    scores = textrank([
+        "Neural networks learn weights from training data.",
+        "Training data teaches neural networks their weights.",
+        "Bananas are yellow fruit.",
+        "Neural networks need lots of training data."
+    ])
+    assert scores.argmin() == 2
+
+def test_extractive_summary_keeps_order():
+    summary = extractive_summary(load_sample(), max_sentences=3)
+    assert 0 < len(summary) < 1000
+
+def test_long_document_is_reduced_hierarchically():
+    """A long document is reduced over several levels into a bounded outline"""
+    print("🧪 Testing hierarchical summarization")
+    content = '\n'.join([load_sample()] * 40)
+    summarizer = HierarchicalSummarizer(chunk_chars=2000, max_outline_chars=1200)
+    result = summarizer.summarize(content)
+
+    print(f"Levels: {[len(level) for level in result['levels']]}")
+    assert len(result['levels']) >= 2
+    assert len(result['levels'][0]) == len(result['chunks'])
+    assert 0 < len(result['outline']) <= 1200
+    assert summarizer.summarize(content) is result
+
+def test_context_fits_budget_and_targets_topic():
+    content = '\n'.join([load_sample()] * 40)
+    context = HierarchicalSummarizer().build_context(content, topic="reinforcement learning",
+                                                     budget_chars=3000)
+    assert len(context) <= 3000
+    assert "Selected passages:" in context
+    assert "einforcement" in context.split("Selected passages:")[1]
+
+def test_disk_cache_is_reused():
+    """Chunk summaries are cached on disk by content hash"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        HierarchicalSummarizer(cache_dir=cache_dir).summarize(load_sample())
+        cached = os.listdir(cache_dir)
+        assert cached
+
+        fresh = HierarchicalSummarizer(cache_dir=cache_dir)
+        fresh._summarize = lambda text: (_ for _ in ()).throw(AssertionError("cache miss"))
+        fresh.summarize(load_sample())
+
+if __name__ == "__main__":
+    test_textrank_prefers_central_sentences()
+    test_extractive_summary_keeps_order()
+    test_long_document_is_reduced_hierarchically()
+    test_context_fits_budget_and_targets_topic()
+    test_disk_cache_is_reused()
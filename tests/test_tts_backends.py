@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test the pluggable text-to-speech backends
+"""
+
+import io
+import sys
+import wave
+sys.path.append('.')
+
+from audio_segments import concat_clips
+from tts_backends import EspeakBackend, SilentBackend, create_tts_backend, list_tts_backends
+
+def wav_duration(data):
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        return wav.getnframes() / wav.getframerate()
+
+def test_registry():
+    print("🧪 Testing TTS backend registry")
+    assert set(list_tts_backends()) >= {'gtts', 'espeak', 'silent'}
+    assert isinstance(create_tts_backend('silent'), SilentBackend)
+    try:
+        create_tts_backend('missing')
+        assert False, "unknown backend should raise"
+    except ValueError:
+        pass
+    print("✅ Backends are created by name")
+
+def test_silent_backend_produces_wav():
+    backend = SilentBackend(sample_rate=8000, ms_per_char=50)
+    clip = backend.synthesize("Hello there", "en")
+    assert clip[:4] == b'RIFF' and backend.mime == 'audio/wav'
+    assert abs(wav_duration(clip) - 0.55) < 0.01
+    assert wav_duration(backend.synthesize("Hello there", "en", slow=True)) > 0.8
+
+    joined = concat_clips([clip, backend.synthesize("Hi", "en")], backend.mime)
+    assert abs(wav_duration(joined) - 0.65) < 0.01
+
+def test_espeak_without_executable():
+    backend = EspeakBackend(executable=None)
+    backend.executable = None
+    assert not backend.is_available()
+    assert backend.cache_settings()['engine'] == 'espeak'
+
+if __name__ == "__main__":
+    test_registry()
+    test_silent_backend_produces_wav()
+    test_espeak_without_executable()
+    print("🎉 All TTS backend tests passed!")
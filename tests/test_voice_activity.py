@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test streaming voice capture: ring buffer, VAD endpointing and early commit
+"""
+
+import sys
+import numpy as np
+sys.path.append('.')
+
+from stt_backends import STTBackend, SpeechNotRecognized
+from tts_backends import SilentBackend
+from voice_activity import (
+    ENDED, SPEECH, PCMRingBuffer, UtteranceCapture, VoiceActivityDetector, capture_utterance
+)
+from voice_handler import VoiceHandler
+
+RATE = 16000
+
+def tone(seconds, amplitude=8000, freq=220):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype('<i2')
+
+def noise(seconds, amplitude=30):
+    return np.random.default_rng(0).integers(-amplitude, amplitude, int(seconds * RATE)).astype('<i2')
+
+def chunks(samples, size=1600):
+    return [samples[i:i + size].tobytes() for i in range(0, len(samples), size)]
+
+class ScriptedSession:
+    """Streaming session that reveals a transcript word by word"""
+
+    def __init__(self, words, final=None, confidence=0.9):
+        self.words = words
+        self.final = final
+        self.confidence = confidence
+        self.accepted = 0
+
+    def accept(self, pcm):
+        self.accepted += len(pcm) // 2
+        count = self.accepted // 3200
+        return ' '.join(self.words[:count])
+
+    def finish(self):
+        transcript = self.final or self.accept(b"")
+        if not transcript:
+            raise SpeechNotRecognized()
+        return transcript, self.confidence
+
+class StreamingBackend(STTBackend):
+    name = "streaming"
+
+    def __init__(self, words, final=None, confidence=0.9):
+        self.words = words
+        self.final = final
+        self.confidence = confidence
+
+    def stream(self, rate, language, phrases=None):
+        return ScriptedSession(self.words, self.final, self.confidence)
+
+class QuietVoiceHandler(VoiceHandler):
+    def _check_dependencies(self):
+        pass
+
+def test_ring_buffer_wraps_without_growing():
+    print("🧪 Testing PCM ring buffer")
+    ring = PCMRingBuffer(5)
+    ring.write(np.array([1, 2, 3], dtype='<i2'))
+    ring.write(np.array([4, 5, 6, 7], dtype='<i2'))
+    assert len(ring) == 5 and ring.total_written == 7
+    assert ring.latest(5).tolist() == [3, 4, 5, 6, 7]
+    assert ring.latest(2).tolist() == [6, 7]
+    ring.write(np.arange(10, 22, dtype='<i2'))
+    assert ring.latest(10).tolist() == [17, 18, 19, 20, 21]
+    print("✅ Oldest samples are overwritten in place")
+
+def test_vad_ends_utterance_on_trailing_silence():
+    print("🧪 Testing voice activity detection")
+    vad = VoiceActivityDetector(RATE, end_silence_ms=300)
+    assert vad.process(noise(0.5)) != SPEECH
+    assert vad.process(tone(0.4)) == SPEECH
+    assert vad.process(noise(0.2)) == SPEECH
+    assert vad.process(noise(0.2)) == ENDED
+    start = vad.sample_of_frame(vad.speech_start_frame) / RATE
+    end = vad.sample_of_frame(vad.speech_end_frame) / RATE
+    assert abs(start - 0.5) < 0.1 and abs(end - 0.9) < 0.1
+
+    hiss = VoiceActivityDetector(RATE)
+    noisy = np.random.default_rng(1).integers(-3000, 3000, RATE).astype('<i2')
+    assert hiss.process(np.concatenate((noise(0.3, amplitude=2000), noisy))) != ENDED
+    print("✅ Speech is bracketed and the utterance ends after trailing silence")
+
+def test_capture_commits_early_on_stable_partials():
+    print("🧪 Testing early commit")
+    session = ScriptedSession(["um", "option", "b", "because"])
+
+    def commit(text):
+        return 'B' if text.endswith('b') or 'b ' in text else None
+
+    capture = UtteranceCapture(RATE, session, commit=commit, stable_partials=2)
+    audio = np.concatenate((noise(0.3), tone(3.0), noise(1.0)))
+    outcome = capture_utterance(chunks(audio), capture)
+    assert outcome['reason'] == "committed" and outcome['answer'] == 'B'
+    assert outcome['audio_seconds'] < 3.0
+    assert len(capture.utterance()) > 0
+    print(f"✅ Answer committed after {outcome['audio_seconds']:.1f} s of a 4.3 s stream")
+
+def test_capture_endpoints_and_times_out():
+    print("🧪 Testing endpointing")
+    capture = UtteranceCapture(RATE, ScriptedSession([]), commit=lambda text: None,
+                               vad=VoiceActivityDetector(RATE, end_silence_ms=300))
+    outcome = capture_utterance(chunks(np.concatenate((noise(0.3), tone(0.5), noise(2.0)))), capture)
+    assert outcome['reason'] == "endpoint" and outcome['audio_seconds'] < 1.5
+    # The utterance keeps the pre-roll before speech onset
+    assert len(capture.utterance()) >= int(0.5 * RATE)
+
+    waiting = UtteranceCapture(RATE, wait_seconds=1.0)
+    assert capture_utterance(chunks(noise(3.0)), waiting)['reason'] == "timeout"
+    print("✅ Captures end on trailing silence or when nobody speaks")
+
+def test_voice_handler_stream_answer():
+    print("🧪 Testing VoiceHandler.stream_answer")
+    audio = np.concatenate((noise(0.3), tone(3.0), noise(1.0)))
+    handler = QuietVoiceHandler(tts_backend=SilentBackend(),
+                                stt_backend=StreamingBackend(["alpha", "alpha", "alpha"]))
+    result = handler.stream_answer(chunks(audio), RATE)
+    assert result['answer'] == 'A' and result['reason'] == "committed" and not result['reprompt']
+    assert result['confidence'] == 0.9
+
+    # A committed answer the recognizer is unsure of is asked again
+    handler.stt_backend = StreamingBackend(["alpha", "alpha", "alpha"], confidence=0.3)
+    result = handler.stream_answer(chunks(audio), RATE)
+    assert result['answer'] == 'A' and result['reason'] == "committed"
+    assert result['confidence'] == 0.3 and result['reprompt']
+
+    handler.stt_backend = StreamingBackend([], final="the third one")
+    short = np.concatenate((noise(0.3), tone(0.5), noise(1.0)))
+    result = handler.stream_answer(chunks(short), RATE)
+    assert result['answer'] == 'C' and result['reason'] == "endpoint"
+    print("✅ Answers are committed early or recognized at the endpoint")
+
+if __name__ == "__main__":
+    test_ring_buffer_wraps_without_growing()
+    test_vad_ends_utterance_on_trailing_silence()
+    test_capture_commits_early_on_stable_partials()
+    test_capture_endpoints_and_times_out()
+    test_voice_handler_stream_answer()
+    print("🎉 All voice activity tests passed!")
@@ -0,0 +1,131 @@
+import io
+import shutil
+import subprocess
+import wave
+from typing import Dict, List, Optional
+from capabilities import load_optional, module_available
+from config import Config
+
+# gTTS (and the requests stack behind it) is imported on first synthesis
+GTTS_AVAILABLE = module_available('gtts')
+
+
+class TTSBackend:
+    """Base class for text-to-speech backends
+
+    A backend turns one piece of text into a complete audio clip. Clips of the
+    same backend share a format, so VoiceHandler can cache, join and serve
+    them without knowing which engine produced them.
+    """
+
+    name = "base"
+    label = "TTS backend"
+    mime = "audio/mpeg"
+    suffix = ".mp3"
+
+    def is_available(self) -> bool:
+        """Return True if the backend can synthesize speech"""
+        return True
+
+    def synthesize(self, text: str, language: str, slow: bool = False) -> bytes:
+        """Return a complete audio clip for the text"""
+        raise NotImplementedError
+
+    def cache_settings(self) -> Dict:
+        """Engine settings that change the audio, included in cache keys"""
+        return {'engine': self.name}
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS (needs network access; MP3 output)"""
+
+    name = "gtts"
+    label = "Google TTS"
+
+    def is_available(self) -> bool:
+        return GTTS_AVAILABLE
+
+    def synthesize(self, text: str, language: str, slow: bool = False) -> bytes:
+        gtts = load_optional('gtts')
+        if gtts is None:
+            raise RuntimeError("gTTS could not be imported")
+        tts = gtts.gTTS(text=text, lang=language, slow=slow)
+        buffer = io.BytesIO()
+        tts.write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """Offline synthesis with the espeak-ng (or espeak) command line tool (WAV output)"""
+
+    name = "espeak"
+    label = "eSpeak (offline)"
+    mime = "audio/wav"
+    suffix = ".wav"
+
+    def __init__(self, executable: Optional[str] = None, words_per_minute: Optional[int] = None,
+                 voice: Optional[str] = None):
+        self.executable = executable or shutil.which('espeak-ng') or shutil.which('espeak')
+        self.words_per_minute = words_per_minute or Config.ESPEAK_WORDS_PER_MINUTE
+        self.voice = voice or Config.ESPEAK_VOICE
+
+    def is_available(self) -> bool:
+        return self.executable is not None
+
+    def synthesize(self, text: str, language: str, slow: bool = False) -> bytes:
+        speed = self.words_per_minute * 2 // 3 if slow else self.words_per_minute
+        result = subprocess.run(
+            [self.executable, '--stdout', '-v', self.voice or language, '-s', str(speed)],
+            input=text.encode('utf-8'), capture_output=True, timeout=60, check=True
+        )
+        return result.stdout
+
+    def cache_settings(self) -> Dict:
+        return {'engine': self.name, 'wpm': self.words_per_minute, 'voice': self.voice}
+
+
+class SilentBackend(TTSBackend):
+    """Returns silent WAV clips sized like speech, for tests and offline development"""
+
+    name = "silent"
+    label = "Silent (testing)"
+    mime = "audio/wav"
+    suffix = ".wav"
+
+    def __init__(self, sample_rate: int = 16000, ms_per_char: int = 60):
+        self.sample_rate = sample_rate
+        self.ms_per_char = ms_per_char
+
+    def synthesize(self, text: str, language: str, slow: bool = False) -> bytes:
+        duration_ms = max(len(text), 1) * self.ms_per_char * (1.5 if slow else 1.0)
+        frames = int(self.sample_rate * duration_ms / 1000)
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(bytes(frames * 2))
+        return buffer.getvalue()
+
+    def cache_settings(self) -> Dict:
+        return {'engine': self.name, 'rate': self.sample_rate, 'ms_per_char': self.ms_per_char}
+
+
+TTS_BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    EspeakBackend.name: EspeakBackend,
+    SilentBackend.name: SilentBackend,
+}
+
+
+def create_tts_backend(name: Optional[str] = None) -> TTSBackend:
+    """Create a TTS backend by name (defaults to Config.TTS_BACKEND)"""
+    name = (name or Config.TTS_BACKEND).lower()
+    if name not in TTS_BACKENDS:
+        raise ValueError(f"Unknown TTS backend '{name}'. Choose from: {', '.join(TTS_BACKENDS)}")
+    return TTS_BACKENDS[name]()
+
+
+def list_tts_backends() -> List[str]:
+    """Return the names of all registered TTS backends"""
+    return list(TTS_BACKENDS)
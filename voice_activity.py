@@ -0,0 +1,257 @@
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import numpy as np
+
+SILENCE = "silence"
+SPEECH = "speech"
+ENDED = "ended"
+
+
+class PCMRingBuffer:
+    """Fixed-capacity ring buffer of 16-bit samples
+
+    Writing never allocates: once full, the oldest samples are overwritten,
+    so a capture can wait for speech indefinitely in constant memory.
+    """
+
+    def __init__(self, capacity: int):
+        self._data = np.zeros(max(1, capacity), dtype=np.int16)
+        self._end = 0
+        self._size = 0
+        self.total_written = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def write(self, samples: np.ndarray):
+        """Append samples, overwriting the oldest ones when full"""
+        samples = samples[-self.capacity:]
+        count = len(samples)
+        first = min(count, self.capacity - self._end)
+        self._data[self._end:self._end + first] = samples[:first]
+        self._data[:count - first] = samples[first:]
+        self._end = (self._end + count) % self.capacity
+        self._size = min(self.capacity, self._size + count)
+        self.total_written += count
+
+    def latest(self, count: int) -> np.ndarray:
+        """Return a copy of the newest count samples, oldest first"""
+        count = min(count, self._size)
+        start = (self._end - count) % self.capacity
+        if start + count <= self.capacity:
+            return self._data[start:start + count].copy()
+        return np.concatenate((self._data[start:], self._data[:self._end]))
+
+    def clear(self):
+        self._end = 0
+        self._size = 0
+
+
+def frame_features(frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return per-frame energy (dBFS) and zero-crossing rate for an (n, frame_len) array"""
+    samples = frames.astype(np.float32) / 32768.0
+    rms = np.sqrt(np.mean(samples * samples, axis=1))
+    energy_db = 20.0 * np.log10(np.maximum(rms, 1e-6))
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return energy_db, zcr
+
+
+class VoiceActivityDetector:
+    """Frame-level energy / zero-crossing voice activity detector
+
+    A frame is voiced when its energy is well above the adaptive noise floor
+    and its zero-crossing rate is below that of hiss; very loud frames count
+    regardless, which keeps fricatives like "s" and "f". Speech starts after
+    a few consecutive voiced frames and ends after end_silence_ms of unvoiced
+    frames, at which point the state becomes ENDED.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 20,
+                 end_silence_ms: int = 500, start_ms: int = 60,
+                 energy_margin_db: float = 12.0, min_energy_db: float = -50.0,
+                 max_zcr: float = 0.35, noise_adaptation: float = 0.05,
+                 noise_floor_db: Optional[float] = None):
+        self.sample_rate = sample_rate
+        self.frame_len = max(1, sample_rate * frame_ms // 1000)
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.energy_margin_db = energy_margin_db
+        self.min_energy_db = min_energy_db
+        self.max_zcr = max_zcr
+        self.noise_adaptation = noise_adaptation
+        # A calibrated floor; without one the first frame seeds it
+        self.initial_noise_floor_db = noise_floor_db
+        self.reset()
+
+    def reset(self):
+        self.state = SILENCE
+        self.noise_floor_db: Optional[float] = self.initial_noise_floor_db
+        self.speech_start_frame: Optional[int] = None
+        self.speech_end_frame: Optional[int] = None
+        self.frames_seen = 0
+        self._run = 0
+        self._pending = np.zeros(0, dtype=np.int16)
+
+    def process(self, samples: np.ndarray) -> str:
+        """Consume samples and return the detector state afterwards"""
+        if self.state == ENDED:
+            return self.state
+        samples = np.concatenate((self._pending, samples)) if len(self._pending) else samples
+        usable = len(samples) - len(samples) % self.frame_len
+        self._pending = samples[usable:].copy()
+        if not usable:
+            return self.state
+
+        energy_db, zcr = frame_features(samples[:usable].reshape(-1, self.frame_len))
+        for energy, crossings in zip(energy_db.tolist(), zcr.tolist()):
+            self._step(energy, crossings)
+            if self.state == ENDED:
+                break
+        return self.state
+
+    def _step(self, energy: float, zcr: float):
+        if self.noise_floor_db is None:
+            self.noise_floor_db = energy
+        threshold = max(self.noise_floor_db + self.energy_margin_db, self.min_energy_db)
+        voiced = energy > threshold and (zcr < self.max_zcr or energy > threshold + 10)
+
+        if self.state == SILENCE:
+            if not voiced:
+                self.noise_floor_db += self.noise_adaptation * (energy - self.noise_floor_db)
+            self._run = self._run + 1 if voiced else 0
+            if self._run >= self.start_frames:
+                self.state = SPEECH
+                self.speech_start_frame = self.frames_seen + 1 - self._run
+                self._run = 0
+        elif self.state == SPEECH:
+            self._run = 0 if voiced else self._run + 1
+            if self._run >= self.end_frames:
+                self.state = ENDED
+                self.speech_end_frame = self.frames_seen + 1 - self._run
+        self.frames_seen += 1
+
+    def sample_of_frame(self, frame: int) -> int:
+        return frame * self.frame_len
+
+
+class UtteranceCapture:
+    """Capture one spoken answer from a stream of PCM chunks
+
+    Chunks go into a ring buffer and through the VAD. Once speech starts, the
+    pre-roll and every following chunk are fed to the recognizer session (if
+    any), whose partial transcripts are offered to commit(); when commit
+    returns the same answer for stable_partials partials in a row the capture
+    finishes early. Otherwise it ends on trailing silence, after
+    max_speech_seconds of speech, or after wait_seconds without speech.
+    """
+
+    def __init__(self, sample_rate: int = 16000, session=None,
+                 commit: Optional[Callable[[str], Optional[str]]] = None,
+                 vad: Optional[VoiceActivityDetector] = None,
+                 wait_seconds: float = 10.0, max_speech_seconds: float = 5.0,
+                 pre_roll_ms: int = 300, stable_partials: int = 2):
+        self.sample_rate = sample_rate
+        self.session = session
+        self.commit = commit
+        self.vad = vad or VoiceActivityDetector(sample_rate)
+        self.wait_samples = int(wait_seconds * sample_rate)
+        self.max_speech_samples = int(max_speech_seconds * sample_rate)
+        self.pre_roll = sample_rate * pre_roll_ms // 1000
+        self.stable_partials = stable_partials
+        self.buffer = PCMRingBuffer(self.pre_roll + self.max_speech_samples + self.vad.frame_len)
+        self.answer: Optional[str] = None
+        self.partial = ""
+        self.reason: Optional[str] = None
+        self._utterance_start: Optional[int] = None
+        self._fed = 0
+        self._streak = 0
+
+    @property
+    def done(self) -> bool:
+        return self.reason is not None
+
+    def feed(self, pcm: bytes) -> bool:
+        """Consume a chunk of 16-bit mono PCM; return True once the capture is finished"""
+        if self.done:
+            return True
+        samples = np.frombuffer(pcm, dtype='<i2')
+        self.buffer.write(samples)
+        state = self.vad.process(samples)
+
+        if self._utterance_start is None:
+            if state == SILENCE:
+                if self.buffer.total_written >= self.wait_samples:
+                    self.reason = "timeout"
+                return self.done
+            speech_start = self.vad.sample_of_frame(self.vad.speech_start_frame)
+            self._utterance_start = max(0, speech_start - self.pre_roll,
+                                        self.buffer.total_written - len(self.buffer))
+            self._fed = self._utterance_start
+
+        self._feed_session()
+        if self.done:
+            return True
+        if state == ENDED:
+            self.reason = "endpoint"
+        elif self.buffer.total_written - self._utterance_start >= self.max_speech_samples:
+            self.reason = "max_length"
+        return self.done
+
+    def _feed_session(self):
+        if self.session is None:
+            return
+        new = self.buffer.total_written - self._fed
+        self._fed = self.buffer.total_written
+        partial = self.session.accept(self.buffer.latest(new).tobytes())
+        if not partial or partial == self.partial or self.commit is None:
+            return
+        self.partial = partial
+        answer = self.commit(partial)
+        if answer is not None and answer == self.answer:
+            self._streak += 1
+        else:
+            self.answer = answer
+            self._streak = 1 if answer is not None else 0
+        if self._streak >= self.stable_partials:
+            self.reason = "committed"
+
+    def leading_silence(self) -> bytes:
+        """Return the buffered audio before speech started (all of it if none did)"""
+        oldest = self.buffer.total_written - len(self.buffer)
+        if self.vad.speech_start_frame is None:
+            end = self.buffer.total_written
+        else:
+            end = self.vad.sample_of_frame(self.vad.speech_start_frame)
+        if end <= oldest:
+            return b""
+        return self.buffer.latest(self.buffer.total_written - oldest)[:end - oldest].tobytes()
+
+    def utterance(self) -> bytes:
+        """Return the captured utterance (pre-roll included) as 16-bit PCM"""
+        if self._utterance_start is None:
+            return b""
+        return self.buffer.latest(self.buffer.total_written - self._utterance_start).tobytes()
+
+
+def capture_utterance(chunks: Iterable[bytes], capture: UtteranceCapture) -> Dict:
+    """Run a capture over a chunk stream and describe how it ended"""
+    start = time.perf_counter()
+    consumed = 0
+    for chunk in chunks:
+        consumed += len(chunk) // 2
+        if capture.feed(chunk):
+            break
+    if not capture.done:
+        capture.reason = "stream_end"
+    return {
+        'reason': capture.reason,
+        'answer': capture.answer if capture.reason == "committed" else None,
+        'partial': capture.partial,
+        'audio_seconds': consumed / capture.sample_rate,
+        'processing_seconds': time.perf_counter() - start,
+    }
@@ -1,72 +1,201 @@
-import tempfile
 import os
 import streamlit as st
-import io
 import base64
-from typing import Optional
+import inspect
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from config import Config
+from answer_grammar import build_answer_grammar, grammar_phrases, match_answer
+from answer_matcher import get_answer_matcher
+from audio_ingest import AudioIngestor, IngestedAudio, UnsupportedAudioFormat, get_shared_audio_ingestor
+from audio_cache import AudioCache, audio_cache_key, get_shared_audio_cache
+from audio_duration import DurationIndex, get_shared_duration_index
+from audio_prerender import AudioPrerenderer
+from audio_profiles import AudioTranscoder
+from audio_segments import concat_clips, speech_segments
+from audio_server import get_shared_audio_server
+from feedback_audio import FeedbackAudioComposer
+from noise_calibration import CalibrationCache, NoiseProfile, get_shared_calibration_cache
+from quiz_bundle import QuizBundle
+from voice_activity import UtteranceCapture, VoiceActivityDetector, capture_utterance
+from scratch_space import ScratchSpace, get_shared_scratch_space
+from capabilities import load_optional, module_available
+from tts_backends import GTTS_AVAILABLE, GTTSBackend, TTSBackend, create_tts_backend
+from stt_backends import (
+    GoogleSTTBackend, RecognitionServiceError, SpeechNotRecognized, STTBackend, create_stt_backend, pcm_to_wav
+)
 
-# Optional imports with graceful fallbacks
-try:
-    import speech_recognition as sr
-    SPEECH_RECOGNITION_AVAILABLE = True
-except ImportError:
-    SPEECH_RECOGNITION_AVAILABLE = False
-    sr = None
-
-try:
-    from gtts import gTTS
-    GTTS_AVAILABLE = True
-except ImportError:
-    GTTS_AVAILABLE = False
-    gTTS = None
-
-try:
-    import pydub
-    PYDUB_AVAILABLE = True
-except ImportError:
-    PYDUB_AVAILABLE = False
-    pydub = None
+# Optional dependencies are only probed here; they are imported on first use
+SPEECH_RECOGNITION_AVAILABLE = module_available('speech_recognition')
+PYDUB_AVAILABLE = module_available('pydub')
+PYAUDIO_AVAILABLE = module_available('pyaudio')
 
 try:
-    import pyaudio
-    PYAUDIO_AVAILABLE = True
-except ImportError:
-    PYAUDIO_AVAILABLE = False
-    pyaudio = None
+    # st.audio gained autoplay in newer Streamlit releases
+    ST_AUDIO_AUTOPLAY = 'autoplay' in inspect.signature(st.audio).parameters
+except (AttributeError, TypeError, ValueError):
+    ST_AUDIO_AUTOPLAY = False
 
 class VoiceHandler:
-    """Handles speech recognition and text-to-speech functionality"""
+    """Handles speech recognition and text-to-speech functionality
 
-    def __init__(self):
+    Construction is cheap: engines, the microphone, scratch space, the
+    decode pool and the transcoder are created on first use, so a server
+    running with voice mode off never imports or opens them.
+    """
+
+    def __init__(self, audio_cache: Optional[AudioCache] = None,
+                 tts_backend: Optional[TTSBackend] = None,
+                 stt_backend: Optional[STTBackend] = None,
+                 scratch_space: Optional[ScratchSpace] = None,
+                 audio_ingestor: Optional[AudioIngestor] = None,
+                 calibration_cache: Optional[CalibrationCache] = None,
+                 duration_index: Optional[DurationIndex] = None):
         self.tts_language = Config.TTS_LANGUAGE
         self.recognition_language = Config.SPEECH_RECOGNITION_LANGUAGE
+        self.tts_slow = False
+        self._lock = threading.RLock()
+        self._tts_backend = tts_backend
+        self._stt_backend = stt_backend
+        self._scratch = scratch_space
+        self._ingestor = audio_ingestor
+        self._calibration = calibration_cache
+        self._transcoder = None
+        self._durations = duration_index
+        self._recognizer = None
+        self._microphone = None
+        self._microphone_probed = False
+        self.audio_cache = audio_cache or get_shared_audio_cache()
+        self.prerenderer = AudioPrerenderer(self._render_clip, max_workers=Config.TTS_PRERENDER_WORKERS)
+        self._segment_pool = None
+        self.feedback_composer = FeedbackAudioComposer(self._segment_audio, self.get_ready_audio,
+                                                       concat=self._concat_clips)
 
-        # Initialize speech recognition if available
-        if SPEECH_RECOGNITION_AVAILABLE:
-            self.recognizer = sr.Recognizer()
-            if PYAUDIO_AVAILABLE:
-                try:
-                    self.microphone = sr.Microphone()
-                except Exception as e:
-                    st.warning(f"Microphone initialization failed: {e}")
-                    self.microphone = None
-            else:
-                self.microphone = None
-        else:
-            self.recognizer = None
-            self.microphone = None
+    def _lazy(self, attr: str, factory):
+        """Return an attribute, creating it on first access (once, even across threads)"""
+        value = getattr(self, attr)
+        if value is None:
+            with self._lock:
+                value = getattr(self, attr)
+                if value is None:
+                    value = factory()
+                    setattr(self, attr, value)
+        return value
+
+    def _create_tts_backend(self) -> TTSBackend:
+        try:
+            return create_tts_backend()
+        except ValueError as e:
+            st.error(f"{str(e)}. Falling back to Google TTS.")
+            return GTTSBackend()
+
+    def _create_stt_backend(self) -> STTBackend:
+        try:
+            backend = create_stt_backend()
+        except ValueError as e:
+            st.error(f"{str(e)}. Falling back to Google Speech Recognition.")
+            backend = GoogleSTTBackend()
+        # Offline models load in the background so the first answer is not delayed
+        threading.Thread(target=backend.warm_up, name="stt-warm-up", daemon=True).start()
+        return backend
+
+    @property
+    def tts_backend(self) -> TTSBackend:
+        return self._lazy('_tts_backend', self._create_tts_backend)
+
+    @tts_backend.setter
+    def tts_backend(self, backend: TTSBackend):
+        self._tts_backend = backend
+
+    @property
+    def stt_backend(self) -> STTBackend:
+        return self._lazy('_stt_backend', self._create_stt_backend)
+
+    @stt_backend.setter
+    def stt_backend(self, backend: STTBackend):
+        self._stt_backend = backend
+
+    @property
+    def scratch(self) -> ScratchSpace:
+        return self._lazy('_scratch', get_shared_scratch_space)
+
+    @property
+    def ingestor(self) -> AudioIngestor:
+        return self._lazy('_ingestor', get_shared_audio_ingestor)
+
+    @property
+    def calibration(self) -> CalibrationCache:
+        return self._lazy('_calibration', get_shared_calibration_cache)
 
-        # Check dependencies and show status
+    @property
+    def durations(self) -> DurationIndex:
+        return self._lazy('_durations', get_shared_duration_index)
+
+    @property
+    def transcoder(self) -> AudioTranscoder:
+        return self._lazy('_transcoder', AudioTranscoder)
+
+    @property
+    def recognizer(self):
+        """speech_recognition's Recognizer, imported on first use (None if unavailable)"""
+        def create():
+            sr = load_optional('speech_recognition') if SPEECH_RECOGNITION_AVAILABLE else None
+            return sr.Recognizer() if sr is not None else None
+        return self._lazy('_recognizer', create)
+
+    @property
+    def segment_pool(self) -> ThreadPoolExecutor:
+        """Worker pool that renders the segments of chunked speech"""
+        return self._lazy('_segment_pool', lambda: ThreadPoolExecutor(
+            max_workers=Config.TTS_SEGMENT_WORKERS, thread_name_prefix="tts-segment"
+        ))
+
+    @property
+    def microphone(self):
+        """The default microphone, opened on first use; the outcome is cached"""
+        with self._lock:
+            if not self._microphone_probed:
+                self._microphone_probed = True
+                sr = load_optional('speech_recognition') if SPEECH_RECOGNITION_AVAILABLE else None
+                if sr is not None and PYAUDIO_AVAILABLE:
+                    try:
+                        self._microphone = sr.Microphone()
+                    except Exception as e:
+                        st.warning(f"Microphone initialization failed: {e}")
+            return self._microphone
+
+    def voice_initialized(self) -> Dict[str, bool]:
+        """Report which voice subsystems have been created so far"""
+        return {
+            'tts_backend': self._tts_backend is not None,
+            'stt_backend': self._stt_backend is not None,
+            'recognizer': self._recognizer is not None,
+            'microphone': self._microphone_probed,
+            'scratch': self._scratch is not None,
+            'ingestor': self._ingestor is not None,
+            'calibration': self._calibration is not None,
+            'transcoder': self._transcoder is not None,
+            'segment_pool': self._segment_pool is not None,
+        }
+
+    def prepare_voice(self):
+        """Create the speech engines when voice mode is on and report missing dependencies
+
+        The first call starts loading the recognizer's model in the background,
+        ahead of the first spoken answer; later calls only re-report status
+        from the cached probes.
+        """
+        self._lazy('_stt_backend', self._create_stt_backend)
         self._check_dependencies()
-    
+
     def _check_dependencies(self):
         """Check and report dependency status"""
         missing_deps = []
 
         if not SPEECH_RECOGNITION_AVAILABLE:
             missing_deps.append("speech_recognition")
-        if not GTTS_AVAILABLE:
+        if isinstance(self.tts_backend, GTTSBackend) and not GTTS_AVAILABLE:
             missing_deps.append("gtts")
         if not PYAUDIO_AVAILABLE:
             missing_deps.append("pyaudio")
@@ -74,25 +203,241 @@ class VoiceHandler:
         if missing_deps:
             st.sidebar.warning(f"⚠️ Missing voice dependencies: {', '.join(missing_deps)}")
             st.sidebar.info("Install with: pip install " + " ".join(missing_deps))
+        if not isinstance(self.tts_backend, GTTSBackend) and not self.tts_backend.is_available():
+            st.sidebar.warning(f"⚠️ {self.tts_backend.label} is not available on this system")
+
+    def _tts_unavailable_message(self) -> str:
+        if isinstance(self.tts_backend, GTTSBackend):
+            return "Text-to-speech not available. Please install gtts: pip install gtts"
+        return f"Text-to-speech not available: {self.tts_backend.label} is not installed."
 
     def text_to_speech(self, text: str) -> Optional[str]:
-        """Convert text to speech and return audio file path"""
-        if not GTTS_AVAILABLE:
-            st.warning("Text-to-speech not available. Please install gtts: pip install gtts")
+        """Convert text to speech and return audio file path
+
+        Clips are served from the shared audio cache when the same text was
+        already synthesized with the same language and voice settings. A clip
+        that is still being pre-rendered is waited for instead of rendered twice.
+        """
+        key = self._tts_cache_key(text)
+        if self.prerenderer.is_pending(key):
+            self.prerenderer.wait(key, timeout=Config.TTS_PRERENDER_WAIT_SECONDS)
+        cached_path = self.audio_cache.get_path(key)
+        if cached_path:
+            return cached_path
+
+        if not self.tts_backend.is_available():
+            st.warning(self._tts_unavailable_message())
             return None
 
         try:
-            # Create TTS object
-            tts = gTTS(text=text, lang=self.tts_language, slow=False)
+            audio_bytes = self._synthesize(text)
 
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-                tts.save(tmp_file.name)
-                return tmp_file.name
+            cached_path = self.audio_cache.put(key, audio_bytes, suffix=self.tts_backend.suffix)
+            if cached_path:
+                return cached_path
+
+            # Use managed scratch space when the disk tier is disabled
+            return self.scratch.create(audio_bytes, suffix=self.tts_backend.suffix)
 
         except Exception as e:
             st.error(f"Error generating speech: {str(e)}")
             return None
+
+    def text_to_speech_bytes(self, text: str) -> Optional[bytes]:
+        """Convert text to speech and return the audio bytes without any temp file
+
+        The returned object is the one held by the audio cache, so no copy is
+        made; bytes are immutable and safe to share between sessions.
+        """
+        key = self._tts_cache_key(text)
+        if self.prerenderer.is_pending(key):
+            self.prerenderer.wait(key, timeout=Config.TTS_PRERENDER_WAIT_SECONDS)
+        audio_bytes = self.audio_cache.get(key)
+        if audio_bytes is not None:
+            return audio_bytes
+
+        if not self.tts_backend.is_available():
+            st.warning(self._tts_unavailable_message())
+            return None
+
+        try:
+            audio_bytes = self._synthesize(text)
+            self.audio_cache.put(key, audio_bytes, suffix=self.tts_backend.suffix)
+            return audio_bytes
+        except Exception as e:
+            st.error(f"Error generating speech: {str(e)}")
+            return None
+
+    def render_segments(self, text: str) -> List[Future]:
+        """Start rendering the sentence/option segments of a text concurrently
+
+        Returns one future per segment, in playback order, so the first segment
+        can be played while the rest are still rendering.
+        """
+        pool = self.segment_pool
+        return [pool.submit(self._segment_audio, segment)
+                for segment in speech_segments(text)]
+
+    def _segment_audio(self, text: str) -> bytes:
+        """Segment worker: cached clip bytes, synthesized on a miss (no Streamlit calls)"""
+        key = self._tts_cache_key(text)
+        if self.prerenderer.is_pending(key):
+            self.prerenderer.wait(key, timeout=Config.TTS_PRERENDER_WAIT_SECONDS)
+        audio_bytes = self.audio_cache.get(key)
+        if audio_bytes is None:
+            audio_bytes = self._synthesize(text)
+            self.audio_cache.put(key, audio_bytes, suffix=self.tts_backend.suffix)
+        return audio_bytes
+
+    def text_to_speech_chunked(self, text: str) -> Optional[bytes]:
+        """Convert text to speech by rendering its segments concurrently and joining them"""
+        key = self._tts_cache_key(text)
+        audio_bytes = self.audio_cache.get(key)
+        if audio_bytes is not None:
+            return audio_bytes
+
+        if not self.tts_backend.is_available():
+            st.warning(self._tts_unavailable_message())
+            return None
+
+        try:
+            audio_bytes = self._concat_clips([future.result() for future in self.render_segments(text)])
+            self.audio_cache.put(key, audio_bytes, suffix=self.tts_backend.suffix)
+            return audio_bytes
+        except Exception as e:
+            st.error(f"Error generating speech: {str(e)}")
+            return None
+
+    def stream_question_audio(self, question_data: dict) -> Optional[str]:
+        """Start progressive rendering of a question and return its stream URL
+
+        The audio server sends each segment as soon as it is rendered, so
+        playback starts after the first sentence. Returns None when the audio
+        server is not available.
+        """
+        server = get_shared_audio_server()
+        # Segments can only be streamed back to back in a frame-based format
+        if server is None or self.tts_backend.mime != 'audio/mpeg' or not self.tts_backend.is_available():
+            return None
+        text = self._question_text(question_data)
+        return server.publish_stream(self._tts_cache_key(text), self.render_segments(text))
+
+    def _synthesize(self, text: str) -> bytes:
+        """Render text to audio bytes with the TTS backend (raises on failure)"""
+        return self.tts_backend.synthesize(text, self.tts_language, self.tts_slow)
+
+    def _concat_clips(self, clips: list) -> bytes:
+        """Join clips of the TTS backend's format into one clip"""
+        return concat_clips(clips, self.tts_backend.mime)
+
+    def _render_clip(self, key: str, text: str):
+        """Pre-render worker: synthesize a clip into the cache (no Streamlit calls)"""
+        if self.audio_cache.contains(key):
+            return
+        if not self.tts_backend.is_available():
+            raise RuntimeError(f"{self.tts_backend.label} is not available")
+        self.audio_cache.put(key, self._synthesize(text), suffix=self.tts_backend.suffix)
+
+    def prerender_quiz(self, questions: list, current_index: int = 0, owner: str = "") -> int:
+        """Queue background rendering of question and feedback audio for a quiz
+
+        The current question renders first, then the following ones in order.
+        The shared feedback phrases and letters are queued right behind the
+        current question, and each question's explanation right behind the
+        question itself, so any feedback clip can be composed on submit.
+        Calling this again with a later index moves the upcoming question to
+        the front. Returns the number of clips queued.
+        """
+        queued = 0
+        for text, priority in self._quiz_clip_texts(questions, current_index):
+            key = self._tts_cache_key(text)
+            if self.audio_cache.contains(key):
+                continue
+            self.prerenderer.submit(key, text, priority, owner)
+            queued += 1
+        return queued
+
+    def _quiz_clip_texts(self, questions: list, current_index: int = 0) -> List[Tuple[str, float]]:
+        """Texts spoken in a quiz from current_index on, with their render priority"""
+        jobs = [(text, 0.25) for text in self.feedback_composer.fixed_segments()]
+        for distance, question in enumerate(questions[current_index:]):
+            try:
+                jobs.append((self._question_text(question), distance))
+                explanation = (question.get('explanation') or '').strip()
+                if explanation:
+                    jobs.append((explanation, distance + 0.5))
+            except (KeyError, TypeError, AttributeError):
+                continue
+        return jobs
+
+    def bundle_clips(self, questions: list) -> Dict[str, Tuple[bytes, str]]:
+        """Collect every clip of a quiz for a bundle, rendering those not cached yet (raises on failure)"""
+        clips = {}
+        for text, _ in self._quiz_clip_texts(questions):
+            key = self._tts_cache_key(text)
+            if key not in clips:
+                clips[key] = (self._segment_audio(text), self.tts_backend.suffix)
+        return clips
+
+    def bundle_metadata(self) -> dict:
+        """Voice settings the clips of a bundle were rendered with"""
+        return {'language': self.tts_language, 'slow': self.tts_slow,
+                'mime': self.tts_backend.mime, **self.tts_backend.cache_settings()}
+
+    def attach_bundle(self, bundle: QuizBundle) -> int:
+        """Serve a bundle's clips from the audio cache; return how many of the quiz's clips it covers
+
+        Clips are matched by cache key, so a bundle rendered with other
+        voice settings covers nothing and its audio is rendered again.
+        """
+        self.audio_cache.attach(bundle)
+        return sum(1 for text, _ in self._quiz_clip_texts(bundle.questions)
+                   if self._tts_cache_key(text) in bundle)
+
+    def detach_bundle(self, bundle: QuizBundle):
+        """Stop serving a bundle's clips"""
+        self.audio_cache.detach(bundle)
+
+    def cancel_prerender(self, owner: str) -> int:
+        """Cancel the queued clips of a quiz session that no other session needs"""
+        return self.prerenderer.cancel(owner)
+
+    def get_ready_audio(self, text: str) -> Optional[bytes]:
+        """Return the cached clip bytes for a text without rendering or waiting"""
+        key = self._tts_cache_key(text)
+        if not self.audio_cache.contains(key):
+            return None
+        return self.audio_cache.get(key)
+
+    def get_ready_question_audio(self, question_data: dict) -> Optional[bytes]:
+        """Return pre-rendered question audio if it is ready"""
+        try:
+            return self.get_ready_audio(self._question_text(question_data))
+        except (KeyError, TypeError, AttributeError):
+            return None
+
+    def get_ready_feedback_audio(self, is_correct: bool, correct_answer: str,
+                                 explanation: str, user_answer: str = "") -> Optional[bytes]:
+        """Return feedback audio composed from pre-rendered segments if they are all ready"""
+        return self.feedback_composer.compose_ready(is_correct, correct_answer,
+                                                    explanation, user_answer)
+
+    def _tts_cache_key(self, text: str) -> str:
+        """Cache key for a clip: text plus every setting that changes the audio"""
+        return audio_cache_key(text, self.tts_language, slow=self.tts_slow,
+                               **self.tts_backend.cache_settings())
+
+    def get_cache_stats(self) -> dict:
+        """Return audio cache statistics, including the hit rate"""
+        return self.audio_cache.stats()
+
+    def get_scratch_stats(self) -> dict:
+        """Return scratch space gauges (bytes and files in use)"""
+        return self.scratch.stats()
+
+    def get_prerender_stats(self) -> dict:
+        """Return background rendering queue statistics"""
+        return self.prerenderer.stats()
     
     def play_audio(self, audio_file_path: str):
         """Play audio file using Streamlit's HTML audio player"""
@@ -101,59 +446,257 @@ class VoiceHandler:
             st.markdown(audio_html, unsafe_allow_html=True)
         except Exception as e:
             st.error(f"Error playing audio: {str(e)}")
+
+    def encode_for_client(self, audio_bytes: bytes, profile: Optional[str] = None) -> Tuple[bytes, str]:
+        """Return (bytes, mime) of a clip in a client's encoding profile
+
+        Each clip is encoded once per profile and cached by content hash, so
+        every client on the same profile shares the result.
+        """
+        return self.transcoder.encode(audio_bytes, self.tts_backend.mime, profile or Config.AUDIO_PROFILE)
+
+    def clip_duration(self, audio_bytes: bytes) -> Optional[float]:
+        """Return a clip's duration in seconds from its frame headers (None if unknown)"""
+        return self.durations.duration(audio_bytes)
+
+    def play_audio_bytes(self, audio_bytes: bytes, autoplay: bool = True,
+                         profile: Optional[str] = None) -> Optional[float]:
+        """Play in-memory audio bytes, encoded with the client's profile
+
+        With the audio server running, the player references the clip by its
+        content-hash URL, so reruns send only the tag and browsers cache the
+        clip. Otherwise st.audio hands the bytes to Streamlit's media store.
+        Older Streamlit releases cannot autoplay that way, so autoplay falls
+        back to the inline HTML player. Returns the duration of the clip
+        that was played, or None if it is unknown or playback failed.
+        """
+        try:
+            audio_bytes, mime = self.encode_for_client(audio_bytes, profile)
+            duration = self.clip_duration(audio_bytes)
+            server = get_shared_audio_server()
+            if server is not None:
+                url = server.publish(audio_bytes, mime)
+                st.markdown(self.get_audio_url_html(url, autoplay, mime), unsafe_allow_html=True)
+            elif ST_AUDIO_AUTOPLAY:
+                st.audio(audio_bytes, format=mime, autoplay=autoplay)
+            elif not autoplay:
+                st.audio(audio_bytes, format=mime)
+            else:
+                st.markdown(self.get_audio_html(audio_bytes, mime), unsafe_allow_html=True)
+            return duration
+        except Exception as e:
+            st.error(f"Error playing audio: {str(e)}")
+            return None
+
+    def play_audio_sequence(self, clips: List[bytes], profile: Optional[str] = None) -> List[Optional[float]]:
+        """Auto-play clips back to back as one clip, so each starts as the previous ends
+
+        Returns, for each clip, the seconds from now at which it finishes
+        playing (None from the first clip of unknown duration on).
+        """
+        ends = []
+        elapsed = 0.0
+        for clip in clips:
+            duration = self.clip_duration(clip) if elapsed is not None else None
+            elapsed = elapsed + duration if duration is not None else None
+            ends.append(elapsed)
+        self.play_audio_bytes(self._concat_clips(clips) if len(clips) > 1 else clips[0],
+                              autoplay=True, profile=profile)
+        return ends
     
+    def _ingest(self, audio_data) -> IngestedAudio:
+        """Decode a recording (bytes or an uploaded file) to PCM at the recognizer's rate"""
+        if hasattr(audio_data, 'getvalue'):
+            audio_data = audio_data.getvalue()
+        elif hasattr(audio_data, 'read'):
+            audio_data = audio_data.read()
+        return self.ingestor.ingest(bytes(audio_data), self.stt_backend.sample_rate)
+
     def speech_to_text(self, audio_data) -> Optional[str]:
-        """Convert speech to text using speech recognition"""
-        if not SPEECH_RECOGNITION_AVAILABLE:
+        """Convert a recording (WAV, WebM/Opus, OGG, MP3...) to text with the speech recognition backend"""
+        if isinstance(self.stt_backend, GoogleSTTBackend) and not SPEECH_RECOGNITION_AVAILABLE:
             st.warning("Speech recognition not available. Please install speechrecognition: pip install speechrecognition")
             return None
 
-        if not self.recognizer:
-            st.warning("Speech recognizer not initialized.")
+        if not self.stt_backend.is_available():
+            st.warning(f"Speech recognizer not available: {self.stt_backend.label} is not set up.")
             return None
 
         try:
-            # Save audio data to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                tmp_file.write(audio_data)
-                tmp_file_path = tmp_file.name
+            audio = self._ingest(audio_data)
+            text = self.stt_backend.transcribe_pcm(audio.pcm, audio.sample_rate, self.recognition_language)
+            return text.strip()
 
-            # Load audio file
-            with sr.AudioFile(tmp_file_path) as source:
-                audio = self.recognizer.record(source)
+        except UnsupportedAudioFormat as e:
+            st.error(f"Unsupported audio format: {str(e)}")
+            return None
+        except SpeechNotRecognized:
+            st.warning("Could not understand the audio. Please try again.")
+            return None
+        except RecognitionServiceError as e:
+            st.error(f"Error with speech recognition service: {str(e)}")
+            return None
+        except Exception as e:
+            st.error(f"Error processing audio: {str(e)}")
+            return None
+    
+    def recognize_answer(self, audio_data, options: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """Recognize a spoken A/B/C/D answer against the current question's grammar
 
-            # Recognize speech
-            text = self.recognizer.recognize_google(
-                audio,
-                language=self.recognition_language
+        Returns a dict with 'answer', 'confidence', 'transcript' and 'reprompt';
+        'reprompt' is True when the answer is missing or below
+        Config.ANSWER_MIN_CONFIDENCE and the user should be asked again.
+        """
+        if not self.stt_backend.is_available():
+            st.warning(f"Speech recognizer not available: {self.stt_backend.label} is not set up.")
+            return None
+
+        grammar = build_answer_grammar(options, self.recognition_language)
+        try:
+            audio = self._ingest(audio_data)
+            transcript, confidence = self.stt_backend.spot(
+                pcm_to_wav(audio.pcm, audio.sample_rate), self.recognition_language, grammar_phrases(grammar)
             )
+            result = match_answer(transcript, grammar, confidence, self.recognition_language)
+        except SpeechNotRecognized:
+            result = {'answer': None, 'confidence': 0.0, 'transcript': ""}
+        except UnsupportedAudioFormat as e:
+            st.error(f"Unsupported audio format: {str(e)}")
+            return None
+        except RecognitionServiceError as e:
+            st.error(f"Error with speech recognition service: {str(e)}")
+            return None
+        except Exception as e:
+            st.error(f"Error processing audio: {str(e)}")
+            return None
 
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
+        result['reprompt'] = result['answer'] is None or result['confidence'] < Config.ANSWER_MIN_CONFIDENCE
+        return result
 
-            return text.strip()
+    def stream_answer(self, chunks: Iterable[bytes], sample_rate: int,
+                      options: Optional[Dict[str, str]] = None,
+                      calibration_key: Optional[str] = None) -> Optional[Dict]:
+        """Recognize a spoken answer from a live stream of 16-bit mono PCM chunks
 
-        except sr.UnknownValueError:
-            st.warning("Could not understand the audio. Please try again.")
+        Voice activity detection ends the utterance on trailing silence, and
+        with Config.ANSWER_EARLY_COMMIT the answer is committed as soon as
+        parse_voice_answer reads the same letter from consecutive partial
+        transcripts; its confidence is the recognizer's for the audio heard up
+        to the commit. The result has the keys of recognize_answer plus 'reason'
+        (committed, endpoint, max_length, timeout or stream_end).
+
+        With a calibration_key (a microphone or session id) the detector starts
+        from the cached noise floor of that source instead of learning it
+        anew, and the capture's leading silence keeps the calibration current.
+        """
+        if not self.stt_backend.is_available():
+            st.warning(f"Speech recognizer not available: {self.stt_backend.label} is not set up.")
             return None
-        except sr.RequestError as e:
+
+        grammar = build_answer_grammar(options, self.recognition_language)
+        profile = self.calibration.get(calibration_key) if calibration_key else None
+        try:
+            session = self.stt_backend.stream(sample_rate, self.recognition_language, grammar_phrases(grammar))
+            capture = UtteranceCapture(
+                sample_rate, session,
+                commit=(lambda text: self.parse_voice_answer(text, options)) if Config.ANSWER_EARLY_COMMIT else None,
+                vad=VoiceActivityDetector(sample_rate, end_silence_ms=Config.VAD_END_SILENCE_MS,
+                                          noise_floor_db=profile.noise_floor_db if profile else None),
+                wait_seconds=Config.AUDIO_TIMEOUT, max_speech_seconds=Config.AUDIO_PHRASE_TIMEOUT
+            )
+            outcome = capture_utterance(chunks, capture)
+
+            if outcome['answer'] is not None:
+                # Partials carry no confidence: finalize the audio heard so far and use the recognizer's
+                try:
+                    transcript, confidence = session.finish()
+                except SpeechNotRecognized:
+                    transcript, confidence = outcome['partial'], 0.0
+                result = {'answer': outcome['answer'], 'confidence': round(float(confidence), 4),
+                          'transcript': transcript}
+            elif outcome['reason'] == "timeout":
+                result = {'answer': None, 'confidence': 0.0, 'transcript': ""}
+            else:
+                try:
+                    transcript, confidence = session.finish()
+                    result = match_answer(transcript, grammar, confidence, self.recognition_language)
+                except SpeechNotRecognized:
+                    result = {'answer': None, 'confidence': 0.0, 'transcript': ""}
+        except RecognitionServiceError as e:
             st.error(f"Error with speech recognition service: {str(e)}")
             return None
         except Exception as e:
             st.error(f"Error processing audio: {str(e)}")
             return None
-    
-    def get_audio_html(self, audio_file_path: str) -> str:
-        """Generate HTML audio player for Streamlit"""
+
+        result['reason'] = outcome['reason']
+        result['reprompt'] = result['answer'] is None or result['confidence'] < Config.ANSWER_MIN_CONFIDENCE
+        if calibration_key:
+            self._update_calibration(calibration_key, profile, capture, result)
+        return result
+
+    def _update_calibration(self, key: str, profile: Optional[NoiseProfile],
+                            capture: UtteranceCapture, result: Dict):
+        """Feed a capture's ambient audio and outcome back into the calibration cache"""
+        ambient = capture.leading_silence()
+        self.calibration.observe_ambient(key, ambient, capture.sample_rate)
+        if profile is None:
+            self.calibration.calibrate(key, ambient, capture.sample_rate, source="capture")
+        else:
+            # Missed or endless utterances are the symptoms of a stale noise floor
+            self.calibration.record_outcome(key, not result['reprompt'] and result['reason'] != "max_length")
+
+    def listen_for_answer(self, options: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """Listen on the microphone and return the spoken answer as soon as it is clear
+
+        The microphone's noise floor is measured once (for
+        Config.NOISE_CALIBRATION_SECONDS) before its first answer and cached;
+        later answers start listening immediately.
+        """
+        if self.microphone is None:
+            st.warning("🎤 Microphone not available. Please install pyaudio: pip install pyaudio")
+            return None
+
+        device_index = getattr(self.microphone, 'device_index', None)
+        key = f"microphone:{'default' if device_index is None else device_index}"
+        with self.microphone as source:
+            chunks = iter(lambda: source.stream.read(source.CHUNK), b"")
+            if self.calibration.get(key) is None:
+                needed = int(Config.NOISE_CALIBRATION_SECONDS * source.SAMPLE_RATE) * source.SAMPLE_WIDTH
+                ambient, heard = [], 0
+                for chunk in chunks:
+                    ambient.append(chunk)
+                    heard += len(chunk)
+                    if heard >= needed:
+                        break
+                self.calibration.calibrate(key, b"".join(ambient), source.SAMPLE_RATE)
+            return self.stream_answer(chunks, source.SAMPLE_RATE, options, calibration_key=key)
+
+    def get_audio_url_html(self, url: str, autoplay: bool = True, mime: Optional[str] = None) -> str:
+        """Generate an HTML audio player that streams a clip from a URL"""
+        return f"""
+            <audio controls{' autoplay' if autoplay else ''} preload="auto">
+                <source src="{url}" type="{mime or self.tts_backend.mime}">
+                Your browser does not support the audio element.
+            </audio>
+            """
+
+    def get_audio_html(self, audio: Union[str, bytes], mime: Optional[str] = None) -> str:
+        """Generate HTML audio player for Streamlit from a file path or audio bytes"""
+        mime = mime or self.tts_backend.mime
         try:
-            with open(audio_file_path, 'rb') as audio_file:
-                audio_bytes = audio_file.read()
+            if isinstance(audio, (bytes, bytearray, memoryview)):
+                audio_bytes = audio
+            else:
+                self.scratch.touch(audio)
+                with open(audio, 'rb') as audio_file:
+                    audio_bytes = audio_file.read()
             
             audio_base64 = base64.b64encode(audio_bytes).decode()
             
             audio_html = f"""
             <audio controls autoplay>
-                <source src="data:audio/mp3;base64,{audio_base64}" type="audio/mp3">
+                <source src="data:{mime};base64,{audio_base64}" type="{mime}">
                 Your browser does not support the audio element.
             </audio>
             """
@@ -164,72 +707,83 @@ class VoiceHandler:
             st.error(f"Error creating audio player: {str(e)}")
             return ""
     
+    @staticmethod
+    def _question_text(question_data: dict) -> str:
+        """Build the spoken text of a question including its options"""
+        full_text = f"Question: {question_data['question']}\n\n"
+        full_text += "Options:\n"
+        for key, value in question_data['options'].items():
+            full_text += f"{key}: {value}\n"
+
+        full_text += "\nPlease say your answer: A, B, C, or D."
+        return full_text
+
+    @staticmethod
+    def _feedback_text(is_correct: bool, correct_answer: str, explanation: str,
+                       user_answer: str = "") -> str:
+        """Build the spoken feedback text for an answer"""
+        if is_correct:
+            return f"Correct! Well done. {explanation}"
+        return f"Incorrect. You answered {user_answer}, but the correct answer is {correct_answer}. {explanation}"
+
     def create_question_audio(self, question_data: dict) -> Optional[str]:
         """Create audio for a complete question including options"""
         try:
-            question_text = question_data['question']
-            options = question_data['options']
-            
-            # Build complete question text
-            full_text = f"Question: {question_text}\n\n"
-            full_text += "Options:\n"
-            for key, value in options.items():
-                full_text += f"{key}: {value}\n"
-            
-            full_text += "\nPlease say your answer: A, B, C, or D."
-            
-            return self.text_to_speech(full_text)
+            return self.text_to_speech(self._question_text(question_data))
             
         except Exception as e:
             st.error(f"Error creating question audio: {str(e)}")
             return None
     
+    def create_question_audio_bytes(self, question_data: dict) -> Optional[bytes]:
+        """Create in-memory audio for a complete question including options"""
+        try:
+            question_text = self._question_text(question_data)
+            if Config.TTS_CHUNKED_ENABLED:
+                return self.text_to_speech_chunked(question_text)
+            return self.text_to_speech_bytes(question_text)
+        except Exception as e:
+            st.error(f"Error creating question audio: {str(e)}")
+            return None
+
     def create_feedback_audio(self, is_correct: bool, correct_answer: str, 
                             explanation: str, user_answer: str = "") -> Optional[str]:
         """Create audio feedback for answer"""
         try:
-            if is_correct:
-                feedback_text = f"Correct! Well done. {explanation}"
-            else:
-                feedback_text = f"Incorrect. You answered {user_answer}, but the correct answer is {correct_answer}. {explanation}"
-            
+            feedback_text = self._feedback_text(is_correct, correct_answer, explanation, user_answer)
             return self.text_to_speech(feedback_text)
             
         except Exception as e:
             st.error(f"Error creating feedback audio: {str(e)}")
             return None
     
+    def create_feedback_audio_bytes(self, is_correct: bool, correct_answer: str,
+                                    explanation: str, user_answer: str = "") -> Optional[bytes]:
+        """Create in-memory audio feedback for answer from cached phrase segments"""
+        if not self.tts_backend.is_available():
+            st.warning(self._tts_unavailable_message())
+            return None
+        try:
+            return self.feedback_composer.compose(is_correct, correct_answer,
+                                                  explanation, user_answer)
+        except Exception as e:
+            st.error(f"Error creating feedback audio: {str(e)}")
+            return None
+
     def cleanup_temp_files(self, file_paths: list):
-        """Clean up temporary audio files"""
+        """Clean up temporary audio files (cached clips are kept for replay)"""
         for file_path in file_paths:
             try:
+                if self.audio_cache.owns(file_path):
+                    continue
+                if self.scratch.owns(file_path):
+                    self.scratch.release(file_path)
+                    continue
                 if file_path and os.path.exists(file_path):
                     os.unlink(file_path)
             except Exception as e:
                 st.warning(f"Could not clean up temporary file {file_path}: {str(e)}")
     
-    def parse_voice_answer(self, voice_text: str) -> Optional[str]:
-        """Parse voice input to extract answer choice"""
-        if not voice_text:
-            return None
-        
-        voice_text = voice_text.upper().strip()
-        
-        # Look for single letter answers
-        for option in ['A', 'B', 'C', 'D']:
-            if option in voice_text:
-                # Check if it's a clear single option
-                if voice_text == option or f" {option} " in voice_text or voice_text.startswith(f"{option} ") or voice_text.endswith(f" {option}"):
-                    return option
-        
-        # Look for spelled out options
-        spelled_options = {
-            'ALPHA': 'A', 'BRAVO': 'B', 'CHARLIE': 'C', 'DELTA': 'D',
-            'OPTION A': 'A', 'OPTION B': 'B', 'OPTION C': 'C', 'OPTION D': 'D'
-        }
-        
-        for spelled, letter in spelled_options.items():
-            if spelled in voice_text:
-                return letter
-        
-        return None
+    def parse_voice_answer(self, voice_text: str, options: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Parse voice input to extract answer choice, optionally matching the option texts"""
+        return get_answer_matcher(self.recognition_language).match(voice_text, options)